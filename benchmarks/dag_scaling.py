@@ -0,0 +1,69 @@
+"""Scaling benchmark for the DAG utilities in sayn.utils.dag
+
+Usage: python benchmarks/dag_scaling.py [max_tasks]
+
+Times dag validation, topological sorting and task queries on synthetic DAGs of growing
+size, both wide (tasks spread in layers with random parents) and deep (a single chain of
+tasks). Queries select 200 tasks with their ancestors and descendants (`+task+`).
+Linear algorithms should show times growing proportionally to the number of tasks.
+"""
+import random
+import sys
+from time import perf_counter
+
+from sayn.utils.dag import dag_is_valid, query, topological_sort
+
+
+def layered_dag(n_tasks, n_layers=20, max_parents=5, seed=1):
+    rnd = random.Random(seed)
+    layer_size = max(n_tasks // n_layers, 1)
+    names = [f"task_{i}" for i in range(n_tasks)]
+    dag = dict()
+    for i, name in enumerate(names):
+        layer_start = (i // layer_size) * layer_size
+        candidates = names[:layer_start]
+        n_parents = min(rnd.randint(0, max_parents), len(candidates))
+        dag[name] = rnd.sample(candidates, n_parents)
+
+    # Shuffle the definition order as tasks are defined in any order in projects
+    items = list(dag.items())
+    rnd.shuffle(items)
+    return dict(items)
+
+
+def chain_dag(n_tasks):
+    return {f"task_{i}": [f"task_{i - 1}"] if i > 0 else list() for i in range(n_tasks)}
+
+
+def plus_query(dag, n_components=200, seed=1):
+    rnd = random.Random(seed)
+    return [
+        {"task": task, "upstream": True, "downstream": True, "operation": "include"}
+        for task in rnd.sample(list(dag.keys()), min(n_components, len(dag)))
+    ]
+
+
+def timed(func, *args):
+    start = perf_counter()
+    result = func(*args)
+    assert result.is_ok
+    return perf_counter() - start
+
+
+def main(max_tasks=20000):
+    sizes = [s for s in (1000, 2000, 5000, 10000, 20000, 50000) if s <= max_tasks]
+    print(
+        f"{'dag':>8} {'tasks':>8} {'validate (s)':>14} {'sort (s)':>10} {'query (s)':>10}"
+    )
+    for name, generator in (("layered", layered_dag), ("chain", chain_dag)):
+        for size in sizes:
+            dag = generator(size)
+            print(
+                f"{name:>8} {size:>8} {timed(dag_is_valid, dag):>14.4f}"
+                f" {timed(topological_sort, dag):>10.4f}"
+                f" {timed(query, dag, plus_query(dag)):>10.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
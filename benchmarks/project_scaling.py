@@ -0,0 +1,236 @@
+"""End to end benchmark of the SAYN app stages on synthetic projects
+
+Usage: python benchmarks/project_scaling.py [--groups 5 10 20] [--tasks-per-group 100]
+           [--fan-in 3] [--presets 3] [--jinja 5] [--command compile] [--threads N]
+
+Generates projects in a temporary folder with a local SQLite connection. Each project has
+`groups` task group files in the tasks folder with `tasks-per-group` autosql tasks each.
+Every task selects from up to `fan-in` random tasks in previous groups, uses one of a
+chain of `presets` global presets and compiles a loop of `jinja` macro calls imported
+from a shared macros file.
+
+Every project is executed twice, first without the state in the `.sayn` folder (cold)
+and then with the state left by the first execution (warm). Each execution runs in a new
+process, once to time the `config`, `setup` and command stages and once more tracing
+memory allocations to get the peak memory of each stage, as tracing slows down python.
+"""
+import argparse
+import multiprocessing
+import os
+from pathlib import Path
+import random
+import shutil
+import tempfile
+from time import perf_counter
+import tracemalloc
+
+
+def generate_project(
+    folder, groups, tasks_per_group, fan_in=3, presets=3, jinja=5, seed=1
+):
+    """Writes a SAYN project to `folder` and returns the number of tasks in it"""
+    rnd = random.Random(seed)
+    folder = Path(folder)
+    (folder / "tasks").mkdir(parents=True)
+    (folder / "sql").mkdir()
+
+    project_presets = ["presets:"]
+    for i in range(presets):
+        project_presets.append(f"  preset_{i}:")
+        if i == 0:
+            project_presets.extend(
+                [
+                    "    type: autosql",
+                    "    materialisation: table",
+                    "    destination:",
+                    '      table: "{{ task.name }}"',
+                ]
+            )
+        else:
+            project_presets.extend(
+                [f"    preset: preset_{i - 1}", f"    tags: [level_{i}]"]
+            )
+
+    (folder / "project.yaml").write_text(
+        "\n".join(
+            ["required_credentials:", "  - warehouse", "default_db: warehouse"]
+            + project_presets
+        )
+        + "\n"
+    )
+    (folder / "settings.yaml").write_text(
+        "\n".join(
+            [
+                "profiles:",
+                "  dev:",
+                "    credentials:",
+                "      warehouse: bench_db",
+                "default_profile: dev",
+                "credentials:",
+                "  bench_db:",
+                "    type: sqlite",
+                "    database: bench.db",
+            ]
+        )
+        + "\n"
+    )
+    (folder / "sql" / "macros.sql").write_text(
+        "{% macro column(i) %}x + {{ i }} AS c_{{ i }}{% endmacro %}\n"
+    )
+
+    previous_tasks = list()
+    for group in range(groups):
+        group_tasks = [f"g{group}_t{i}" for i in range(tasks_per_group)]
+        group_folder = folder / "sql" / f"group_{group}"
+        group_folder.mkdir()
+
+        definitions = ["tasks:"]
+        for task in group_tasks:
+            definitions.extend(
+                [
+                    f"  {task}:",
+                    f"    preset: preset_{rnd.randrange(max(presets, 1))}",
+                    f"    file_name: group_{group}/{task}.sql",
+                ]
+            )
+
+            parents = rnd.sample(previous_tasks, min(fan_in, len(previous_tasks)))
+            if len(parents) == 0:
+                source = "(SELECT 1 AS x)"
+            else:
+                source = (
+                    "("
+                    + " UNION ALL ".join(
+                        f"SELECT x FROM {{{{ src('{p}') }}}}" for p in parents
+                    )
+                    + ")"
+                )
+
+            (group_folder / f"{task}.sql").write_text(
+                "{% import 'sql/macros.sql' as m %}\n"
+                f"SELECT {{% for i in range({jinja}) %}}{{{{ m.column(i) }}}}, "
+                "{% endfor %}x\n"
+                f"FROM {source} AS s\n"
+                "LIMIT 1\n"
+            )
+
+        (folder / "tasks" / f"group_{group}.yaml").write_text(
+            "\n".join(definitions) + "\n"
+        )
+        previous_tasks.extend(group_tasks)
+
+    return len(previous_tasks)
+
+
+class StageTimer:
+    """Logger measuring the duration and, when tracing memory, the peak memory of each
+    app stage"""
+
+    def __init__(self, trace_memory):
+        self.trace_memory = trace_memory
+        self.durations = dict()
+        self.peaks = dict()
+        self.stage_start = None
+
+    def report_event(self, context, event, stage, **details):
+        if context != "app" or event not in ("start_stage", "finish_stage"):
+            return
+
+        if event == "start_stage":
+            self.stage_start = perf_counter()
+            if self.trace_memory:
+                tracemalloc.reset_peak()
+        else:
+            self.durations[stage] = perf_counter() - self.stage_start
+            if self.trace_memory:
+                self.peaks[stage] = tracemalloc.get_traced_memory()[1] / 2**20
+
+
+def execute_project(folder, command, threads, trace_memory):
+    """Executes the project in `folder`, returning the duration in seconds and the peak
+    memory in MB of each stage"""
+    from sayn.core.app import App, Command
+    from sayn.logging import ConsoleLogger
+
+    os.chdir(folder)
+    if trace_memory:
+        tracemalloc.start()
+
+    timer = StageTimer(trace_memory)
+    app = App()
+    app.tracker.remove_logger(ConsoleLogger)
+    app.tracker.register_logger(timer)
+    app.run_arguments.command = Command(command)
+    app.run_arguments.threads = threads
+
+    try:
+        app.start_app()
+        app.execute_dag()
+    except SystemExit as exc:
+        if exc.code not in (None, 0):
+            raise RuntimeError(f"{command} failed in {folder}")
+
+    return timer.durations, timer.peaks
+
+
+def execute_in_process(*args):
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(execute_project, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the SAYN app stages on synthetic projects"
+    )
+    parser.add_argument("--groups", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--tasks-per-group", type=int, default=100)
+    parser.add_argument("--fan-in", type=int, default=3)
+    parser.add_argument("--presets", type=int, default=3)
+    parser.add_argument("--jinja", type=int, default=5)
+    parser.add_argument("--command", choices=("compile", "run"), default="compile")
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    stages = ("config", "setup", args.command)
+    print(
+        f"{'groups':>6} {'tasks':>6} {'state':>5} "
+        + " ".join(f"{s + ' (s)':>12}" for s in stages)
+        + " "
+        + " ".join(f"{s + ' (MB)':>13}" for s in stages)
+    )
+    for groups in args.groups:
+        folder = tempfile.mkdtemp(prefix="sayn_benchmark_")
+        try:
+            n_tasks = generate_project(
+                folder,
+                groups,
+                args.tasks_per_group,
+                args.fan_in,
+                args.presets,
+                args.jinja,
+            )
+            for state in ("cold", "warm"):
+                if state == "cold":
+                    shutil.rmtree(Path(folder, ".sayn"), ignore_errors=True)
+
+                durations, _ = execute_in_process(
+                    folder, args.command, args.threads, False
+                )
+                if state == "cold":
+                    # The memory run would otherwise find the state of the timed run
+                    shutil.rmtree(Path(folder, ".sayn"), ignore_errors=True)
+                _, peaks = execute_in_process(folder, args.command, args.threads, True)
+
+                print(
+                    f"{groups:>6} {n_tasks:>6} {state:>5} "
+                    + " ".join(f"{durations.get(s, 0):>12.3f}" for s in stages)
+                    + " "
+                    + " ".join(f"{peaks.get(s, 0):>13.1f}" for s in stages)
+                )
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
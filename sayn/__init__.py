@@ -8,4 +8,12 @@
 __version__ = "0.6.16"
 
 
-from .tasks.python import PythonTask, task
+def __getattr__(name):
+    # Python tasks are imported on first use so that importing sayn (eg: to run the cli)
+    # doesn't load all task and database modules
+    if name in ("PythonTask", "task"):
+        from .tasks import python
+
+        return getattr(python, name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,82 +1,19 @@
-from datetime import date, timedelta
 import sys
+from time import perf_counter
 
 import click
 
 from .utils.graphviz import plot_dag
-from .logging import ConsoleLogger, FancyLogger, FileLogger
 from .scaffolding.init_project import sayn_init
-from .core.app import App, Command
-from .tasks.task import TaskStatus
-
-yesterday = date.today() - timedelta(days=1)
-
-
-class CliApp(App):
-    def __init__(
-        self,
-        command,
-        debug=False,
-        include=None,
-        exclude=None,
-        upstream_prod=False,
-        profile=None,
-        full_load=False,
-        start_dt=None,
-        end_dt=None,
-        with_tests=False,
-        fail_fast=False,
-    ):
-        super().__init__()
-
-        # STARTING APP: register loggers and set cli arguments in the App object
-        self.run_arguments.command = command
-
-        if debug:
-            self.run_arguments.debug = debug
-        else:
-            self.tracker.remove_logger(ConsoleLogger)
-            self.tracker.register_logger(FancyLogger())
-
-        self.tracker.register_logger(
-            FileLogger(
-                self.run_arguments.folders.logs,
-                format=f"{self.run_id}|" + "%(asctime)s|%(levelname)s|%(message)s",
-            )
-        )
-
-        if start_dt is not None:
-            self.run_arguments.dates_specified = True
-            self.run_arguments.start_dt = start_dt.date()
-        else:
-            self.run_arguments.start_dt = yesterday
-
-        if end_dt is not None:
-            self.run_arguments.dates_specified = True
-            self.run_arguments.end_dt = end_dt.date()
-        else:
-            end_dt = yesterday
-            self.run_arguments.end_dt = yesterday
-
-        self.run_arguments.profile = profile
-        self.run_arguments.full_load = full_load
-
-        if include is not None:
-            self.run_arguments.include = set(include)
-
-        if exclude is not None:
-            self.run_arguments.exclude = set(exclude)
-
-        if upstream_prod is not None:
-            self.run_arguments.upstream_prod = upstream_prod
-
-        if with_tests is not None:
-            self.run_arguments.with_tests = with_tests
-
-        if fail_fast is not None:
-            self.run_arguments.fail_fast = fail_fast
-
-        self.start_app()
+
+
+def load_app():
+    """Imports the app lazily so that `sayn init` and `--help` don't load the task and
+    database modules. Returns the module and the time taken to import it"""
+    start_ts = perf_counter()
+    from .core import cli_app
+
+    return cli_app, perf_counter() - start_ts
 
 
 class ChainOption(click.Option):
@@ -139,6 +76,60 @@ click_fail_fast = click.option(
     help="Interrupt remaining task execution on first failure.",
 )
 
+click_threads = click.option(
+    "--threads",
+    "-n",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Maximum number of tasks to execute concurrently.",
+)
+
+
+click_pipeline = click.option(
+    "--pipeline",
+    is_flag=True,
+    default=False,
+    help="Start executing tasks as soon as their connections and setup are ready.",
+)
+
+click_resume = click.option(
+    "--resume",
+    type=click.UUID,
+    default=None,
+    help="Run ID of a previous execution to resume, skipping the tasks that succeeded in it.",
+)
+
+
+click_changed_only = click.option(
+    "--changed-only",
+    is_flag=True,
+    default=False,
+    help="Skip sql and autosql tasks with no changes since their last successful run.",
+)
+
+
+click_profile_startup = click.option(
+    "--profile-startup",
+    is_flag=True,
+    default=False,
+    help="Report the time spent in each step of the startup.",
+)
+
+
+click_queue = click.option(
+    "--queue",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Path to a queue file. Tasks are published to it for `sayn worker` to execute them.",
+)
+
+click_queue_timeout = click.option(
+    "--queue-timeout",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="Fail tasks not claimed by a worker after this number of seconds (default: 600).",
+)
+
 
 def click_filter(func):
     func = click.option(
@@ -213,6 +204,9 @@ def init(sayn_project_name):
 
 @cli.command(help="Compile sql tasks.")
 @click_with_tests
+@click_threads
+@click_pipeline
+@click_profile_startup
 @click_run_options
 def compile(
     debug,
@@ -225,12 +219,16 @@ def compile(
     end_dt,
     with_tests,
     fail_fast,
+    threads,
+    pipeline,
+    profile_startup,
 ):
 
     tasks = [i for t in tasks for i in t.strip().split(" ")]
     exclude = [i for t in exclude for i in t.strip().split(" ")]
-    app = CliApp(
-        Command.COMPILE,
+    cli_app, import_duration = load_app()
+    app = cli_app.CliApp(
+        cli_app.Command.COMPILE,
         debug,
         tasks,
         exclude,
@@ -241,10 +239,14 @@ def compile(
         end_dt,
         with_tests,
         fail_fast,
+        threads=threads,
+        pipeline=pipeline,
+        profile_startup=profile_startup,
+        import_duration=import_duration,
     )
 
     app.compile()
-    if any([t.status == TaskStatus.FAILED for _, t in app.tasks.items()]):
+    if any([t.status == cli_app.TaskStatus.FAILED for _, t in app.tasks.items()]):
         sys.exit(-1)
     else:
         sys.exit()
@@ -252,6 +254,13 @@ def compile(
 
 @cli.command(help="Run SAYN tasks.")
 @click_with_tests
+@click_threads
+@click_pipeline
+@click_resume
+@click_changed_only
+@click_queue
+@click_queue_timeout
+@click_profile_startup
 @click_run_options
 def run(
     debug,
@@ -264,12 +273,20 @@ def run(
     end_dt,
     with_tests,
     fail_fast,
+    threads,
+    pipeline,
+    resume,
+    changed_only,
+    queue,
+    queue_timeout,
+    profile_startup,
 ):
 
     tasks = [i for t in tasks for i in t.strip().split(" ")]
     exclude = [i for t in exclude for i in t.strip().split(" ")]
-    app = CliApp(
-        Command.RUN,
+    cli_app, import_duration = load_app()
+    app = cli_app.CliApp(
+        cli_app.Command.RUN,
         debug,
         tasks,
         exclude,
@@ -280,16 +297,27 @@ def run(
         end_dt,
         with_tests,
         fail_fast,
+        threads=threads,
+        pipeline=pipeline,
+        resume=resume,
+        changed_only=changed_only,
+        queue=queue,
+        queue_timeout=queue_timeout,
+        profile_startup=profile_startup,
+        import_duration=import_duration,
     )
 
     app.run()
-    if any([t.status == TaskStatus.FAILED for _, t in app.tasks.items()]):
+    if any([t.status == cli_app.TaskStatus.FAILED for _, t in app.tasks.items()]):
         sys.exit(-1)
     else:
         sys.exit()
 
 
 @cli.command(help="Test SAYN tasks.")
+@click_threads
+@click_pipeline
+@click_profile_startup
 @click_run_options
 def test(
     debug,
@@ -301,12 +329,16 @@ def test(
     start_dt,
     end_dt,
     fail_fast,
+    threads,
+    pipeline,
+    profile_startup,
 ):
 
     tasks = [i for t in tasks for i in t.strip().split(" ")]
     exclude = [i for t in exclude for i in t.strip().split(" ")]
-    app = CliApp(
-        Command.TEST,
+    cli_app, import_duration = load_app()
+    app = cli_app.CliApp(
+        cli_app.Command.TEST,
         debug,
         tasks,
         exclude,
@@ -315,16 +347,48 @@ def test(
         full_load,
         start_dt,
         end_dt,
-        fail_fast,
+        fail_fast=fail_fast,
+        threads=threads,
+        pipeline=pipeline,
+        profile_startup=profile_startup,
+        import_duration=import_duration,
     )
 
     app.test()
-    if any([t.status == TaskStatus.FAILED for _, t in app.tasks.items()]):
+    if any([t.status == cli_app.TaskStatus.FAILED for _, t in app.tasks.items()]):
         sys.exit(-1)
     else:
         sys.exit()
 
 
+@cli.command(help="Execute tasks published by `sayn run --queue`.")
+@click_debug
+@click_threads
+@click.option(
+    "--queue",
+    type=click.Path(dir_okay=False),
+    required=True,
+    help="Location of the queue used by `sayn run --queue`.",
+)
+@click.option(
+    "--idle-timeout",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="Stop after this number of seconds without tasks to execute.",
+)
+def worker(debug, threads, queue, idle_timeout):
+    from .core.queue import create_queue
+    from .core.worker import Worker
+
+    cli_app, _ = load_app()
+    Worker(
+        create_queue(queue),
+        lambda arguments: cli_app.WorkerApp(arguments, debug, threads or 1),
+        threads=threads or 1,
+        idle_timeout=idle_timeout,
+    ).execute()
+
+
 @cli.command(help="Generate DAG image.")
 @click_debug
 @click_filter
@@ -333,7 +397,8 @@ def dag_image(debug, tasks, exclude, upstream_prod):
         print("Errors detected in project. Run `sayn compile` to see the errors")
         sys.exit(-1)
 
-    app = App()
+    cli_app, _ = load_app()
+    app = cli_app.App()
     app.start_app()
 
     plot_dag(app.dag, "images", "dag")
@@ -1,20 +1,60 @@
 from datetime import datetime, date, timedelta
 from enum import Enum
+from hashlib import sha256
+from importlib import import_module
 from itertools import groupby
 from pathlib import Path
 import shutil
+from threading import Lock
+from time import perf_counter
 from uuid import UUID, uuid4
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import sys
 from typing import Optional, Set
 
+import orjson
+
+from .. import __version__
+from ..tasks.process_executor import ProcessPool
 from ..tasks.task_wrapper import TaskWrapper
-from ..utils.dag import query as dag_query, topological_sort
+from .executor import DagExecutor, Deferred, resolve, then
+from .queue import QueueWaiter, create_queue
+from .state import (
+    append_run_status,
+    get_config_cache,
+    get_group_cache,
+    get_manifest,
+    get_run_statuses,
+    get_task_durations,
+    get_task_fingerprints,
+    get_compile_output,
+    prune_run_statuses,
+    update_compile_output,
+    update_config_cache,
+    update_group_cache,
+    update_manifest,
+    update_run_statuses,
+    update_task_durations,
+    update_task_fingerprints,
+)
+from ..utils.compile_output import CompileOutput
+from ..utils.dag import DagIndex, query as dag_query, topological_sort
+from ..utils.file_index import FileIndex
 from .settings import get_connections, get_settings
 from .errors import Err, Exc, Ok, Result, SaynError
 from ..logging import EventTracker
+from ..logging.log_formatter import human
 from ..database import Database
 
-from ..core.project import read_project, read_groups, get_tasks_dict
+from ..core.project import (
+    TaskGroupFile,
+    get_group_files,
+    get_python_tasks,
+    get_tasks_dict,
+    read_groups,
+    read_project,
+)
 from ..core.settings import read_settings
 from ..database.unknown import UnknownDb
 from ..database.objects import DbObjectCompiler
@@ -24,23 +64,19 @@ from ..utils.task_query import get_query
 from ..utils.compiler import Compiler
 
 from ..tasks.task import TaskStatus
-from ..tasks.dummy import DummyTask
-from ..tasks.sql import SqlTask
-
-from ..tasks.autosql import AutoSqlTask
-from ..tasks.copy import CopyTask
-from ..tasks.test import TestTask
 
+# Module and class of each task type, imported only when a task of that type is used
 _creators = {
-    "dummy": DummyTask,
-    "sql": SqlTask,
-    "autosql": AutoSqlTask,
-    "copy": CopyTask,
-    "test": TestTask,
+    "dummy": ("dummy", "DummyTask"),
+    "sql": ("sql", "SqlTask"),
+    "autosql": ("autosql", "AutoSqlTask"),
+    "copy": ("copy", "CopyTask"),
+    "test": ("test", "TestTask"),
 }
 
 
-run_id = uuid4()
+# ID of the runs started in this process
+default_run_id = uuid4()
 
 
 class Command(Enum):
@@ -57,6 +93,7 @@ class RunArguments:
         compile: str = str(Path("compile"))
         logs: str = str(Path("logs"))
         tests: str = str(Path("sql"))
+        state: str = str(Path(".sayn"))
 
     folders: Folders
     full_load: bool = False
@@ -70,6 +107,13 @@ class RunArguments:
     is_prod: bool = False
     with_tests: bool = False
     fail_fast: bool = False
+    threads: Optional[int] = None
+    resume: Optional[str] = None
+    changed_only: bool = False
+    pipeline: bool = False
+    queue: Optional[str] = None
+    queue_timeout: float = 600.0
+    profile_startup: bool = False
 
     include: Set[str]
     exclude: Set[str]
@@ -95,11 +139,19 @@ class RunArguments:
             self.debug = kwargs["debug"]
 
 
+def is_serialisable(content):
+    """Returns True if the content can be stored as json and read back unchanged"""
+    try:
+        return orjson.loads(orjson.dumps(content)) == content
+    except TypeError:
+        return False
+
+
 class App:
-    def __init__(self):
+    def __init__(self, run_id=None):
         self.project_root = Path(".")
 
-        self.run_id: UUID = run_id
+        self.run_id: UUID = run_id or default_run_id
         self.app_start_ts = datetime.now()
 
         self.run_arguments = RunArguments()
@@ -114,15 +166,58 @@ class App:
 
         self.tasks = dict()
         self.dag = dict()
+        self.dag_index = None
         self.tests = dict()
 
         self.task_query = list()
         self.tasks_to_run = dict()
 
         self.connections = dict()
+        self.max_concurrency = dict()
+
+        self.resumed_tasks = set()
+
+        self.connection_pool = None
+        self.connection_futures = dict()
+        self.process_pool = None
+        self.process_pool_lock = Lock()
+        self.task_queue = None
+        self.queue_waiter = None
+        self.compile_output = None
 
         self.python_loader = PythonLoader()
 
+        self.file_hashes = dict()
+        self.file_indexes = dict()
+
+        self.startup_profile = dict()
+        self.startup_profile_lock = Lock()
+
+    @contextmanager
+    def profile(self, name):
+        """Adds the time spent in the block to the startup profile. Connections can be
+        prepared concurrently, so the total time can be longer than the startup time"""
+        start_ts = perf_counter()
+        try:
+            yield
+        finally:
+            duration = perf_counter() - start_ts
+            with self.startup_profile_lock:
+                self.startup_profile[name] = (
+                    self.startup_profile.get(name, 0.0) + duration
+                )
+
+    def report_startup_profile(self):
+        self.tracker.report_event(
+            event="message",
+            level="info",
+            message=["Startup profile:"]
+            + [
+                f"{name}: {human(timedelta(seconds=duration))}"
+                for name, duration in self.startup_profile.items()
+            ],
+        )
+
     def start_app(self):
         self.tracker.report_event(
             context="app",
@@ -138,52 +233,47 @@ class App:
         # SETUP THE APP: read project config and settings, interpret cli arguments and setup the dag
         self.tracker.start_stage("config")
 
-        # Set python environment
-        if Path(self.run_arguments.folders.python).is_dir():
-            self.check_abort(
-                self.python_loader.register_module(
-                    "python_tasks", self.run_arguments.folders.python
+        self.resumed_tasks = self.get_resumed_tasks()
+
+        with self.profile("project"):
+            # Set python environment
+            if Path(self.run_arguments.folders.python).is_dir():
+                self.check_abort(
+                    self.python_loader.register_module(
+                        "python_tasks", self.run_arguments.folders.python
+                    )
                 )
-            )
 
-        # Read the project configuration
-        try:
-            project = read_project(self.project_root)
-        except SaynError as exc:
-            self.finish_app(error=Exc(exc))
+            # Read the project configuration
+            try:
+                project = read_project(self.project_root)
+            except SaynError as exc:
+                self.finish_app(error=Exc(exc))
 
-        try:
-            file_groups = read_groups(self.project_root)
-        except SaynError as exc:
-            self.finish_app(error=Exc(exc))
+            group_files = get_group_files(self.project_root)
 
-        self.set_project(project, file_groups)
+            self.set_project(project, group_files)
 
-        # We need the settings before we can process the tasks
-        settings = self.check_abort(read_settings())
-        self.check_abort(self.set_settings(settings))
+        with self.profile("settings"):
+            # We need the settings before we can process the tasks
+            settings = self.check_abort(read_settings())
+            self.check_abort(self.set_settings(settings))
 
-        # Set tasks and dag from it
-        tasks_dict = self.check_abort(
-            get_tasks_dict(
-                self.presets,
-                self.file_groups,
-                self.autogroups,
-                self.run_arguments.folders.sql,
-                self.compiler,
-                self.python_loader,
-            )
-        )
+        with self.profile("config"):
+            # Set tasks and dag from it
+            tasks_dict = self.check_abort(self.get_tasks_dict(group_files))
 
-        # Set the tasks for the project and call their config method
+            # Set the tasks for the project and call their config method
 
-        if (
-            self.run_arguments.command != Command.TEST
-            and not self.run_arguments.with_tests
-        ):
-            tasks_dict = {k: v for k, v in tasks_dict.items() if v["type"] != "test"}
+            if (
+                self.run_arguments.command != Command.TEST
+                and not self.run_arguments.with_tests
+            ):
+                tasks_dict = {
+                    k: v for k, v in tasks_dict.items() if v["type"] != "test"
+                }
 
-        self.check_abort(self.set_tasks(tasks_dict))
+            self.check_abort(self.set_tasks(tasks_dict))
 
         self.tracker.finish_current_stage(
             tasks={k: v.status for k, v in self.tasks.items()},
@@ -200,7 +290,7 @@ class App:
             test=True if self.run_arguments.command == Command.TEST else False,
         )
 
-    def set_project(self, project, file_groups):
+    def set_project(self, project, group_files):
         self.prod_project_parameters.update(project.parameters or dict())
         self.project_parameters.update(project.parameters or dict())
 
@@ -233,7 +323,7 @@ class App:
         self.presets = project.presets or dict()
 
         # Validate groups
-        collision = set(file_groups.keys()).intersection(set(project.autogroups.keys()))
+        collision = set(group_files.keys()).intersection(set(project.autogroups.keys()))
         if len(collision) > 0:
             if len(collision) == 1:
                 error_message = (
@@ -254,7 +344,10 @@ class App:
                 )
             )
         self.autogroups = project.autogroups
-        self.file_groups = file_groups
+
+        # Threads specified in the command line take precedence over project.yaml
+        if self.run_arguments.threads is None:
+            self.run_arguments.threads = project.threads
 
     def set_settings(self, settings):
         settings_dict = get_settings(
@@ -307,7 +400,7 @@ class App:
         if result.is_err:
             return result
         else:
-            self.connections = result.value
+            self.connections, self.max_concurrency = result.value
         # Object compilation objects
         self.input_stringify.update(stringify)
 
@@ -329,13 +422,139 @@ class App:
 
         return Ok()
 
+    def get_tasks_dict(self, group_files):
+        """Returns the definition of all tasks in the project, taken from the manifest
+        stored in the `.sayn` folder when no project files changed since the last
+        execution. Python tasks are always loaded from their modules."""
+        key = self.get_manifest_key(group_files)
+        manifest = get_manifest(self.run_arguments.folders.state, key)
+        if manifest is not None:
+            result = get_python_tasks(
+                self.presets, self.autogroups, self.compiler, self.python_loader
+            )
+            if result.is_err:
+                return result
+            python_tasks = result.value
+
+            manifest_python_tasks = {
+                k for k, v in manifest.items() if v.get("type") == "python_module"
+            }
+            if manifest_python_tasks == set(python_tasks.keys()):
+                return Ok(
+                    {
+                        name: python_tasks.get(name, task)
+                        for name, task in manifest.items()
+                    }
+                )
+
+        try:
+            file_groups = self.read_groups(group_files)
+        except SaynError as exc:
+            return Exc(exc)
+
+        result = get_tasks_dict(
+            self.presets,
+            file_groups,
+            self.autogroups,
+            self.get_file_index(self.run_arguments.folders.sql),
+            self.compiler,
+            self.python_loader,
+        )
+        if result.is_err:
+            return result
+
+        # Python task classes are not stored, and only definitions that can be read
+        # back exactly (eg: no dates in parameters) make it to the manifest
+        manifest = {
+            name: {k: v for k, v in task.items() if k != "task_class"}
+            for name, task in result.value.items()
+        }
+        if is_serialisable(manifest):
+            update_manifest(self.run_arguments.folders.state, key, manifest)
+
+        return result
+
+    def read_groups(self, group_files):
+        """Returns the task groups in the tasks folder. Only files that changed since the
+        last execution are parsed, with the rest taken from the `.sayn` folder"""
+        cache = get_group_cache(self.run_arguments.folders.state, __version__)
+        file_hashes = {
+            name: self.get_file_hash(path) for name, path in group_files.items()
+        }
+        changed = {
+            name: path
+            for name, path in group_files.items()
+            if cache.get(name, dict()).get("hash") != file_hashes[name]
+        }
+        parsed = read_groups(self.project_root, changed)
+
+        updated_cache = dict()
+        groups = dict()
+        for name in group_files.keys():
+            if name in parsed:
+                groups[name] = parsed[name]
+                content = groups[name].dict()
+                if is_serialisable(content):
+                    updated_cache[name] = {"hash": file_hashes[name], "group": content}
+            else:
+                groups[name] = TaskGroupFile(**cache[name]["group"])
+                updated_cache[name] = cache[name]
+
+        if updated_cache != cache:
+            update_group_cache(
+                self.run_arguments.folders.state, __version__, updated_cache
+            )
+
+        return groups
+
+    def get_manifest_key(self, group_files):
+        """Returns a hash of everything that can affect the task definitions: the project
+        and group files, the project parameters (usable in autogroup globs) and the list
+        of files in the sql folders"""
+        key = sha256(
+            orjson.dumps(
+                {
+                    "version": __version__,
+                    "folders": {
+                        "sql": self.run_arguments.folders.sql,
+                        "tests": self.run_arguments.folders.tests,
+                    },
+                    "parameters": self.project_parameters,
+                },
+                default=str,
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+            )
+        )
+
+        for path in [self.project_root / "project.yaml"] + [
+            group_files[name] for name in sorted(group_files.keys())
+        ]:
+            key.update(str(path).encode())
+            key.update(path.read_bytes())
+
+        folders = {self.run_arguments.folders.sql, self.run_arguments.folders.tests}
+        for folder in sorted(folders):
+            for file_name in sorted(self.get_file_index(folder).files):
+                key.update(str(Path(folder, file_name)).encode())
+
+        return key.hexdigest()
+
+    def get_file_index(self, folder):
+        """Returns the index of the files in the folder, scanned once per execution"""
+        if folder not in self.file_indexes:
+            self.file_indexes[folder] = FileIndex(folder)
+
+        return self.file_indexes[folder]
+
     def get_task_class(self, task_type, config):
         if task_type == "python_module":
             return Ok(config.pop("task_class"))
         elif task_type == "python":
             return self.python_loader.get_class("python_tasks", config.get("class"))
         elif task_type in _creators:
-            return Ok(_creators[task_type])
+            module_name, class_name = _creators[task_type]
+            module = import_module(f"..tasks.{module_name}", __package__)
+            return Ok(getattr(module, class_name))
         else:
             return Err(
                 "task_type",
@@ -352,58 +571,74 @@ class App:
         if len(tasks) == 0:
             self.finish_app(Err("dag", "empty_dag"))
 
-        for task_name, task in tasks.items():
-            task_tracker = self.tracker.get_task_tracker(task_name)
-            task_tracker._report_event("start_stage")
-            start_ts = datetime.now()
+        # Tasks with the same definition as in the previous execution don't need to go
+        # through the config stage unless they're in the task query
+        definitions = {
+            task_name: self.get_task_definition(task)
+            for task_name, task in tasks.items()
+        }
+        cache_key = self.get_config_cache_key()
+        config_cache = get_config_cache(self.run_arguments.folders.state, cache_key)
+        cached = {
+            task_name: config_cache[task_name]
+            for task_name, definition in definitions.items()
+            if definition is not None
+            and config_cache.get(task_name, dict()).get("definition") == definition
+            and all(
+                self.get_file_hash(path) == file_hash
+                for path, file_hash in config_cache[task_name]
+                .get("dependencies", dict())
+                .items()
+            )
+        }
 
-            result = self.get_task_class(task["type"], task)
-            if result.is_err:
-                task_class = None
-                result_error = result
-                failed_tasks.append(task_name)
-            else:
-                task_class = result.value
-                result_error = None
-
-            task_objects[task_name] = TaskWrapper(
-                task["group"],
-                task_name,
-                task["type"],
-                task.get("on_fail"),
-                task.get("parents"),
-                task.get("sources"),
-                task.get("outputs"),
-                task.get("tags"),
-                task_tracker,
-                task_class,
-                self.connections,
-                self.default_db,
-                self.run_arguments,
-                self.compiler,
-                self.db_object_compiler,
-            )
-
-            if task_class is None:
-                task_tracker._report_event(
-                    "finish_stage",
-                    duration=datetime.now() - start_ts,
-                    result=result_error,
-                )
+        if (
+            len(self.run_arguments.include) == 0
+            and len(self.run_arguments.exclude) == 0
+        ):
+            # All tasks need to be configured
+            cached = dict()
 
-            else:
-                result = task_objects[task_name].config(
-                    task,
-                    self.project_parameters,
-                    task.get("parameters"),
-                )
+        metadata = dict()
 
-                if result.is_err:
+        def config_tasks(task_names):
+            configured = self.config_tasks(
+                {task_name: tasks[task_name] for task_name in task_names}
+            )
+            for task_name, task_object in configured.items():
+                task_objects[task_name] = task_object
+                if task_object.status == TaskStatus.FAILED:
                     failed_tasks.append(task_name)
+                else:
+                    metadata[task_name] = task_object.config_metadata()
+
+        config_tasks(
+            [task_name for task_name in tasks.keys() if task_name not in cached]
+        )
+
+        if len(failed_tasks) == 0 and len(cached) > 0:
+            # Cached tasks required by the query are configured
+            required = [
+                task_name
+                for task_name in self.get_tasks_in_query(
+                    tasks, dict(metadata, **cached)
+                )
+                if task_name in cached
+            ]
+            for task_name in required:
+                del cached[task_name]
+            config_tasks(required)
 
-                task_tracker._report_event(
-                    "finish_stage", duration=datetime.now() - start_ts, result=result
+            for task_name in cached.keys():
+                task_objects[task_name] = self.get_task_wrapper(
+                    task_name, tasks[task_name]
                 )
+                task_objects[task_name].config_from_cache(cached[task_name])
+
+        # Keep the original order of tasks
+        task_objects = {
+            task_name: task_objects[task_name] for task_name in tasks.keys()
+        }
 
         if len(failed_tasks) > 0:
             # If any tasks fail to do config, we can't ensure the DAG is correct, so we abort
@@ -414,6 +649,33 @@ class App:
 
             self.finish_app()
 
+        if len(metadata) > 0:
+            result = update_config_cache(
+                self.run_arguments.folders.state,
+                cache_key,
+                {
+                    task_name: dict(
+                        metadata[task_name],
+                        definition=definitions[task_name],
+                        dependencies={
+                            path: self.get_file_hash(path)
+                            for path in metadata[task_name]["dependencies"]
+                        },
+                    )
+                    if task_name in metadata
+                    else cached[task_name]
+                    for task_name in tasks.keys()
+                    if definitions[task_name] is not None
+                },
+            )
+            if result.is_err:
+                self.tracker.report_event(
+                    event="message",
+                    level="warning",
+                    message="Unable to store the config cache: "
+                    f"{result.error.details.get('exception')}",
+                )
+
         # Now that all tasks are configured, we set the relationships so that we
         # can calculate the dag
         output_to_task = [
@@ -442,9 +704,173 @@ class App:
             topo_sort = topo_sort.value
 
         self.tasks = {task_name: task_objects[task_name] for task_name in topo_sort}
+        self.dag_index = DagIndex(self.dag, topo_sort)
 
         return Ok()
 
+    def get_task_wrapper(self, task_name, task, task_class=None):
+        return TaskWrapper(
+            task["group"],
+            task_name,
+            task["type"],
+            task.get("on_fail"),
+            task.get("parents"),
+            task.get("sources"),
+            task.get("outputs"),
+            task.get("tags"),
+            self.tracker.get_task_tracker(task_name),
+            task_class,
+            self.connections,
+            self.default_db,
+            self.run_arguments,
+            self.compiler,
+            self.db_object_compiler,
+            self.compile_output,
+        )
+
+    def config_tasks(self, tasks):
+        """Runs the config stage of the tasks, returning the task objects in the same
+        order. Tasks are configured one at a time: config is CPU bound, so threads don't
+        speed it up, and the config of python tasks runs user code that may not be
+        thread safe."""
+        return {
+            task_name: self.config_task(task_name, task)
+            for task_name, task in tasks.items()
+        }
+
+    def config_task(self, task_name, task):
+        start_ts = datetime.now()
+
+        result = self.get_task_class(task["type"], task)
+        if result.is_err:
+            task_object = self.get_task_wrapper(task_name, task)
+        else:
+            task_object = self.get_task_wrapper(task_name, task, result.value)
+
+        task_object.tracker._report_event("start_stage")
+
+        if result.is_ok:
+            result = task_object.config(
+                task,
+                self.project_parameters,
+                task.get("parameters"),
+            )
+
+            if result.is_err:
+                task_object.status = TaskStatus.FAILED
+
+        task_object.tracker._report_event(
+            "finish_stage", duration=datetime.now() - start_ts, result=result
+        )
+
+        return task_object
+
+    def get_task_definition(self, task):
+        """Returns a hash of the definition of a task, including the content of its sql
+        file, or None if the task config can't be cached (ie: python tasks)"""
+        if task["type"] in ("python", "python_module"):
+            return None
+
+        try:
+            definition = sha256(
+                orjson.dumps(
+                    task,
+                    default=str,
+                    option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+                )
+            )
+            sql_index = self.get_file_index(self.run_arguments.folders.sql)
+            if task.get("file_name") is not None and sql_index.is_file(
+                task["file_name"]
+            ):
+                path = Path(self.run_arguments.folders.sql, task["file_name"])
+                definition.update(path.read_bytes())
+        except (TypeError, OSError):
+            return None
+
+        return definition.hexdigest()
+
+    def get_config_cache_key(self):
+        """Returns a hash of everything outside of the task definitions that can affect
+        the config stage: project settings and the arguments available to templates
+        (`full_load`, `start_dt` and `end_dt`). Files included or imported from
+        templates are tracked per task (see `TaskCompiler.get_dependencies`)."""
+        key = sha256(
+            orjson.dumps(
+                {
+                    "version": __version__,
+                    "command": self.run_arguments.command.value,
+                    "with_tests": self.run_arguments.with_tests,
+                    "full_load": self.run_arguments.full_load,
+                    "start_dt": self.run_arguments.start_dt,
+                    "end_dt": self.run_arguments.end_dt,
+                    "is_prod": self.run_arguments.is_prod,
+                    "parameters": self.project_parameters,
+                    "prod_parameters": self.prod_project_parameters,
+                    "stringify": self.input_stringify,
+                    "prod_stringify": self.input_prod_stringify,
+                    "from_prod": self.from_prod,
+                    "default_db": self.default_db,
+                    "connections": {
+                        n: c.db_type if isinstance(c, Database) else "api"
+                        for n, c in self.connections.items()
+                    },
+                },
+                default=str,
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+            )
+        )
+
+        return key.hexdigest()
+
+    def get_file_hash(self, path):
+        """Returns a hash of the content of a file or None if it can't be read. Hashes are
+        calculated once per execution, as files like macros are shared between tasks"""
+        if path not in self.file_hashes:
+            try:
+                self.file_hashes[path] = sha256(Path(path).read_bytes()).hexdigest()
+            except OSError:
+                self.file_hashes[path] = None
+
+        return self.file_hashes[path]
+
+    def get_tasks_in_query(self, tasks, metadata):
+        """Returns the tasks selected by the task query using the metadata from the
+        config stage, or all tasks if the query can't be resolved"""
+        dag = {
+            task_name: list(task_metadata["parents"])
+            for task_name, task_metadata in metadata.items()
+        }
+        output_to_task = dict()
+        for task_name, task_metadata in metadata.items():
+            for output in task_metadata["outputs"]:
+                output_to_task.setdefault(tuple(output), list()).append(task_name)
+        for task_name, task_metadata in metadata.items():
+            for source in task_metadata["sources"]:
+                for parent in output_to_task.get(tuple(source), list()):
+                    if parent not in dag[task_name]:
+                        dag[task_name].append(parent)
+
+        task_query = get_query(
+            {
+                task_name: {
+                    "group": tasks[task_name]["group"],
+                    "tags": task_metadata["tags"],
+                }
+                for task_name, task_metadata in metadata.items()
+            },
+            include=self.run_arguments.include,
+            exclude=self.run_arguments.exclude,
+        )
+        if task_query.is_err:
+            return list(tasks.keys())
+
+        tasks_in_query = dag_query(dag, task_query.value)
+        if tasks_in_query.is_err:
+            return list(tasks.keys())
+
+        return tasks_in_query.value
+
     def setup_execution(self):
         # Apply the task query
         tasks_dict = {
@@ -459,7 +885,7 @@ class App:
             )
         )
 
-        result = dag_query(self.dag, self.task_query)
+        result = dag_query(self.dag, self.task_query, self.dag_index)
         if result.is_err:
             return result
         else:
@@ -541,18 +967,42 @@ class App:
             )
         }
 
+        self.sources_from_prod = sources_from_prod
+
+        if self.run_arguments.queue is not None and not self.run_arguments.changed_only:
+            # Tasks are setup and executed by the workers. With --changed-only the
+            # outputs are still introspected to skip unchanged tasks.
+            exec_connections = set()
+
+        if self.run_arguments.pipeline or self.run_arguments.queue is not None:
+            # Connections are prepared in the background and each task waits only
+            # for the connections it uses before running its setup
+            self.connection_pool = ThreadPoolExecutor(
+                max_workers=max(len(exec_connections), 1)
+            )
+            self.connection_futures = {
+                connection_name: self.connection_pool.submit(
+                    self.prepare_connection,
+                    connection_name,
+                    to_introspect.get(connection_name),
+                )
+                for connection_name in exec_connections
+            }
+
+            self.tracker.set_tasks(tasks_in_query)
+            for task_order, task_name in enumerate(tasks_in_query):
+                task = self.tasks[task_name]
+                task.tracker._task_order = task_order + 1
+                task.in_query = True
+
+            return Ok()
+
         for connection_name in exec_connections:
-            db = self.connections[connection_name]
-            if isinstance(db, Database):
-                try:
-                    db._activate_connection()  # This call creates the engine and tests the connection
-                except Exception as exc:
-                    return Exc(exc, where="create_connection")
-                if connection_name in to_introspect:
-                    try:
-                        db._introspect(to_introspect[connection_name])
-                    except Exception as exc:
-                        return Err("database", "introspection", exception=exc)
+            result = self.prepare_connection(
+                connection_name, to_introspect.get(connection_name)
+            )
+            if result.is_err:
+                return result
 
         self.tracker.set_tasks(tasks_in_query)
 
@@ -574,7 +1024,8 @@ class App:
 
             task.tracker._report_event("start_stage")
 
-            result = task.setup(task_name in tasks_in_query, sources_from_prod)
+            with self.profile("task setup"):
+                result = task.setup(task_name in tasks_in_query, sources_from_prod)
 
             task.tracker._report_event(
                 "finish_stage", duration=datetime.now() - start_ts, result=result
@@ -582,6 +1033,38 @@ class App:
 
         return Ok()
 
+    def prepare_connection(self, connection_name, to_introspect):
+        """Creates the engine for the connection and introspects the objects used in the
+        execution"""
+        db = self.connections[connection_name]
+        if isinstance(db, Database):
+            try:
+                with self.profile("connection activation"):
+                    db._activate_connection()  # This call creates the engine and tests the connection
+            except Exception as exc:
+                return Exc(exc, where="create_connection")
+            if to_introspect is not None:
+                try:
+                    with self.profile("introspection"):
+                        db._introspect(to_introspect)
+                except Exception as exc:
+                    return Err("database", "introspection", exception=exc)
+
+        return Ok()
+
+    def setup_task(self, task):
+        """In pipelined mode, waits for the connections used by the task to be ready
+        and runs its setup"""
+        for connection_name in sorted(task.used_connections):
+            if connection_name in self.connection_futures:
+                result = self.connection_futures[connection_name].result()
+                if result.is_err:
+                    task.status = TaskStatus.SETUP_FAILED
+                    return result
+
+        with self.profile("task setup"):
+            return task.setup(True, self.sources_from_prod)
+
     # Commands
 
     def check_abort(self, result):
@@ -614,37 +1097,138 @@ class App:
         self.tracker.start_stage(
             self.run_arguments.command.value, tasks=list(tasks_in_query.keys())
         )
-        interrupt_flag = False
 
-        for task in self.tasks.values():
-            if not task.in_query:
-                continue
+        if self.run_arguments.command not in (
+            Command.RUN,
+            Command.COMPILE,
+            Command.TEST,
+        ):
+            self.finish_app(error=Err("cli", "wrong_command"))
 
-            if interrupt_flag:
-                task.fail_fast = True
+        self.interrupt_flag = False
+        self.task_durations = dict()
+        self.run_state_lock = Lock()
+        prune_run_statuses(self.run_arguments.folders.state)
 
-            # We force the run/compile so that the skipped status can be calculated,
-            # but we only report if the task is in the query
-            # if task.in_query:
-            task.tracker._report_event("start_stage")
-            start_ts = datetime.now()
+        if (
+            self.run_arguments.command == Command.RUN
+            and self.run_arguments.changed_only
+        ):
+            self.calculate_fingerprints()
+            self.task_fingerprints = get_task_fingerprints(
+                self.run_arguments.folders.state
+            )
 
-            if self.run_arguments.command == Command.RUN:
-                result = task.run()
-            elif self.run_arguments.command == Command.COMPILE:
-                result = task.compile()
-            elif self.run_arguments.command == Command.TEST:
-                result = task.test()
+        executor = DagExecutor(
+            self.tasks,
+            self.run_arguments.threads,
+            self.max_concurrency,
+            get_task_durations(
+                self.run_arguments.folders.state, self.run_arguments.command.value
+            ),
+        )
+        if self.run_arguments.queue is not None:
+            self.task_queue = create_queue(self.run_arguments.queue)
+            self.task_queue.start_run(self.run_id, self.get_worker_arguments())
+            self.queue_waiter = QueueWaiter(
+                self.task_queue, self.run_id, timeout=self.run_arguments.queue_timeout
+            )
+        else:
+            # Processes take a while to configure the project, so they're started
+            # before the execution
+            n_process_tasks = len(
+                [t for t in tasks_in_query.values() if t.executor == "process"]
+            )
+            if n_process_tasks > 0:
+                self.get_process_pool().start(
+                    min(self.run_arguments.threads or 1, n_process_tasks)
+                )
+
+        executor.execute(self.execute_task)
+
+        if self.task_queue is not None:
+            self.queue_waiter.close()
+            self.task_queue.finish_run(self.run_id)
+            self.task_queue.close()
+
+        if self.compile_output is not None:
+            self.flush_compile_output()
+            result = update_compile_output(
+                self.run_arguments.folders.state,
+                self.run_arguments.folders.compile,
+                self.compile_output.prune(self.tasks.keys()),
+            )
+            if result.is_err:
+                self.tracker.report_event(
+                    event="message",
+                    level="warning",
+                    message="Unable to store the compile folder state: "
+                    f"{result.error.details.get('exception')}",
+                )
+
+        self.cleanup()
+
+        result = self.store_run_statuses()
+        if result.is_err:
+            self.tracker.report_event(
+                event="message",
+                level="warning",
+                message="Unable to store task statuses: "
+                f"{result.error.details.get('exception')}",
+            )
+
+        if self.run_arguments.command == Command.RUN:
+            if self.run_arguments.changed_only:
+                succeeded = {
+                    k: v.fingerprint
+                    for k, v in tasks_in_query.items()
+                    if v.status == TaskStatus.SUCCEEDED and v.fingerprint is not None
+                }
+                invalidated = [
+                    k
+                    for k, v in tasks_in_query.items()
+                    if v.status in (TaskStatus.FAILED, TaskStatus.SETUP_FAILED)
+                    or v.fingerprint is None
+                ]
             else:
-                self.finish_app(error=Err("cli", "wrong_command"))
+                # Fingerprints are only calculated with --changed-only, so the ones of
+                # the tasks executed are no longer valid
+                succeeded = dict()
+                invalidated = [
+                    k
+                    for k, v in tasks_in_query.items()
+                    if v.status
+                    in (
+                        TaskStatus.SUCCEEDED,
+                        TaskStatus.FAILED,
+                        TaskStatus.SETUP_FAILED,
+                    )
+                ]
 
-            if task.in_query:
-                task.tracker._report_event(
-                    "finish_stage", duration=datetime.now() - start_ts, result=result
+            result = update_task_fingerprints(
+                self.run_arguments.folders.state, succeeded, invalidated
+            )
+            if result.is_err:
+                self.tracker.report_event(
+                    event="message",
+                    level="warning",
+                    message="Unable to store task fingerprints: "
+                    f"{result.error.details.get('exception')}",
                 )
 
-            if self.run_arguments.fail_fast and result.is_err:
-                interrupt_flag = True
+        # Durations are used to prioritise long running branches in future executions
+        result = update_task_durations(
+            self.run_arguments.folders.state,
+            self.run_arguments.command.value,
+            self.task_durations,
+        )
+        if result.is_err:
+            self.tracker.report_event(
+                event="message",
+                level="warning",
+                message="Unable to store task durations: "
+                f"{result.error.details.get('exception')}",
+            )
 
         self.tracker.finish_current_stage(
             tasks={k: v.status for k, v in tasks_in_query.items()},
@@ -653,8 +1237,251 @@ class App:
 
         self.finish_app()
 
+    def get_resumed_tasks(self):
+        """Returns the tasks that succeeded in the run being resumed"""
+        if self.run_arguments.resume is None:
+            return set()
+
+        state = get_run_statuses(
+            self.run_arguments.folders.state, self.run_arguments.resume
+        )
+        if state is None:
+            self.finish_app(
+                error=Err(
+                    "cli",
+                    "wrong_resume",
+                    error_message=f'No state found for run "{self.run_arguments.resume}"',
+                )
+            )
+        elif state["command"] != self.run_arguments.command.value:
+            self.finish_app(
+                error=Err(
+                    "cli",
+                    "wrong_resume",
+                    error_message=f'Run "{self.run_arguments.resume}" was a '
+                    f'"{state["command"]}" command and can\'t be resumed with '
+                    f'"{self.run_arguments.command.value}"',
+                )
+            )
+
+        return {
+            name
+            for name, status in state["tasks"].items()
+            if status == TaskStatus.SUCCEEDED.value
+        }
+
+    def calculate_fingerprints(self):
+        """Calculates the fingerprint of every task in topological order, so that the
+        fingerprints of the parents are always available to their children"""
+        for task in self.tasks.values():
+            task.calculate_fingerprint()
+
+    def is_unchanged(self, task):
+        """Indicates if the task and all its ancestors are the same as in the last
+        successful run of the task, so it doesn't need to be executed again."""
+        if not self.run_arguments.changed_only:
+            return False
+
+        return (
+            task.fingerprint is not None
+            and self.task_fingerprints.get(task.name) == task.fingerprint
+            # Failures on parents follow the normal skip logic
+            and task.check_skip().is_ok
+            # Objects dropped since the last run need to be created again
+            and self.outputs_exist(task)
+        )
+
+    def outputs_exist(self, task):
+        """Checks that the objects created by the task exist, using the introspection
+        done before the execution"""
+        for output in task.outputs:
+            if output.connection_name in self.connection_futures:
+                # In pipelined mode the introspection runs in the background
+                result = self.connection_futures[output.connection_name].result()
+                if result.is_err:
+                    return False
+
+            db = self.connections.get(output.connection_name)
+            if not isinstance(db, Database):
+                continue
+
+            obj = self.db_object_compiler.out_obj(output)
+            if not db._object_exists(obj.table, obj.schema, obj.database):
+                return False
+
+        return True
+
+    def store_run_statuses(self):
+        return update_run_statuses(
+            self.run_arguments.folders.state,
+            self.run_id,
+            self.run_arguments.command.value,
+            {k: v.status.value for k, v in self.tasks.items() if v.in_query},
+        )
+
+    def store_task_status(self, task):
+        # Stored after every task so that the run can be resumed even if the process
+        # is interrupted. The log is compacted by `store_run_statuses` at the end.
+        with self.run_state_lock:
+            return append_run_status(
+                self.run_arguments.folders.state,
+                self.run_id,
+                self.run_arguments.command.value,
+                task.name,
+                task.status.value,
+            )
+
+    def execute_task(self, task):
+        if self.interrupt_flag:
+            task.fail_fast = True
+
+        task.tracker._report_event("start_stage")
+        start_ts = datetime.now()
+
+        # Tasks not executed count as succeeded to allow their descendants to run
+        executed = False
+        if task.name in self.resumed_tasks:
+            task.status = TaskStatus.SUCCEEDED
+            task.tracker.info(f"Succeeded in run {self.run_arguments.resume}")
+            result = Ok()
+        elif self.is_unchanged(task):
+            task.status = TaskStatus.SUCCEEDED
+            task.tracker.info("No changes since the last successful run")
+            result = Ok()
+        else:
+            executed = True
+            result = self.run_task_command(task)
+
+        def finish_task(result):
+            duration = datetime.now() - start_ts
+            task.tracker._report_event("finish_stage", duration=duration, result=result)
+
+            if task.status == TaskStatus.SUCCEEDED and executed:
+                self.task_durations[task.name] = duration.total_seconds()
+
+            if self.run_arguments.fail_fast and result.is_err:
+                self.interrupt_flag = True
+
+            self.store_task_status(task)
+
+            return result
+
+        # Async tasks return a Deferred result, finished once the coroutine is done
+        return then(result, finish_task)
+
+    def run_task_command(self, task):
+        if self.task_queue is not None:
+            return self.run_in_worker(task)
+
+        if self.run_arguments.pipeline and task.status == TaskStatus.READY_FOR_SETUP:
+            result = self.setup_task(task)
+            if result.is_err:
+                return result
+
+        if task.executor == "process":
+            task.process_pool = self.get_process_pool()
+
+        if self.run_arguments.command == Command.RUN:
+            return task.run()
+        elif self.run_arguments.command == Command.COMPILE:
+            return task.compile()
+        else:
+            return task.test()
+
+    def get_process_pool(self):
+        """Returns the processes executing the tasks with `executor: process`"""
+        with self.process_pool_lock:
+            if self.process_pool is None:
+                self.process_pool = ProcessPool(self.get_worker_arguments())
+
+            return self.process_pool
+
+    # Worker mode
+
+    def get_worker_arguments(self):
+        """Arguments stored in the queue for the workers to configure the project as
+        the coordinator did"""
+        return {
+            "run_id": str(self.run_id),
+            "command": self.run_arguments.command.value,
+            "include": sorted(self.run_arguments.include),
+            "exclude": sorted(self.run_arguments.exclude),
+            "upstream_prod": self.run_arguments.upstream_prod,
+            "profile": self.run_arguments.profile,
+            "full_load": self.run_arguments.full_load,
+            "start_dt": self.run_arguments.start_dt.isoformat(),
+            "end_dt": self.run_arguments.end_dt.isoformat(),
+            "with_tests": self.run_arguments.with_tests,
+        }
+
+    def run_in_worker(self, task):
+        """Publishes the task to the queue and waits for a worker to execute it"""
+        result = task.check_skip()
+        if result.is_err or result.value == TaskStatus.SKIPPED:
+            return result
+
+        self.task_queue.publish(self.run_id, task.name)
+
+        # Tasks wait in the queue without holding a thread, so all ready tasks are
+        # published and a single thread polls the queue for their status
+        def set_status(value):
+            status, error_message = value
+            task.status = TaskStatus(status)
+            if task.status == TaskStatus.SUCCEEDED:
+                return Ok()
+            else:
+                return Err(
+                    "worker",
+                    "task_failed",
+                    error_message=f"Failed in worker: {error_message}",
+                )
+
+        return Deferred(self.queue_waiter.wait(task.name), set_status)
+
+    def execute_worker_task(self, task_name):
+        """Sets up and executes a task claimed from the queue by `sayn worker`"""
+        task = self.tasks.get(task_name)
+        if task is None or not task.in_query:
+            return Err(
+                "worker",
+                "unknown_task",
+                error_message=f'Task "{task_name}" is not in the worker\'s task query',
+            )
+
+        task.tracker._report_event("start_stage")
+        start_ts = datetime.now()
+
+        result = resolve(self.run_task_command(task))
+
+        task.tracker._report_event(
+            "finish_stage", duration=datetime.now() - start_ts, result=result
+        )
+
+        return result
+
+    def cleanup(self):
+        """Stops the threads and processes used during the execution and closes the
+        connections to the databases"""
+        if self.connection_pool is not None:
+            self.connection_pool.shutdown()
+
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
+
+        for connection in self.connections.values():
+            # Connections not activated (eg: not used by any task) have no engine
+            engine = getattr(connection, "engine", None)
+            if isinstance(connection, Database) and engine is not None:
+                engine.dispose()
+
     def finish_app(self, error=None):
         duration = datetime.now() - self.app_start_ts
+        if self.compile_output is not None:
+            self.flush_compile_output()
+
+        if self.run_arguments.profile_startup:
+            self.report_startup_profile()
+
         if self.run_arguments.fail_fast and error is not None:
             self.tracker.report_event(
                 event="finish_stage",
@@ -693,10 +1520,24 @@ class App:
     def cleanup_compilation(self):
         folder = self.run_arguments.folders.compile
         compile_path = Path(folder)
-        if compile_path.exists():
-            if compile_path.is_dir():
-                shutil.rmtree(compile_path.absolute())
-            else:
-                compile_path.unlink()
+        previous = get_compile_output(self.run_arguments.folders.state, folder)
+        if compile_path.exists() and not compile_path.is_dir():
+            compile_path.unlink()
+        elif compile_path.exists() and previous is None:
+            # The files in the folder are unknown, so we start from an empty folder
+            shutil.rmtree(compile_path.absolute())
+
+        compile_path.mkdir(exist_ok=True)
+
+        # Files are only written when they change and stale files are removed at the end
+        self.compile_output = CompileOutput(
+            folder, self.run_arguments.command.value, previous
+        )
 
-        compile_path.mkdir()
+    def flush_compile_output(self):
+        for exc in self.compile_output.flush():
+            self.tracker.report_event(
+                event="message",
+                level="warning",
+                message=f"Unable to write to the compile folder: {exc}",
+            )
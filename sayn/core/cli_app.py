@@ -0,0 +1,176 @@
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from uuid import UUID
+
+from ..logging import ConsoleLogger, FancyLogger, FileLogger
+from ..tasks.task import TaskStatus
+from .app import App, Command
+
+yesterday = date.today() - timedelta(days=1)
+
+
+class CliApp(App):
+    def __init__(
+        self,
+        command,
+        debug=False,
+        include=None,
+        exclude=None,
+        upstream_prod=False,
+        profile=None,
+        full_load=False,
+        start_dt=None,
+        end_dt=None,
+        with_tests=False,
+        fail_fast=False,
+        threads=None,
+        resume=None,
+        changed_only=False,
+        pipeline=False,
+        queue=None,
+        queue_timeout=None,
+        profile_startup=False,
+        import_duration=None,
+        run_id=None,
+    ):
+        super().__init__(run_id)
+
+        if import_duration is not None:
+            self.startup_profile["imports"] = import_duration
+
+        # STARTING APP: register loggers and set cli arguments in the App object
+        self.run_arguments.command = command
+
+        if debug:
+            self.run_arguments.debug = debug
+        else:
+            self.tracker.remove_logger(ConsoleLogger)
+            self.tracker.register_logger(FancyLogger())
+
+        self.tracker.register_logger(
+            FileLogger(
+                self.run_arguments.folders.logs,
+                format=f"{self.run_id}|" + "%(asctime)s|%(levelname)s|%(message)s",
+            )
+        )
+
+        if start_dt is not None:
+            self.run_arguments.dates_specified = True
+            self.run_arguments.start_dt = start_dt.date()
+        else:
+            self.run_arguments.start_dt = yesterday
+
+        if end_dt is not None:
+            self.run_arguments.dates_specified = True
+            self.run_arguments.end_dt = end_dt.date()
+        else:
+            end_dt = yesterday
+            self.run_arguments.end_dt = yesterday
+
+        self.run_arguments.profile = profile
+        self.run_arguments.full_load = full_load
+
+        if include is not None:
+            self.run_arguments.include = set(include)
+
+        if exclude is not None:
+            self.run_arguments.exclude = set(exclude)
+
+        if upstream_prod is not None:
+            self.run_arguments.upstream_prod = upstream_prod
+
+        if with_tests is not None:
+            self.run_arguments.with_tests = with_tests
+
+        if fail_fast is not None:
+            self.run_arguments.fail_fast = fail_fast
+
+        if threads is not None:
+            self.run_arguments.threads = threads
+
+        if resume is not None:
+            self.run_arguments.resume = str(resume)
+
+        if changed_only is not None:
+            self.run_arguments.changed_only = changed_only
+
+        if pipeline is not None:
+            self.run_arguments.pipeline = pipeline
+
+        if queue is not None:
+            self.run_arguments.queue = queue
+
+        if queue_timeout is not None:
+            self.run_arguments.queue_timeout = queue_timeout
+
+        if profile_startup is not None:
+            self.run_arguments.profile_startup = profile_startup
+
+        self.start_app()
+
+
+class WorkerApp(CliApp):
+    """App executing tasks claimed from the queue by `sayn worker`, configured with the
+    arguments of the run that published them and reporting events with its run ID"""
+
+    def __init__(self, arguments, debug=False, threads=1):
+        super().__init__(
+            Command(arguments["command"]),
+            debug,
+            arguments["include"],
+            arguments["exclude"],
+            arguments["upstream_prod"],
+            arguments["profile"],
+            arguments["full_load"],
+            datetime.fromisoformat(arguments["start_dt"]),
+            datetime.fromisoformat(arguments["end_dt"]),
+            arguments["with_tests"],
+            threads=threads,
+            pipeline=True,
+            run_id=UUID(arguments["run_id"]),
+        )
+
+        self.tracker.start_stage(
+            self.run_arguments.command.value,
+            tasks=[k for k, v in self.tasks.items() if v.in_query],
+        )
+
+    def finish(self):
+        """Reports the tasks executed by the worker and closes the connections once
+        the worker is done with the run"""
+        self.tracker.finish_current_stage(
+            tasks={
+                k: v.status
+                for k, v in self.tasks.items()
+                if v.status
+                in (
+                    TaskStatus.SUCCEEDED,
+                    TaskStatus.FAILED,
+                    TaskStatus.SETUP_FAILED,
+                    TaskStatus.SKIPPED,
+                )
+            }
+        )
+        self.cleanup()
+
+        try:
+            self.finish_app()
+        except SystemExit:
+            # The worker keeps running after the run
+            pass
+
+    def cleanup_compilation(self):
+        # The compile folder is shared with the coordinator and other workers
+        Path(self.run_arguments.folders.compile).mkdir(parents=True, exist_ok=True)
+
+
+class ProcessApp(WorkerApp):
+    """App configured by the processes executing tasks with `executor: process`. The
+    events of the tasks are sent to the parent process, so no loggers are used."""
+
+    def __init__(self, arguments):
+        super().__init__(arguments, debug=True)
+
+    def start_app(self):
+        self.tracker.loggers = list()
+        super().start_app()
@@ -129,6 +129,10 @@ class SaynMissingFileError(SaynError):
         self.file_name = filename
         self.is_folder = is_folder
 
+    def __reduce__(self):
+        # Errors raised in worker processes need to be pickled
+        return (SaynMissingFileError, (self.file_name, self.is_folder))
+
     def payload(self):
         return {
             "kind": "missing_file",
@@ -145,6 +149,9 @@ class SaynParsingError(SaynError):
         self.code = code
         self.errors = errors
 
+    def __reduce__(self):
+        return (SaynParsingError, (self.code, self.errors))
+
     def payload(self):
         # Sort by file_name to compress the message output
         sorted_errors = sorted(self.errors, key=lambda x: x["file_name"])
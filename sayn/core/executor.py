@@ -0,0 +1,301 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from threading import Lock, Thread
+import asyncio
+import os
+
+from .errors import Exc
+
+############################################
+# Event loop shared by all async tasks
+############################################
+
+_event_loop = None
+_event_loop_pid = None
+_event_loop_lock = Lock()
+
+
+def get_event_loop():
+    """Returns the event loop shared by all async tasks in the execution.
+
+    The loop runs forever in a background thread, so coroutines from any task can be
+    scheduled in it and their I/O overlaps regardless of the thread the task runs in.
+    A new loop is created if the process was forked since the loop was started.
+    """
+    global _event_loop, _event_loop_pid
+
+    with _event_loop_lock:
+        if _event_loop is None or _event_loop_pid != os.getpid():
+            _event_loop = asyncio.new_event_loop()
+            _event_loop_pid = os.getpid()
+            Thread(
+                target=_event_loop.run_forever, name="sayn-event-loop", daemon=True
+            ).start()
+
+        return _event_loop
+
+
+def run_coroutine(coroutine):
+    """Runs a coroutine in the shared event loop and waits for its result"""
+    return asyncio.run_coroutine_threadsafe(coroutine, get_event_loop()).result()
+
+
+async def _catch(coroutine):
+    try:
+        return await coroutine
+    except Exception as exc:
+        return Exc(exc)
+
+
+def defer_coroutine(coroutine):
+    """Schedules a coroutine in the shared event loop without waiting for it. Returns
+    a Deferred result, with exceptions raised by the coroutine returned as `Exc`."""
+    return Deferred(
+        asyncio.run_coroutine_threadsafe(_catch(coroutine), get_event_loop())
+    )
+
+
+############################################
+# Deferred results
+############################################
+
+
+class Deferred:
+    """The result of a task still executing outside of the thread that started it (eg:
+    a coroutine running in the event loop).
+
+    Once the future is done, `resume` passes its value to the callback, which finishes
+    the work and returns the result or another Deferred.
+
+    Attributes:
+        future (concurrent.futures.Future): the work being waited on.
+        callback (Callable[[Any], Any]): the continuation receiving the future value.
+    """
+
+    def __init__(self, future, callback=None):
+        self.future = future
+        self.callback = callback or (lambda value: value)
+
+    def resume(self):
+        return self.callback(self.future.result())
+
+
+def then(result, callback):
+    """Calls `callback(result)` or, if the result is Deferred, returns a Deferred that
+    calls it once the result is available"""
+    if isinstance(result, Deferred):
+        return Deferred(
+            result.future, lambda value: then(result.callback(value), callback)
+        )
+
+    return callback(result)
+
+
+def resolve(result):
+    """Waits for a Deferred result, returning the final result"""
+    while isinstance(result, Deferred):
+        result = result.resume()
+
+    return result
+
+
+class DagExecutor:
+    """Executes the tasks in a DAG as soon as their parents have finished.
+
+    Tasks are dispatched to a pool of `threads` workers the moment all their parents
+    reach a terminal state, so independent branches of the DAG execute concurrently.
+    With a single thread tasks run in the calling thread in topological order, which
+    matches the behaviour of a sequential execution.
+
+    Tasks not in the query are never dispatched, but they're still considered as
+    nodes in the DAG so that the order between their ancestors and descendants is
+    kept.
+
+    Connections can limit how many of the tasks using them run at the same time
+    (`max_concurrency` in the credentials). A ready task waits until all the
+    connections it uses have a free slot.
+
+    When running concurrently, ready tasks are dispatched in order of their critical
+    path: the longest chain of durations from the task to the end of the DAG, using
+    the durations from previous runs. This way slow branches start as early as
+    possible. Tasks without a previous duration are given the average duration.
+
+    `func` can return a Deferred result (eg: `async def` python tasks, which run in the
+    event loop shared by all tasks). The task then doesn't take a thread until the
+    deferred work is done and the rest of the task is resumed, so async tasks overlap
+    even with a single thread. They still count towards `max_concurrency`.
+
+    When tasks can run concurrently, the events produced by a task are buffered and sent
+    to the loggers in one go at the end of its execution so that the output of different
+    tasks is not interleaved. With a single thread this only happens while a deferred
+    task is pending.
+
+    Attributes:
+        tasks (Dict[str, TaskWrapper]): the tasks to execute, sorted topologically.
+        threads (int): the maximum number of tasks executing at the same time.
+        max_concurrency (Dict[str, int]): the maximum number of tasks executing at the
+          same time for each connection.
+        durations (Dict[str, float]): the duration in seconds of each task in
+          previous runs.
+    """
+
+    def __init__(self, tasks, threads=1, max_concurrency=None, durations=None):
+        self.tasks = tasks
+        self.threads = max(threads or 1, 1)
+        self.max_concurrency = max_concurrency or dict()
+
+        self.order = {name: i for i, name in enumerate(tasks.keys())}
+        self.children = {name: list() for name in tasks.keys()}
+        self.pending_parents = dict()
+        for name, task in tasks.items():
+            parents = {p.name for p in task.parents if p.name in tasks}
+            self.pending_parents[name] = parents
+            for parent in parents:
+                self.children[parent].append(name)
+
+        if self.threads > 1:
+            self.priority = self._critical_path(durations or dict())
+        else:
+            self.priority = {name: 0 for name in tasks.keys()}
+
+    def _critical_path(self, durations):
+        """Calculates the length of the longest path from each task to the end of the
+        DAG, weighting each task with its duration.
+        """
+        known = [
+            durations[n] for n, t in self.tasks.items() if t.in_query and n in durations
+        ]
+        default_duration = sum(known) / len(known) if len(known) > 0 else 1.0
+
+        priority = dict()
+        for name in reversed(list(self.tasks.keys())):
+            if not self.tasks[name].in_query:
+                duration = 0.0
+            else:
+                duration = durations.get(name, default_duration)
+
+            priority[name] = duration + max(
+                [priority[c] for c in self.children[name]], default=0.0
+            )
+
+        return priority
+
+    def execute(self, func):
+        """Executes `func(task)` for every task in the query respecting the DAG.
+
+        Args:
+          func (Callable[[TaskWrapper], Result]): the function that executes a task
+
+        Returns:
+          Dict[str, Result]: the result of each executed task
+        """
+        results = dict()
+        ready = list()
+
+        pending_parents = {k: set(v) for k, v in self.pending_parents.items()}
+
+        def release(names):
+            while len(names) > 0:
+                name = names.pop()
+                if self.tasks[name].in_query:
+                    ready.append(name)
+                else:
+                    # Tasks outside the query don't execute, but their children
+                    # still need to wait for the rest of their ancestors
+                    names.extend(unblocked_children(name))
+
+        def unblocked_children(name):
+            out = list()
+            for child in self.children[name]:
+                pending_parents[child].discard(name)
+                if len(pending_parents[child]) == 0:
+                    out.append(child)
+            return out
+
+        def finish(name):
+            release(unblocked_children(name))
+
+        release(
+            [name for name, parents in pending_parents.items() if len(parents) == 0]
+        )
+
+        connection_usage = {name: 0 for name in self.max_concurrency.keys()}
+        running = dict()
+        deferred = dict()
+
+        def complete(name, result):
+            tracker = self.tasks[name].tracker
+            if isinstance(result, Deferred):
+                # Other tasks can start while this one waits, so its output is held
+                tracker.start_buffer()
+                deferred[result.future] = (name, result)
+                return
+
+            tracker.flush_buffer()
+            for connection in self._limited_connections(name):
+                connection_usage[connection] -= 1
+
+            results[name] = result
+            finish(name)
+
+        pool_context = (
+            ThreadPoolExecutor(max_workers=self.threads)
+            if self.threads > 1
+            else nullcontext()
+        )
+        with pool_context as pool:
+            while len(ready) > 0 or len(running) > 0 or len(deferred) > 0:
+                # Deferred tasks are resumed as soon as their work is done
+                for future in [f for f in deferred.keys() if f.done()]:
+                    name, result = deferred.pop(future)
+                    if pool is None:
+                        complete(name, result.resume())
+                    else:
+                        running[pool.submit(result.resume)] = name
+
+                name = None
+                if len(running) < self.threads:
+                    # None if all ready tasks are waiting for a connection slot
+                    name = self._pop_next(ready, connection_usage)
+
+                if name is not None:
+                    for connection in self._limited_connections(name):
+                        connection_usage[connection] += 1
+
+                    task = self.tasks[name]
+                    if pool is None:
+                        if len(deferred) > 0:
+                            task.tracker.start_buffer()
+                        complete(name, func(task))
+                    else:
+                        task.tracker.start_buffer()
+                        running[pool.submit(func, task)] = name
+                    continue
+
+                # Nothing else can start until a task finishes
+                done, _ = wait(
+                    list(running.keys()) + list(deferred.keys()),
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    if future in running:
+                        complete(running.pop(future), future.result())
+
+        return results
+
+    def _limited_connections(self, name):
+        return {
+            c for c in self.tasks[name].used_connections if c in self.max_concurrency
+        }
+
+    def _pop_next(self, ready, connection_usage=None):
+        # Longest critical path first, using the topological order as tie breaker
+        for next_task in sorted(
+            ready, key=lambda x: (-self.priority[x], self.order[x])
+        ):
+            if connection_usage is None or all(
+                connection_usage[c] < self.max_concurrency[c]
+                for c in self._limited_connections(next_task)
+            ):
+                ready.remove(next_task)
+                return next_task
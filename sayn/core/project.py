@@ -1,8 +1,11 @@
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
+import multiprocessing
+import os
 from pathlib import Path
 from typing import Any, List, Mapping, Optional
 
-from pydantic import BaseModel, Field, validator, Extra
+from pydantic import BaseModel, Field, conint, validator, Extra
 from sayn.tasks.python import DecoratorTaskWrapper
 
 from ..utils.compiler import TaskJinjaEnv
@@ -18,6 +21,7 @@ class Project(BaseModel):
     parameters: Optional[Mapping[str, Any]]
     presets: Optional[Mapping[str, Mapping[str, Any]]]
     autogroups: Mapping[str, Any] = Field(dict(), alias="groups")
+    threads: Optional[conint(ge=1)]
 
     database_prefix: Optional[str]
     database_suffix: Optional[str]
@@ -80,19 +84,50 @@ class TaskGroupFile(BaseModel):
         anystr_lower = True
 
 
-def read_groups(project_root=Path(".")):
+def get_group_files(project_root=Path(".")):
+    """Returns a dictionary of group name to the path of its file in the tasks folder"""
     task_folder = project_root / "tasks"
     if task_folder.exists() and task_folder.is_dir():
-        out = dict()
-        for file in task_folder.glob("*.yaml"):
-            name = str(file.relative_to(task_folder))[:-5]
-            out[name] = read_yaml_file(file, TaskGroupFile)
-
-        return out
+        return {
+            str(file.relative_to(task_folder))[:-5]: file
+            for file in task_folder.glob("*.yaml")
+        }
     else:
         return dict()
 
 
+def read_group_file(file):
+    return read_yaml_file(file, TaskGroupFile)
+
+
+# Minimum number of group files to parse them in a process pool, as starting the
+# processes takes longer than parsing a few files
+_min_files_parallel = 16
+
+
+def read_groups(project_root=Path("."), group_files=None):
+    """Returns the parsed task group files in the tasks folder. Large numbers of files
+    are parsed concurrently in a process pool."""
+    if group_files is None:
+        group_files = get_group_files(project_root)
+
+    n_workers = min(os.cpu_count() or 1, len(group_files) // _min_files_parallel)
+    if n_workers < 2:
+        return {name: read_group_file(file) for name, file in group_files.items()}
+
+    # Errors are raised in the order of the files, as when parsing sequentially.
+    # Processes are spawned as forking copies the threads and locks of the parent
+    with ProcessPoolExecutor(
+        max_workers=n_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        groups = executor.map(
+            read_group_file,
+            group_files.values(),
+            chunksize=max(len(group_files) // (n_workers * 4), 1),
+        )
+        return dict(zip(group_files.keys(), groups))
+
+
 ###############################
 # Task related config functions
 ###############################
@@ -205,13 +240,101 @@ def get_task_dict(task, task_name, group_name, presets):
     return Ok(dict(task, name=task_name, group=group_name))
 
 
+def get_group_definition(group_name, group, presets):
+    """Returns the definition of a group in project.yaml merged with its preset"""
+    group_definition = {"group": group_name}
+    if "preset" in group:
+        preset_name = f"sayn_global:{group['preset']}"
+        if preset_name not in presets:
+            return Err("dag", "missing_preset", preset_name=preset_name)
+        group_definition.update(deepcopy(presets[preset_name]))
+
+    group_definition.update(group)
+
+    return Ok(group_definition)
+
+
+def get_python_group_tasks(
+    group_name, group_definition, presets, compiler, python_loader
+):
+    """Returns a tuple with the tasks defined with the task decorator in the module of
+    a python group and the errors found in them"""
+    group_definition["group"] = group_name
+    group_definition["type"] = "python_module"
+    if "module" not in group_definition:
+        return Err("task", "missing_module", group=group_name)
+    module_path = compiler.compile(
+        group_definition.pop("module", None),
+        task=TaskJinjaEnv(group=group_name),
+    )
+    result = python_loader.get_objects(
+        "python_tasks", module_path, DecoratorTaskWrapper
+    )
+    if result.is_err:
+        return result
+    else:
+        objects = result.value
+
+    tasks = dict()
+    errors = dict()
+    for task_obj in objects:
+        task_name = task_obj.func.__name__
+        task = deepcopy(group_definition)
+        task["name"] = task_name
+        task["task_class"] = task_obj
+
+        result = get_task_dict(task, task_name, group_name, presets)
+        if result.is_ok:
+            tasks[task_name] = result.value
+        else:
+            errors[task_name] = result.error
+
+    return Ok((tasks, errors))
+
+
+def get_python_tasks(global_presets, autogroups, compiler, python_loader):
+    """Returns the tasks in python groups defined in project.yaml. Used when the rest of
+    the tasks are taken from the project manifest, as python tasks need to be loaded
+    from their modules"""
+    result = get_presets(global_presets, dict())
+    if result.is_err:
+        return result
+    else:
+        presets = result.value
+
+    tasks = dict()
+    for group_name, group in autogroups.items():
+        result = get_group_definition(group_name, group, presets)
+        if result.is_err:
+            return result
+        group_definition = result.value
+        if group_definition.get("type") != "python":
+            continue
+
+        result = get_python_group_tasks(
+            group_name, group_definition, presets, compiler, python_loader
+        )
+        if result.is_err:
+            return result
+
+        group_tasks, group_errors = result.value
+        if len(group_errors) > 0:
+            return Err("get_tasks_dict", "task_parsing_error", errors=group_errors)
+        tasks.update(group_tasks)
+
+    return Ok(tasks)
+
+
 def get_tasks_dict(
-    global_presets, groups, autogroups, sql_folder, compiler, python_loader
+    global_presets, groups, autogroups, sql_index, compiler, python_loader
 ):
     """Returns a dictionary with the task definition with the preset information merged
     Args:
       global_presets (dict): a dictionary with the presets as defined in project.yaml
       groups (sayn.common.config.TaskGroup): a list of task groups from the tasks/ folder
+      autogroups (dict): the groups defined in project.yaml
+      sql_index (sayn.utils.file_index.FileIndex): the index of the sql folder, used to
+        resolve the file globs of all groups with a single scan of the folder
     """
     result = get_presets(global_presets, groups)
     if result.is_err:
@@ -279,14 +402,11 @@ def get_tasks_dict(
                     errors[test_name] = result.error
 
     for group_name, group in autogroups.items():
-        group_definition = {"group": group_name}
-        if "preset" in group:
-            preset_name = f"sayn_global:{group['preset']}"
-            if preset_name not in presets:
-                return Err("dag", "missing_preset", preset_name=preset_name)
-            group_definition.update(deepcopy(presets[preset_name]))
-
-        group_definition.update(group)
+        result = get_group_definition(group_name, group, presets)
+        if result.is_err:
+            return result
+        else:
+            group_definition = result.value
 
         if group_definition.get("type") in ("sql", "autosql"):
             if "file_name" not in group_definition:
@@ -302,7 +422,7 @@ def get_tasks_dict(
             )
             found_file = False
 
-            for file in Path(sql_folder).glob(file_glob):
+            for file in sql_index.glob(file_glob):
                 found_file = True
                 task_name = file.stem
                 if task_name in tasks:
@@ -314,7 +434,7 @@ def get_tasks_dict(
                     )
 
                 task = deepcopy(group_definition)
-                task["file_name"] = str(file.relative_to(sql_folder))
+                task["file_name"] = str(file.relative_to(sql_index.folder))
 
                 result = get_task_dict(task, task_name, group_name, presets)
                 if result.is_ok:
@@ -328,33 +448,15 @@ def get_tasks_dict(
                 return Err("dag", "empty_group", group=group_name)
 
         elif group_definition.get("type") == "python":
-            group_definition["group"] = group_name
-            group_definition["type"] = "python_module"
-            if "module" not in group_definition:
-                return Err("task", "missing_module", group=group_name)
-            module_path = compiler.compile(
-                group_definition.pop("module", None),
-                task=TaskJinjaEnv(group=group_name),
-            )
-            result = python_loader.get_objects(
-                "python_tasks", module_path, DecoratorTaskWrapper
+            result = get_python_group_tasks(
+                group_name, group_definition, presets, compiler, python_loader
             )
             if result.is_err:
                 return result
-            else:
-                objects = result.value
-
-            for task_obj in objects:
-                task_name = task_obj.func.__name__
-                task = deepcopy(group_definition)
-                task["name"] = task_name
-                task["task_class"] = task_obj
 
-                result = get_task_dict(task, task_name, group_name, presets)
-                if result.is_ok:
-                    tasks[task_name] = result.value
-                else:
-                    errors[task_name] = result.error
+            group_tasks, group_errors = result.value
+            tasks.update(group_tasks)
+            errors.update(group_errors)
 
         elif group_definition.get("type") == "test":
             if "file_name" not in group_definition:
@@ -369,7 +471,7 @@ def get_tasks_dict(
             )
 
             found_file = False
-            for file in Path(sql_folder).glob(file_glob):
+            for file in sql_index.glob(file_glob):
                 found_file = True
                 task_name = file.stem
                 if task_name in tasks:
@@ -380,7 +482,7 @@ def get_tasks_dict(
                         groups=(group_name, tasks[task_name]["group"]),
                     )
                 task = deepcopy(group_definition)
-                task["file_name"] = str(file.relative_to(sql_folder))
+                task["file_name"] = str(file.relative_to(sql_index.folder))
 
                 result = get_task_dict(task, task_name, group_name, presets)
 
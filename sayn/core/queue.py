@@ -0,0 +1,477 @@
+from concurrent.futures import Future
+from pathlib import Path
+import re
+import sqlite3
+from threading import Event, Lock, Thread
+import time
+
+import orjson
+
+##############################################################
+# Queue of tasks shared between a coordinator and its workers
+##############################################################
+
+PENDING = "pending"
+CLAIMED = "claimed"
+FAILED = "failed"
+
+_schema = """
+CREATE TABLE IF NOT EXISTS sayn_runs (
+    run_id TEXT PRIMARY KEY,
+    arguments TEXT NOT NULL,
+    finished INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sayn_tasks (
+    run_id TEXT NOT NULL,
+    task_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT,
+    error_message TEXT,
+    published_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (run_id, task_name)
+);
+"""
+
+
+class BaseTaskQueue:
+    """Interface of the queues shared by a coordinator (`sayn run --queue`) and its
+    workers (`sayn worker`).
+
+    The coordinator registers the run with the arguments needed to load the project
+    and publishes tasks as soon as they're ready to execute. Workers claim pending
+    tasks, renew the lease on them while they're executing and report their final
+    status. Claimed tasks whose lease is not renewed for `lease_timeout` seconds (ie:
+    the worker stopped) are made available to other workers again.
+
+    Backends implement all methods except `wait` and optionally `get_statuses`, which
+    by default calls `get_status` once per task. New backends are made available to
+    `--queue` by adding them to `backends`.
+
+    Attributes:
+        lease_timeout (float): Seconds a claimed task is kept by a worker without
+          renewing the lease.
+    """
+
+    lease_timeout = 60.0
+
+    def close(self):
+        pass
+
+    # Runs
+
+    def start_run(self, run_id, arguments):
+        """Registers a new run
+
+        Args:
+          run_id (str): the ID of the run
+          arguments (dict): json serialisable arguments for the workers to load the project
+        """
+        raise NotImplementedError()
+
+    def finish_run(self, run_id):
+        """Marks the run as finished so that its pending tasks are not claimed anymore"""
+        raise NotImplementedError()
+
+    def get_run_arguments(self, run_id):
+        """Returns the arguments of the run or None if the run doesn't exist"""
+        raise NotImplementedError()
+
+    def is_finished(self, run_id):
+        """Returns True if the run is finished or doesn't exist"""
+        raise NotImplementedError()
+
+    # Tasks
+
+    def publish(self, run_id, task_name):
+        """Adds a task ready to be executed to the queue"""
+        raise NotImplementedError()
+
+    def claim(self, worker):
+        """Claims the oldest pending task of an unfinished run.
+
+        Returns:
+          A tuple with the run ID and the task name or None when there are no tasks
+          pending
+        """
+        raise NotImplementedError()
+
+    def renew(self, worker, claimed):
+        """Renews the lease of the worker on the tasks it's executing
+
+        Args:
+          worker (str): the ID of the worker
+          claimed (List[Tuple[str, str]]): run ID and task name of each task
+        """
+        raise NotImplementedError()
+
+    def report(self, run_id, task_name, status, error_message=None, worker=None):
+        """Sets the final status of a task. If the worker is specified, the status is
+        only set if the task is still claimed by that worker."""
+        raise NotImplementedError()
+
+    def get_status(self, run_id, task_name):
+        """Returns a tuple with the status of the task and its error message"""
+        raise NotImplementedError()
+
+    def get_statuses(self, run_id, task_names):
+        """Returns a dictionary with a tuple with the status of the task and its error
+        message for each of the tasks"""
+        return {
+            task_name: self.get_status(run_id, task_name) for task_name in task_names
+        }
+
+    def release_expired(self, run_id, task_name):
+        """Makes the task available to other workers if it's claimed and its lease
+        expired. Returns True if the task was released."""
+        raise NotImplementedError()
+
+    def fail_pending(self, run_id, task_name, error_message):
+        """Sets the task as failed if it's still pending. Returns True if the task was
+        failed."""
+        raise NotImplementedError()
+
+    def wait(self, run_id, task_name, timeout=None, poll_interval=0.5):
+        """Waits until a worker reports the final status of the task
+
+        Args:
+          timeout (float): if specified, the task fails when it's pending with no
+            other task of the run executing for this number of seconds
+
+        Returns:
+          A tuple with the status of the task and its error message
+        """
+        waiter = QueueWaiter(self, run_id, timeout, poll_interval)
+        try:
+            return waiter.wait(task_name).result()
+        finally:
+            waiter.close()
+
+
+class QueueWaiter:
+    """Waits for the final status of the tasks published by a run from a single thread,
+    which polls the status of all the outstanding tasks together.
+
+    Claimed tasks whose lease expired are made available to other workers again. If a
+    timeout is specified, pending tasks fail when no task of the run is executing or
+    changes status in that number of seconds (ie: no workers are running).
+
+    Attributes:
+        queue (BaseTaskQueue): The queue the tasks are published to.
+        run_id (str): The ID of the run.
+        timeout (float): Seconds without progress before the pending tasks fail.
+        poll_interval (float): Seconds between checks on the status of the tasks.
+    """
+
+    def __init__(self, queue, run_id, timeout=None, poll_interval=0.5):
+        self.queue = queue
+        self.run_id = run_id
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+        self.lock = Lock()
+        self.waiting = dict()
+        self.statuses = dict()
+        self.last_progress_ts = time.monotonic()
+        self.last_release_ts = time.monotonic()
+
+        self.stopped = Event()
+        self.thread = None
+
+    def wait(self, task_name):
+        """Returns a future with a tuple with the final status of the task and its error
+        message"""
+        future = Future()
+        with self.lock:
+            self.waiting[task_name] = future
+            self.last_progress_ts = time.monotonic()
+
+            if self.thread is None:
+                self.thread = Thread(target=self.poll_loop, daemon=True)
+                self.thread.start()
+
+        return future
+
+    def poll(self):
+        """Checks the status of all tasks waited on, completing the futures of the tasks
+        that finished"""
+        with self.lock:
+            task_names = list(self.waiting.keys())
+
+        if len(task_names) == 0:
+            return
+
+        statuses = self.queue.get_statuses(self.run_id, task_names)
+
+        # Leases are checked a few times per lease timeout, as each check is a write
+        now = time.monotonic()
+        check_leases = now - self.last_release_ts > self.queue.lease_timeout / 4
+        if check_leases:
+            self.last_release_ts = now
+
+        finished = dict()
+        pending = list()
+        for task_name in task_names:
+            status, error_message = statuses.get(task_name, (None, None))
+            if (
+                status == CLAIMED
+                and check_leases
+                and self.queue.release_expired(self.run_id, task_name)
+            ):
+                status = PENDING
+
+            # Tasks being executed mean workers are running
+            if status == CLAIMED or status != self.statuses.get(task_name):
+                self.statuses[task_name] = status
+                self.last_progress_ts = now
+
+            if status == PENDING:
+                pending.append(task_name)
+            elif status != CLAIMED:
+                finished[task_name] = (status, error_message)
+
+        if self.timeout is not None and now - self.last_progress_ts > self.timeout:
+            error_message = f"No worker claimed the task in {self.timeout:g} seconds"
+            for task_name in pending:
+                if self.queue.fail_pending(self.run_id, task_name, error_message):
+                    finished[task_name] = (FAILED, error_message)
+
+        with self.lock:
+            futures = [(self.waiting.pop(k), v) for k, v in finished.items()]
+
+        for task_name in finished.keys():
+            del self.statuses[task_name]
+
+        for future, value in futures:
+            future.set_result(value)
+
+    def poll_loop(self):
+        while not self.stopped.is_set():
+            try:
+                self.poll()
+            except Exception as exc:
+                # Tasks fail instead of waiting forever on a queue that can't be read
+                with self.lock:
+                    futures = list(self.waiting.values())
+                    self.waiting = dict()
+
+                for future in futures:
+                    future.set_result((FAILED, f"Unable to read the queue: {exc}"))
+
+            self.stopped.wait(self.poll_interval)
+
+    def close(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+
+class TaskQueue(BaseTaskQueue):
+    """Queue of tasks stored in a SQLite database.
+
+    The lease on claimed tasks is based on the clock of each machine, so workers in
+    other machines need their clocks synchronised with the coordinator's.
+
+    Attributes:
+        path (str): Path to the SQLite database file.
+    """
+
+    def __init__(self, path, timeout=30, lease_timeout=None):
+        self.path = str(path)
+        if lease_timeout is not None:
+            self.lease_timeout = lease_timeout
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        # A single connection shared by all threads in the process, so access is
+        # serialised with a lock. Between processes, SQLite's locking applies
+        self._lock = Lock()
+        self._connection = sqlite3.connect(
+            self.path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        with self._lock:
+            self._connection.executescript(_schema)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _execute(self, query, *params):
+        with self._lock:
+            return self._connection.execute(query, params).fetchall()
+
+    # Runs
+
+    def start_run(self, run_id, arguments):
+        self._execute(
+            "INSERT OR REPLACE INTO sayn_runs (run_id, arguments, finished, created_at)"
+            " VALUES (?, ?, 0, ?)",
+            str(run_id),
+            orjson.dumps(arguments).decode(),
+            time.time(),
+        )
+
+    def finish_run(self, run_id):
+        self._execute("UPDATE sayn_runs SET finished = 1 WHERE run_id = ?", str(run_id))
+
+    def is_finished(self, run_id):
+        rows = self._execute(
+            "SELECT finished FROM sayn_runs WHERE run_id = ?", str(run_id)
+        )
+        return len(rows) == 0 or rows[0][0] == 1
+
+    def get_run_arguments(self, run_id):
+        rows = self._execute(
+            "SELECT arguments FROM sayn_runs WHERE run_id = ?", str(run_id)
+        )
+        if len(rows) == 0:
+            return None
+
+        return orjson.loads(rows[0][0])
+
+    # Tasks
+
+    def publish(self, run_id, task_name):
+        now = time.time()
+        self._execute(
+            "INSERT OR REPLACE INTO sayn_tasks"
+            " (run_id, task_name, status, worker, error_message, published_at, updated_at)"
+            " VALUES (?, ?, ?, NULL, NULL, ?, ?)",
+            str(run_id),
+            task_name,
+            PENDING,
+            now,
+            now,
+        )
+
+    def claim(self, worker):
+        with self._lock:
+            # Immediate transactions take the write lock upfront, so two workers
+            # can't claim the same task
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._connection.execute(
+                    "SELECT t.run_id, t.task_name"
+                    " FROM sayn_tasks AS t"
+                    " JOIN sayn_runs AS r ON r.run_id = t.run_id"
+                    " WHERE t.status = ? AND r.finished = 0"
+                    " ORDER BY t.published_at"
+                    " LIMIT 1",
+                    (PENDING,),
+                ).fetchall()
+
+                if len(rows) > 0:
+                    self._connection.execute(
+                        "UPDATE sayn_tasks SET status = ?, worker = ?, updated_at = ?"
+                        " WHERE run_id = ? AND task_name = ?",
+                        (CLAIMED, worker, time.time(), *rows[0]),
+                    )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+
+        if len(rows) == 0:
+            return None
+
+        return rows[0]
+
+    def renew(self, worker, claimed):
+        now = time.time()
+        for run_id, task_name in claimed:
+            self._execute(
+                "UPDATE sayn_tasks SET updated_at = ?"
+                " WHERE run_id = ? AND task_name = ? AND status = ? AND worker = ?",
+                now,
+                str(run_id),
+                task_name,
+                CLAIMED,
+                worker,
+            )
+
+    def report(self, run_id, task_name, status, error_message=None, worker=None):
+        query = (
+            "UPDATE sayn_tasks SET status = ?, error_message = ?, updated_at = ?"
+            " WHERE run_id = ? AND task_name = ?"
+        )
+        params = [status, error_message, time.time(), str(run_id), task_name]
+        if worker is not None:
+            query += " AND status = ? AND worker = ?"
+            params.extend((CLAIMED, worker))
+
+        self._execute(query, *params)
+
+    def get_status(self, run_id, task_name):
+        rows = self._execute(
+            "SELECT status, error_message FROM sayn_tasks"
+            " WHERE run_id = ? AND task_name = ?",
+            str(run_id),
+            task_name,
+        )
+        if len(rows) == 0:
+            return None, None
+
+        return rows[0]
+
+    def get_statuses(self, run_id, task_names):
+        task_names = list(task_names)
+        statuses = {task_name: (None, None) for task_name in task_names}
+        # Chunks below the limit of variables in a SQLite query
+        for i in range(0, len(task_names), 500):
+            chunk = task_names[i : i + 500]
+            rows = self._execute(
+                "SELECT task_name, status, error_message FROM sayn_tasks"
+                f" WHERE run_id = ? AND task_name IN ({', '.join('?' * len(chunk))})",
+                str(run_id),
+                *chunk,
+            )
+            statuses.update({row[0]: (row[1], row[2]) for row in rows})
+
+        return statuses
+
+    def _update_status(self, query, *params):
+        with self._lock:
+            return self._connection.execute(query, params).rowcount > 0
+
+    def release_expired(self, run_id, task_name):
+        return self._update_status(
+            "UPDATE sayn_tasks SET status = ?, worker = NULL, updated_at = ?"
+            " WHERE run_id = ? AND task_name = ? AND status = ? AND updated_at < ?",
+            PENDING,
+            time.time(),
+            str(run_id),
+            task_name,
+            CLAIMED,
+            time.time() - self.lease_timeout,
+        )
+
+    def fail_pending(self, run_id, task_name, error_message):
+        return self._update_status(
+            "UPDATE sayn_tasks SET status = ?, error_message = ?, updated_at = ?"
+            " WHERE run_id = ? AND task_name = ? AND status = ?",
+            FAILED,
+            error_message,
+            time.time(),
+            str(run_id),
+            task_name,
+            PENDING,
+        )
+
+
+# Queue backends per scheme in the queue location (`scheme://...`). Locations without
+# a scheme are paths to a SQLite file
+backends = {"sqlite": TaskQueue}
+
+
+def create_queue(location):
+    """Returns the queue for the location passed to `--queue`"""
+    match = re.match(r"^([a-zA-Z][a-zA-Z0-9+.-]*)://(.*)$", str(location))
+    if match is None:
+        return TaskQueue(location)
+
+    scheme, path = match.groups()
+    if scheme not in backends:
+        raise ValueError(f'No queue backend for "{scheme}" found')
+
+    return backends[scheme](path)
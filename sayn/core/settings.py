@@ -19,10 +19,10 @@ RE_ENV_VAR_NAME = re.compile(
 )
 
 RE_DEFAULT_RUN_VAL = re.compile(
-    r"^( *(?:(?:-t|--tasks|-x|--exclude)(?: +(?:group\:|tag\:)?[a-zA-Z][a-zA-Z_0-9]+)+|-u|--upstream-prod))+$"
+    r"^( *(?:(?:-t|--tasks|-x|--exclude)(?: +(?:group\:|tag\:)?[a-zA-Z][a-zA-Z_0-9]+(?:,(?:group\:|tag\:)[a-zA-Z][a-zA-Z_0-9]+)*)+|-u|--upstream-prod))+$"
 )
 RE_DEFAULT_RUN = re.compile(
-    r" *((?:-t|--tasks|-x|--exclude)(?: +(?:group\:|tag\:)?[a-zA-Z][a-zA-Z_0-9]+)+|-u|--upstream-prod)"
+    r" *((?:-t|--tasks|-x|--exclude)(?: +(?:group\:|tag\:)?[a-zA-Z][a-zA-Z_0-9]+(?:,(?:group\:|tag\:)[a-zA-Z][a-zA-Z_0-9]+)*)+|-u|--upstream-prod)"
 )
 
 
@@ -321,9 +321,28 @@ def get_settings(yaml, environment, profile_name=None):
 
 
 def get_connections(credentials):
+    """Creates the connection objects from the credentials.
+
+    Besides the connection parameters, each credential can specify `max_concurrency`
+    to limit the number of tasks using it that can run at the same time.
+
+    Returns:
+      A tuple with a dictionary of connection objects and a dictionary with the
+      max_concurrency of the credentials that define it
+    """
     out = dict()
+    max_concurrency = dict()
     for name, config in credentials.items():
         try:
+            if config is not None and "max_concurrency" in config:
+                config = {k: v for k, v in config.items() if k != "max_concurrency"}
+                value = credentials[name]["max_concurrency"]
+                if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                    raise ValueError(
+                        f'max_concurrency for credential "{name}" must be a positive integer'
+                    )
+                max_concurrency[name] = value
+
             if config is None:
                 out[name] = create_dummy(name)
             elif config["type"] == "api":
@@ -337,4 +356,4 @@ def get_connections(credentials):
         except Exception as e:
             return Exc(e)
 
-    return Ok(out)
+    return Ok((out, max_concurrency))
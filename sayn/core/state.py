@@ -0,0 +1,321 @@
+from pathlib import Path
+import os
+from uuid import uuid4
+
+import orjson
+
+from .errors import Exc, Ok
+
+#####################################
+# Local state persisted between runs
+#####################################
+
+
+def read_state(folder, name):
+    """Returns the content of a state file or an empty dictionary if it doesn't exist
+    or it can't be read.
+
+    Args:
+      folder (str): the folder where state files are stored
+      name (str): the name of the state file without extension
+    """
+    path = Path(folder, f"{name}.json")
+    try:
+        return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return dict()
+
+
+def write_state(folder, name, content):
+    """Writes the content to a state file, replacing it atomically so that concurrent
+    reads never see a partially written file.
+
+    Args:
+      folder (str): the folder where state files are stored
+      name (str): the name of the state file without extension
+      content (dict): a json serialisable dictionary
+    """
+    path = Path(folder, f"{name}.json")
+    # Unique per write, so that concurrent writers never share the temporary file
+    tmp_path = Path(folder, f".{name}.json.{uuid4().hex}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(orjson.dumps(content))
+        os.replace(tmp_path, path)
+    except Exception as exc:
+        tmp_path.unlink(missing_ok=True)
+        return Exc(exc, where="write_state", file_name=str(path))
+
+    return Ok()
+
+
+# Task durations
+
+
+def get_task_durations(folder, command):
+    """Returns the duration in seconds of the last successful execution of each task"""
+    return read_state(folder, "task_durations").get(command, dict())
+
+
+def update_task_durations(folder, command, durations):
+    """Merges the durations of the current execution with the ones from previous runs
+
+    Args:
+      folder (str): the folder where state files are stored
+      command (str): the sayn command executed (run, compile or test)
+      durations (Dict[str, float]): the duration in seconds of the tasks executed
+    """
+    if len(durations) == 0:
+        return Ok()
+
+    state = read_state(folder, "task_durations")
+    state[command] = dict(state.get(command, dict()), **durations)
+
+    return write_state(folder, "task_durations", state)
+
+
+# Task fingerprints
+
+
+def get_task_fingerprints(folder):
+    """Returns the fingerprint of each task in its last successful run"""
+    return read_state(folder, "task_fingerprints")
+
+
+def update_task_fingerprints(folder, succeeded, failed):
+    """Stores the fingerprints of the tasks that succeeded in the current run and
+    removes the ones from tasks that failed, as their output is now unknown.
+
+    Args:
+      folder (str): the folder where state files are stored
+      succeeded (Dict[str, str]): the fingerprint of each task that succeeded
+      failed (List[str]): the names of the tasks that failed
+    """
+    if len(succeeded) == 0 and len(failed) == 0:
+        return Ok()
+
+    state = read_state(folder, "task_fingerprints")
+    state.update(succeeded)
+    for name in failed:
+        state.pop(name, None)
+
+    return write_state(folder, "task_fingerprints", state)
+
+
+# Task config cache
+
+
+def get_config_cache(folder, key):
+    """Returns the metadata of each task stored by the last execution, or an empty
+    dictionary if the project settings changed since then.
+
+    Args:
+      folder (str): the folder where state files are stored
+      key (str): a hash of the settings affecting the config of all tasks
+    """
+    state = read_state(folder, "config_cache")
+    if state.get("key") != key:
+        return dict()
+
+    return state.get("tasks", dict())
+
+
+def update_config_cache(folder, key, tasks):
+    """Replaces the stored metadata of all tasks
+
+    Args:
+      folder (str): the folder where state files are stored
+      key (str): a hash of the settings affecting the config of all tasks
+      tasks (Dict[str, dict]): the metadata of each task
+    """
+    return write_state(folder, "config_cache", {"key": key, "tasks": tasks})
+
+
+# Project manifest
+
+
+def get_manifest(folder, key):
+    """Returns the task definitions stored by the last execution, or None if any of the
+    project files changed since then.
+
+    Args:
+      folder (str): the folder where state files are stored
+      key (str): a hash of the project files
+    """
+    state = read_state(folder, "manifest")
+    if state.get("key") != key:
+        return None
+
+    return state.get("tasks")
+
+
+def update_manifest(folder, key, tasks):
+    """Replaces the stored task definitions
+
+    Args:
+      folder (str): the folder where state files are stored
+      key (str): a hash of the project files
+      tasks (Dict[str, dict]): the task definitions with presets resolved
+    """
+    return write_state(folder, "manifest", {"key": key, "tasks": tasks})
+
+
+# Parsed task group files
+
+
+def get_group_cache(folder, key):
+    """Returns the content of each task group file parsed by previous executions with
+    the hash of the file, or an empty dictionary if the key changed since then.
+
+    Args:
+      folder (str): the folder where state files are stored
+      key (str): the sayn version, as the parsed content depends on the group model
+    """
+    state = read_state(folder, "group_cache")
+    if state.get("key") != key:
+        return dict()
+
+    return state.get("groups", dict())
+
+
+def update_group_cache(folder, key, groups):
+    """Replaces the stored content of the task group files
+
+    Args:
+      folder (str): the folder where state files are stored
+      key (str): the sayn version, as the parsed content depends on the group model
+      groups (Dict[str, dict]): the hash and parsed content of each group file
+    """
+    return write_state(folder, "group_cache", {"key": key, "groups": groups})
+
+
+# Files in the compile folder
+
+
+def get_compile_output(folder, key):
+    """Returns the files written to the compile folder by each task per command in
+    previous executions, or None if they're unknown.
+
+    Args:
+      folder (str): the folder where state files are stored
+      key (str): the compile folder
+    """
+    state = read_state(folder, "compile_output")
+    if state.get("key") != key:
+        return None
+
+    return state.get("files")
+
+
+def update_compile_output(folder, key, files):
+    """Replaces the stored files of the compile folder
+
+    Args:
+      folder (str): the folder where state files are stored
+      key (str): the compile folder
+      files (Dict[str, Dict[str, List[str]]]): the files written by each task per
+        command, relative to the compile folder
+    """
+    return write_state(folder, "compile_output", {"key": key, "files": files})
+
+
+# Task statuses per run
+
+# Maximum number of runs for which task statuses are kept
+_max_runs_stored = 50
+
+
+def get_run_statuses(folder, run_id):
+    """Returns the command and the status of each task in a previous run, or None if
+    there's no state stored for that run. Runs interrupted before their statuses were
+    compacted are read from the log of statuses.
+
+    Args:
+      folder (str): the folder where state files are stored
+      run_id (str): the run id of the previous execution
+    """
+    state = read_state(Path(folder, "runs"), str(run_id))
+    if "tasks" in state:
+        return state
+
+    try:
+        lines = Path(folder, "runs", f"{run_id}.jsonl").read_bytes().splitlines()
+    except OSError:
+        return None
+
+    state = None
+    for line in lines:
+        try:
+            entry = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            # The last line can be incomplete if the process was killed while writing
+            continue
+
+        if state is None:
+            state = {"command": entry["command"], "tasks": dict()}
+        state["tasks"][entry["task"]] = entry["status"]
+
+    return state
+
+
+def append_run_status(folder, run_id, command, task_name, status):
+    """Adds the status of a task to the log of statuses of a run, so that the run can be
+    resumed if the process is interrupted. Each status is a line appended to the file,
+    so the cost of storing it doesn't grow with the number of tasks.
+
+    Args:
+      folder (str): the folder where state files are stored
+      run_id (str): the run id of the current execution
+      command (str): the sayn command executed (run, compile or test)
+      task_name (str): the name of the task
+      status (str): the status of the task
+    """
+    path = Path(folder, "runs", f"{run_id}.jsonl")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("ab") as f:
+            f.write(
+                orjson.dumps({"command": command, "task": task_name, "status": status})
+                + b"\n"
+            )
+    except Exception as exc:
+        return Exc(exc, where="append_run_status", file_name=str(path))
+
+    return Ok()
+
+
+def update_run_statuses(folder, run_id, command, statuses):
+    """Stores the status of the tasks in a run, replacing the previous state of the run
+    and compacting its log of statuses
+
+    Args:
+      folder (str): the folder where state files are stored
+      run_id (str): the run id of the current execution
+      command (str): the sayn command executed (run, compile or test)
+      statuses (Dict[str, str]): the status of each task in the run
+    """
+    result = write_state(
+        Path(folder, "runs"), str(run_id), {"command": command, "tasks": statuses}
+    )
+    if result.is_ok:
+        Path(folder, "runs", f"{run_id}.jsonl").unlink(missing_ok=True)
+
+    return result
+
+
+def prune_run_statuses(folder, keep=_max_runs_stored):
+    """Removes the state of the oldest runs, keeping only the latest `keep` runs"""
+    files = sorted(
+        [
+            f
+            for f in Path(folder, "runs").glob("*.json*")
+            if f.suffix in (".json", ".jsonl")
+        ],
+        key=lambda x: x.stat().st_mtime,
+        reverse=True,
+    )
+    for file in files[keep:]:
+        try:
+            file.unlink()
+        except OSError:
+            pass
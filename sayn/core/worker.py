@@ -0,0 +1,193 @@
+import os
+import socket
+from threading import Event, Lock, Thread
+import time
+
+from ..tasks.task import TaskStatus
+
+_final_statuses = (
+    TaskStatus.SUCCEEDED,
+    TaskStatus.FAILED,
+    TaskStatus.SETUP_FAILED,
+    TaskStatus.SKIPPED,
+)
+
+
+def get_error_message(result):
+    """Returns a one line description of an error result to report to the coordinator"""
+    details = result.error.details
+    for key in ("error_message", "message", "exception"):
+        if details.get(key) is not None:
+            return str(details[key])
+
+    return f"{result.error.kind}::{result.error.code}"
+
+
+class Worker:
+    """Executes the tasks published to a queue by `sayn run --queue`.
+
+    The project is configured once per run, using the arguments the coordinator stored
+    in the queue, and each claimed task is setup and executed on that configuration.
+    The app of a run is finished, closing its connections, once the run is finished or
+    replaced by a newer run and none of its tasks are executing. While tasks are
+    executing, a background thread renews the lease on them so they're
+    not released to other workers.
+
+    Attributes:
+        queue (BaseTaskQueue): The queue to claim tasks from.
+        app_factory (Callable): A function receiving the run arguments and returning a
+          configured App object.
+        threads (int): The number of tasks to execute concurrently.
+        poll_interval (float): Seconds to wait between checks on an empty queue.
+        idle_timeout (float): If specified, the worker stops after this number of
+          seconds without claiming any task.
+    """
+
+    def __init__(
+        self, queue, app_factory, threads=1, poll_interval=1.0, idle_timeout=None
+    ):
+        self.queue = queue
+        self.app_factory = app_factory
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self.app_lock = Lock()
+        self.run_id = None
+        self.app = None
+        # Apps of runs replaced by a newer run with tasks still executing
+        self.previous_apps = dict()
+
+        self.last_claim_ts = time.monotonic()
+
+        self.claimed_lock = Lock()
+        self.claimed = set()
+        self.stopped = Event()
+
+    def get_app(self, run_id):
+        """Returns the app configured for the run, or None if the configuration failed"""
+        with self.app_lock:
+            if run_id != self.run_id:
+                if self.app is not None:
+                    self.previous_apps[self.run_id] = self.app
+
+                self.run_id = run_id
+                self.app = None
+
+                arguments = self.queue.get_run_arguments(run_id)
+                if arguments is not None:
+                    try:
+                        self.app = self.app_factory(arguments)
+                    except SystemExit:
+                        # Errors during config and setup finish the app
+                        self.app = None
+
+            return self.app
+
+    def execute_claimed(self, run_id, task_name):
+        app = self.get_app(run_id)
+        if app is None:
+            self.queue.report(
+                run_id,
+                task_name,
+                TaskStatus.FAILED.value,
+                "The worker failed to configure the project",
+                worker=self.worker_id,
+            )
+            return
+
+        result = app.execute_worker_task(task_name)
+        status = app.tasks[task_name].status if task_name in app.tasks else None
+        if status not in _final_statuses:
+            status = TaskStatus.SUCCEEDED if result.is_ok else TaskStatus.FAILED
+
+        self.queue.report(
+            run_id,
+            task_name,
+            status.value,
+            None if result.is_ok else get_error_message(result),
+            worker=self.worker_id,
+        )
+
+    def finish_apps(self, finish_all=False):
+        """Finishes the apps of runs without tasks executing in this worker, if the run
+        was replaced by a newer run or is finished"""
+        finished = list()
+        with self.app_lock:
+            with self.claimed_lock:
+                executing = {run_id for run_id, _ in self.claimed}
+
+            for run_id in list(self.previous_apps.keys()):
+                if finish_all or run_id not in executing:
+                    finished.append(self.previous_apps.pop(run_id))
+
+            if (
+                self.app is not None
+                and self.run_id not in executing
+                and (finish_all or self.queue.is_finished(self.run_id))
+            ):
+                finished.append(self.app)
+                self.app = None
+                self.run_id = None
+
+        for app in finished:
+            app.finish()
+
+    def is_idle(self):
+        return (
+            self.idle_timeout is not None
+            and time.monotonic() - self.last_claim_ts > self.idle_timeout
+        )
+
+    def worker_loop(self):
+        while not self.is_idle():
+            claimed = self.queue.claim(self.worker_id)
+            if claimed is None:
+                self.finish_apps()
+                time.sleep(self.poll_interval)
+                continue
+
+            self.last_claim_ts = time.monotonic()
+            with self.claimed_lock:
+                self.claimed.add(claimed)
+            try:
+                self.execute_claimed(*claimed)
+            except Exception as exc:
+                # Report the error instead of leaving the task claimed until its
+                # lease expires
+                self.queue.report(
+                    *claimed, TaskStatus.FAILED.value, str(exc), worker=self.worker_id
+                )
+            finally:
+                with self.claimed_lock:
+                    self.claimed.discard(claimed)
+            self.last_claim_ts = time.monotonic()
+            self.finish_apps()
+
+    def heartbeat_loop(self):
+        while not self.stopped.wait(self.queue.lease_timeout / 3):
+            with self.claimed_lock:
+                claimed = list(self.claimed)
+
+            if len(claimed) > 0:
+                self.queue.renew(self.worker_id, claimed)
+
+    def execute(self):
+        """Claims and executes tasks until the worker is idle for `idle_timeout` seconds"""
+        self.stopped.clear()
+        heartbeat = Thread(target=self.heartbeat_loop, daemon=True)
+        heartbeat.start()
+
+        threads = [Thread(target=self.worker_loop) for _ in range(self.threads)]
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.stopped.set()
+        heartbeat.join()
+
+        self.finish_apps(finish_all=True)
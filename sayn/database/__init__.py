@@ -1,13 +1,17 @@
+import asyncio
 from collections import Counter
+from copy import deepcopy
 import datetime
 import decimal
+from functools import partial
 from itertools import groupby
 from pathlib import Path
 from typing import List, Optional, Union
 
 from jinja2 import Environment, FileSystemLoader, StrictUndefined
-from pydantic import BaseModel, validator, Extra
+from pydantic import BaseModel, validator, Extra, conint, confloat
 from sqlalchemy import MetaData, Table
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.sql import sqltypes, text
 
 from ..core.errors import DBError, Exc, Ok
@@ -98,6 +102,34 @@ class DDL(BaseDDL):
         return self.base_ddl()
 
 
+def _driver_errors(error):
+    """Yields the exception followed by the exceptions it wraps (ie: the driver
+    exception in `orig` for sqlalchemy errors and the ones raised while handling them)"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = getattr(error, "orig", None) or error.__cause__ or error.__context__
+
+
+class RetryPolicy(BaseModel):
+    """Retry policy for transient database errors, set with `retry` in the credentials."""
+
+    max_attempts: conint(ge=1) = 3
+    backoff: confloat(ge=0) = 1
+    max_backoff: confloat(ge=0) = 30
+    # The statement can have been executed before the connection was lost, so
+    # disconnections are only retried when enabled
+    retry_disconnects: bool = False
+
+    class Config:
+        extra = Extra.forbid
+
+    def delay(self, attempt):
+        """Seconds to wait after the given failed attempt (exponential backoff)"""
+        return min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+
+
 class Database:
     """
     Base class for databases in SAYN.
@@ -115,6 +147,14 @@ class Database:
 
     DDL = DDL
 
+    # Error codes reported by the driver (see `_error_code`) for transient errors (eg:
+    # serialization failures or lock timeouts) after which a failed statement can be
+    # safely retried
+    retryable_codes = ()
+    # Lowercase fragments of error messages from transient errors, only for those the
+    # driver doesn't report with a code
+    retryable_errors = ()
+
     def __init__(
         self,
         name,
@@ -127,6 +167,7 @@ class Database:
         self.name_in_settings = name_in_settings
         self.db_type = db_type
         self.max_batch_rows = common_params.get("max_batch_rows", 50000)
+        self.retry_policy = RetryPolicy(**(common_params.get("retry") or dict()))
         self._settings = settings
         self._requested_objects = dict()
 
@@ -179,7 +220,9 @@ class Database:
         raise NotImplementedError()
 
     def _activate_connection(self):
-        self.engine = self.create_engine(self._settings)
+        # Drivers consume the settings when creating the engine, so we pass a copy
+        # to allow the connection to be activated again (eg: in a separate process)
+        self.engine = self.create_engine(deepcopy(self._settings))
         if self.engine is not None:
             # We'll have a None engine when the connection is missing from the settings.
             # We create said object only to allow the config stage to run correctly.
@@ -190,6 +233,25 @@ class Database:
     def _list_databases(self):
         raise NotImplementedError()
 
+    def _error_code(self, error):
+        """Returns the code of the error as reported by the driver or None. Each driver
+        sets the code in a different attribute of its exceptions."""
+        return None
+
+    def _is_retryable(self, error):
+        """Returns True if the exception is a transient error after which the statement
+        can be retried"""
+        if isinstance(error, DBAPIError) and error.connection_invalidated:
+            return self.retry_policy.retry_disconnects
+
+        if any(
+            self._error_code(e) in self.retryable_codes for e in _driver_errors(error)
+        ):
+            return True
+
+        message = str(error).lower()
+        return any(e in message for e in self.retryable_errors)
+
     def _list_objects(self, databases):
         """List the accessible databases for this connection."""
         objects = list()
@@ -488,6 +550,55 @@ class Database:
             for record in res:
                 yield dict(zip(fields, record))
 
+    def read_batches(self, query, batch_size=100000, **params):
+        """Executes the query and returns an iterator of `pyarrow.RecordBatch` with the data,
+        without creating a python object per row. Requires pyarrow installed.
+
+        Drivers with a native columnar result format (ie: Snowflake and BigQuery) use it,
+        otherwise rows are fetched with a server-side cursor `batch_size` rows at a time.
+
+        Args:
+            query (str): The SELECT query to execute
+            batch_size (int): The maximum number of rows per batch
+            params (dict): sqlalchemy parameters to use when building the final query
+
+        Returns:
+            Iterator[pyarrow.RecordBatch]: The results of the query in batches
+        """
+        with self.engine.connect().execution_options(stream_results=True) as connection:
+            res = connection.execute(query, **params)
+            yield from _rows_to_batches(
+                [str(k) for k in res.keys()], res.fetchmany, batch_size
+            )
+
+    def read_arrow(self, query, **params):
+        """Executes the query and returns a `pyarrow.Table` with the data. Requires pyarrow
+        installed.
+
+        Args:
+            query (str): The SELECT query to execute
+            params (dict): sqlalchemy parameters to use when building the final query
+
+        Returns:
+            pyarrow.Table: The results of the query
+        """
+        pa = import_pyarrow()
+        tables = [
+            pa.Table.from_batches([b]) for b in self.read_batches(query, **params)
+        ]
+        if len(tables) == 0:
+            # Native drivers return no batches for empty results
+            return pa.table({})
+        elif len(tables) == 1:
+            return tables[0]
+
+        # Types are inferred per batch when not provided by the driver, so batches
+        # with only nulls or with wider decimals need a common schema
+        schema = pa.unify_schemas(
+            [t.schema for t in tables], promote_options="permissive"
+        )
+        return pa.concat_tables([t.cast(schema) for t in tables])
+
     def _load_data_batch(self, table, data, schema, db):
         """Implements the load of a single data batch for `load_data`.
 
@@ -586,6 +697,55 @@ class Database:
 
         return records_loaded
 
+    # Async API
+
+    async def _run_in_executor(self, func, *args, **kwargs):
+        # Database drivers are blocking, so calls are sent to the loop's thread pool
+        # which allows multiple queries to run at the same time from async tasks
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(func, *args, **kwargs))
+
+    async def execute_async(self, script):
+        """Async version of `execute` to use in `async def` python tasks.
+
+        Args:
+            script (sql): The SQL script to execute
+        """
+        return await self._run_in_executor(self.execute, script)
+
+    async def read_data_async(self, query, **params):
+        """Async version of `read_data` to use in `async def` python tasks.
+
+        Args:
+            query (str): The SELECT query to execute
+            params (dict): sqlalchemy parameters to use when building the final query
+
+        Returns:
+            list: A list of dictionaries with the results of the query
+        """
+        return await self._run_in_executor(self.read_data, query, **params)
+
+    async def read_arrow_async(self, query, **params):
+        """Async version of `read_arrow` to use in `async def` python tasks.
+
+        Args:
+            query (str): The SELECT query to execute
+            params (dict): sqlalchemy parameters to use when building the final query
+
+        Returns:
+            pyarrow.Table: The results of the query
+        """
+        return await self._run_in_executor(self.read_arrow, query, **params)
+
+    async def load_data_async(self, table, data, **kwargs):
+        """Async version of `load_data` to use in `async def` python tasks. Accepts the
+        same arguments as `load_data`.
+
+        Returns:
+            int: Number of records loaded
+        """
+        return await self._run_in_executor(self.load_data, table, data, **kwargs)
+
     def _get_table(self, table, schema):
         """Create a SQLAlchemy Table object.
 
@@ -849,6 +1009,69 @@ class Database:
         return self._object_builder.from_components(database, schema, object)
 
 
+def import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(
+            "`read_arrow` and `read_batches` require pyarrow installed "
+            "(pip install sayn[arrow])"
+        )
+
+    return pyarrow
+
+
+def _driver_query(dialect, query, params):
+    """Converts a query using sqlalchemy parameters (`:name`) to the paramstyle of the
+    driver of the dialect, returning the query and the parameters to pass to a DBAPI
+    cursor. Queries without parameters are returned as they are."""
+    if not params:
+        return query, None
+
+    compiled = text(query).bindparams(**params).compile(dialect=dialect)
+    if dialect.positional:
+        return compiled.string, tuple(compiled.params[k] for k in compiled.positiontup)
+    else:
+        return compiled.string, compiled.params
+
+
+def _rows_to_batches(fields, fetchmany, batch_size):
+    """Converts the rows returned by a cursor to record batches, keeping the type of
+    each column between batches when possible. Always returns at least one batch so that
+    the columns of empty results are known."""
+    pa = import_pyarrow()
+    types = [None] * len(fields)
+    first = True
+
+    while True:
+        rows = fetchmany(batch_size)
+        if len(rows) == 0 and not first:
+            break
+
+        columns = list(zip(*rows)) if len(rows) > 0 else [()] * len(fields)
+        arrays = list()
+        for i, values in enumerate(columns):
+            array = None
+            if types[i] is not None:
+                try:
+                    array = pa.array(values, type=types[i])
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    pass
+
+            if array is None:
+                array = pa.array(values)
+                if not pa.types.is_null(array.type):
+                    types[i] = array.type
+
+            arrays.append(array)
+
+        yield pa.RecordBatch.from_arrays(arrays, names=fields)
+        first = False
+
+        if len(rows) < batch_size:
+            break
+
+
 def fully_qualify(name, schema=None, db=None):
     return f"{db+'.' if db is not None else ''}{schema+'.' if schema is not None else ''}{name}"
 
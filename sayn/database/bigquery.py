@@ -13,7 +13,7 @@ from pydantic import validator, Extra, BaseModel
 from sqlalchemy import create_engine
 from sqlalchemy.sql import sqltypes
 
-from . import Database, Columns, Hook, BaseDDL
+from . import Database, Columns, Hook, BaseDDL, import_pyarrow
 
 from ..core.errors import DBError, Ok
 
@@ -84,6 +84,20 @@ class Bigquery(Database):
     dataset = None
     client = None
 
+    # Reasons in the errors returned by the API
+    retryable_codes = ("rateLimitExceeded",)
+    # Concurrent DML statements fail without a specific reason
+    retryable_errors = (
+        "could not serialize access",
+        "exceeded rate limits",
+    )
+
+    def _error_code(self, error):
+        # API errors have a list of errors with the reason of each one
+        errors = getattr(error, "errors", None)
+        if isinstance(errors, list) and len(errors) > 0 and isinstance(errors[0], dict):
+            return errors[0].get("reason")
+
     def feature(self, feature):
         return feature in (
             "CAN REPLACE TABLE",
@@ -234,6 +248,39 @@ class Bigquery(Database):
         else:
             return python_types[from_type]().compile(dialect=self.engine.dialect)
 
+    def read_batches(self, query, batch_size=100000, **params):
+        """Executes the query and returns an iterator of `pyarrow.RecordBatch` with the
+        data, downloaded with the BigQuery Storage API when google-cloud-bigquery-storage
+        is installed. Requires pyarrow installed.
+
+        Args:
+            query (str): The SELECT query to execute
+            batch_size (int): The maximum number of rows per batch
+            params (dict): sqlalchemy parameters to use when building the final query
+
+        Returns:
+            Iterator[pyarrow.RecordBatch]: The results of the query in batches
+        """
+        if len(params) > 0:
+            # Query parameters need sqlalchemy to be converted to BigQuery types
+            yield from super().read_batches(query, batch_size, **params)
+            return
+
+        import_pyarrow()
+        try:
+            from google.cloud import bigquery_storage
+
+            bqstorage_client = bigquery_storage.BigQueryReadClient(
+                credentials=self.client._credentials
+            )
+        except ImportError:
+            bqstorage_client = None
+
+        rows = self.client.query(query).result(page_size=batch_size)
+        for batch in rows.to_arrow_iterable(bqstorage_client=bqstorage_client):
+            for offset in range(0, max(batch.num_rows, 1), batch_size):
+                yield batch.slice(offset, batch_size)
+
     def _load_data_batch(self, table, data, schema, db):
         full_table_name = f"{self.project if db is None else db}.{self.dataset if schema is None else schema}.{table}"
 
@@ -1,21 +1,18 @@
-from .bigquery import Bigquery
-from .mysql import Mysql
-from .postgresql import Postgresql
-from .redshift import Redshift
-from .sqlite import Sqlite
-from .snowflake import Snowflake
+from importlib import import_module
+
 from .unknown import UnknownDb
 
+# Module and class of each driver, imported only when a connection of that type is used
 drivers = {
-    "postgresql": Postgresql,
-    "sqlite": Sqlite,
-    "mysql": Mysql,
-    "snowflake": Snowflake,
-    "redshift": Redshift,
-    "bigquery": Bigquery,
+    "postgresql": ("postgresql", "Postgresql"),
+    "sqlite": ("sqlite", "Sqlite"),
+    "mysql": ("mysql", "Mysql"),
+    "snowflake": ("snowflake", "Snowflake"),
+    "redshift": ("redshift", "Redshift"),
+    "bigquery": ("bigquery", "Bigquery"),
 }
 
-db_params = ("max_batch_rows", "type")
+db_params = ("max_batch_rows", "retry", "type")
 
 
 def create(name, name_in_settings, settings):
@@ -27,7 +24,10 @@ def create(name, name_in_settings, settings):
         common_params = {k: v for k, v in settings.items() if k in db_params}
         settings = {k: v for k, v in settings.items() if k not in db_params}
 
-        db_obj = drivers[db_type](
+        module_name, class_name = drivers[db_type]
+        driver = getattr(import_module(f".{module_name}", __package__), class_name)
+
+        db_obj = driver(
             name,
             name_in_settings,
             db_type,
@@ -10,6 +10,18 @@ db_parameters = ["host", "user", "password", "port", "database"]
 
 
 class Mysql(Database):
+    # Error numbers: ER_LOCK_DEADLOCK and ER_LOCK_WAIT_TIMEOUT
+    retryable_codes = (1213, 1205)
+
+    def _error_code(self, error):
+        # pymysql errors have the error number as first argument
+        if (
+            type(error).__module__.startswith("pymysql")
+            and len(error.args) > 0
+            and isinstance(error.args[0], int)
+        ):
+            return error.args[0]
+
     def feature(self, feature):
         return feature in (
             "CAN REPLACE VIEW",
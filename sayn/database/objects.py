@@ -118,6 +118,16 @@ class DbObjectCompiler:
                 stringify = stringify + "_" + suffix
         return stringify
 
+    def db_object(
+        self,
+        connection_name: str,
+        database: Optional[str],
+        schema: Optional[str],
+        table: Optional[str],
+    ) -> DbObject:
+        """Creates an object from its already parsed components"""
+        return DbObject(self, connection_name, database, schema, table)
+
     def set_sources_from_prod(self, sources_from_prod: Set[DbObject]) -> None:
         self.sources_from_prod = sources_from_prod
 
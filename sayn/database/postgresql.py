@@ -8,6 +8,12 @@ db_parameters = ["host", "user", "password", "port", "dbname"]
 
 
 class Postgresql(Database):
+    # SQLSTATE codes: serialization_failure, deadlock_detected and lock_not_available
+    retryable_codes = ("40001", "40P01", "55P03")
+
+    def _error_code(self, error):
+        return getattr(error, "pgcode", None)
+
     def feature(self, feature):
         return feature in (
             "NEEDS CASCADE",
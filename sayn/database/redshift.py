@@ -103,6 +103,15 @@ class Redshift(Database):
     session_token = None
     profile = None
 
+    # SQLSTATE codes: serialization_failure (serializable isolation violation) and
+    # deadlock_detected
+    retryable_codes = ("40001", "40P01")
+
+    def _error_code(self, error):
+        # redshift_connector errors have a dict with the fields of the server message
+        if len(error.args) > 0 and isinstance(error.args[0], dict):
+            return error.args[0].get("C")
+
     def feature(self, feature):
         return feature in (
             "NEEDS CASCADE",
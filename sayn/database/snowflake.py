@@ -4,7 +4,7 @@ import tempfile
 
 from sqlalchemy import create_engine
 
-from . import Database
+from . import Database, _driver_query, _rows_to_batches
 
 db_parameters = [
     "account",
@@ -20,6 +20,13 @@ db_parameters = [
 
 
 class Snowflake(Database):
+    # Error numbers: too many statements waiting for a lock on the same object
+    retryable_codes = (625,)
+
+    def _error_code(self, error):
+        if type(error).__module__.startswith("snowflake"):
+            return getattr(error, "errno", None)
+
     def feature(self, feature):
         return feature in ("TABLE RENAME CHANGES SCHEMA")
 
@@ -40,6 +47,42 @@ class Snowflake(Database):
         conn.connection.commit()
         conn.connection.close()
 
+    def read_batches(self, query, batch_size=100000, **params):
+        """Executes the query and returns an iterator of `pyarrow.RecordBatch` with the
+        data, using the arrow result format of the Snowflake connector. Requires pyarrow
+        installed.
+
+        Args:
+            query (str): The SELECT query to execute
+            batch_size (int): The maximum number of rows per batch
+            params (dict): sqlalchemy parameters to use when building the final query,
+              referenced as `:name` like in the rest of the methods
+
+        Returns:
+            Iterator[pyarrow.RecordBatch]: The results of the query in batches
+        """
+        from snowflake.connector.errors import NotSupportedError
+
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            # The cursor uses the paramstyle of the connector, not the one of sqlalchemy
+            cursor.execute(*_driver_query(self.engine.dialect, query, params))
+
+            try:
+                tables = cursor.fetch_arrow_batches()
+            except NotSupportedError:
+                # Results of commands like SHOW are not in arrow format
+                yield from _rows_to_batches(
+                    [c[0] for c in cursor.description], cursor.fetchmany, batch_size
+                )
+                return
+
+            for table in tables:
+                yield from table.to_batches(max_chunksize=batch_size)
+        finally:
+            connection.close()
+
     def _list_databases(self):
         """List the accessible databases for this connection."""
         databases = self.read_data("SHOW DATABASES;")
@@ -9,6 +9,17 @@ db_parameters = ["database"]
 
 
 class Sqlite(Database):
+    # Primary result codes: SQLITE_BUSY and SQLITE_LOCKED. The code is only available
+    # from python 3.11, so the message is used as fallback
+    retryable_codes = (5, 6)
+    retryable_errors = ("database is locked",)
+
+    def _error_code(self, error):
+        code = getattr(error, "sqlite_errorcode", None)
+        if code is not None:
+            # Extended result codes have the primary result code in the lower byte
+            return code & 0xFF
+
     def feature(self, feature):
         return feature in (
             "CANNOT ALTER INDEXES",
@@ -1,6 +1,7 @@
 from pathlib import Path
 from datetime import datetime
 import subprocess
+from threading import RLock
 from typing import List, Optional
 
 from .task_event_tracker import TaskEventTracker
@@ -18,23 +19,34 @@ class EventTracker:
     current_task = None
     current_task_n = 0
     sayn_version = sayn_version
-    project_git_commit = None
     project_name = Path(".").absolute().name
 
     def __init__(self, run_id):
         self.run_id = run_id
         self.tasks = list()
-        try:
-            self.project_git_commit = (
-                subprocess.check_output(
-                    ["git", "rev-parse", "HEAD"], stderr=subprocess.STDOUT
-                )
-                .split()[0]
-                .decode("utf-8")
-            )
-        except:
-            # If git is not available, we simply don't report the commit
-            pass
+        self._lock = RLock()
+        self._project_git_commit = None
+        self._project_git_commit_done = False
+
+    @property
+    def project_git_commit(self):
+        # Calculated on first use as it requires running git in a subprocess
+        with self._lock:
+            if not self._project_git_commit_done:
+                try:
+                    self._project_git_commit = (
+                        subprocess.check_output(
+                            ["git", "rev-parse", "HEAD"], stderr=subprocess.STDOUT
+                        )
+                        .split()[0]
+                        .decode("utf-8")
+                    )
+                except:
+                    # If git is not available, we simply don't report the commit
+                    pass
+                self._project_git_commit_done = True
+
+        return self._project_git_commit
 
     def register_logger(self, logger):
         self.loggers.append(logger)
@@ -73,6 +85,11 @@ class EventTracker:
 
         return TaskEventTracker(self, task_name, task_order)
 
+    def report_events(self, events):
+        with self._lock:
+            for event in events:
+                self.report_event(**event)
+
     def report_event(self, **event):
         if "context" not in event:
             event["context"] = "app"
@@ -90,9 +107,11 @@ class EventTracker:
                 sayn_version=self.sayn_version,
                 project_git_commit=self.project_git_commit,
                 project_name=self.project_name,
-                ts=datetime.now(),
+                ts=event.get("ts") or datetime.now(),
             )
         )
 
-        for logger in self.loggers:
-            logger.report_event(**event)
+        # Tasks can run concurrently, so we need to serialise the calls to the loggers
+        with self._lock:
+            for logger in self.loggers:
+                logger.report_event(**event)
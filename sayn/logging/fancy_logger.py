@@ -1,5 +1,3 @@
-from halo import Halo
-
 from .logger import Logger
 from .log_formatter import LogFormatter, human
 
@@ -7,7 +5,7 @@ from .log_formatter import LogFormatter, human
 class FancyLogger(Logger):
     fmt = LogFormatter(use_colour=False, use_icons=False, output_ts=True)
     cfmt = LogFormatter(use_colour=True, use_icons=False, output_ts=True)
-    spinner = Halo(spinner="dots")
+    _spinner = None
 
     stage = None
     task = None
@@ -21,8 +19,25 @@ class FancyLogger(Logger):
     step_text = None
     task_persist_msgs = list()
 
+    @property
+    def spinner(self):
+        # Halo imports IPython when created, which is slow, so the spinner is only
+        # created once it's needed
+        if FancyLogger._spinner is None:
+            from halo import Halo
+
+            FancyLogger._spinner = Halo(spinner="dots")
+
+        return FancyLogger._spinner
+
     def message(self, level, message, details):
         fmsg = self.cfmt.message(level, message, details)
+        if self.task is None:
+            # Messages outside of a task are printed straight away
+            if level != "debug":
+                self.print(fmsg)
+            return
+
         self.task_persist_msgs.append(fmsg)
         txt = f"{self.task_text}: "
         if self.step_text is not None:
@@ -18,10 +18,12 @@ class TaskEventTracker:
         self._steps = list()
         self._current_step = None
         self._current_step_start_ts = None
+        self._buffer = None
 
     def _report_event(self, event, **details):
         details["event"] = event
         details["context"] = "task"
+        details["ts"] = datetime.now()
 
         details["task"] = self._task_name
         details["task_order"] = self._task_order
@@ -34,7 +36,26 @@ class TaskEventTracker:
         )
         details["total_steps"] = len(self._steps)
 
-        self._logger.report_event(**details)
+        self._send_event(details)
+
+    def _send_event(self, details):
+        if self._buffer is not None:
+            self._buffer.append(details)
+        else:
+            self._logger.report_event(**details)
+
+    def start_buffer(self):
+        """Holds the events reported from now on until `flush_buffer` is called, so that
+        the output of tasks running concurrently is not mixed."""
+        if self._buffer is None:
+            self._buffer = list()
+
+    def flush_buffer(self):
+        """Sends the held events to the loggers together"""
+        if self._buffer is not None:
+            events = self._buffer
+            self._buffer = None
+            self._logger.report_events(events)
 
     def set_run_steps(self, steps):
         self._report_event("set_run_steps", steps=steps)
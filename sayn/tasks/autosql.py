@@ -365,7 +365,7 @@ class AutoSqlTask(SqlTask):
                     self.write_compilation_output(query, step.replace(" ", "_").lower())
                 if execute:
                     try:
-                        self.target_db.execute(query)
+                        self._with_retry(self.target_db, self.target_db.execute, query)
                     except Exception as e:
                         return Exc(e)
 
@@ -474,7 +474,7 @@ class CopyTask(SqlTask):
                 self.write_compilation_output(query, "create_table")
             if execute:
                 try:
-                    self.target_db.execute(query)
+                    self._with_retry(self.target_db, self.target_db.execute, query)
                 except Exception as e:
                     return Exc(e)
 
@@ -534,7 +534,7 @@ class CopyTask(SqlTask):
                     )
                 if execute:
                     try:
-                        self.target_db.execute(query)
+                        self._with_retry(self.target_db, self.target_db.execute, query)
                     except Exception as e:
                         return Exc(e)
 
@@ -658,7 +658,11 @@ class CopyTask(SqlTask):
             and self.dst_incremental_key is not None
         ):
             if execute:
-                res = self.target_db.read_data(last_incremental_value_query)
+                res = self._with_retry(
+                    self.target_db,
+                    self.target_db.read_data,
+                    last_incremental_value_query,
+                )
                 if len(res) == 1:
                     last_incremental_value = res[0]["value"]
             else:
@@ -0,0 +1,215 @@
+import atexit
+import inspect
+import multiprocessing
+import pickle
+from threading import Lock
+
+from ..core.errors import Err, Exc, Ok, Result
+from ..core.executor import run_coroutine
+from .task import TaskStatus
+
+
+class _PipeLogger:
+    """Replaces the EventTracker in the task process, sending the events reported by
+    the task back to the parent process"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def report_event(self, **event):
+        self.connection.send(("event", _picklable(event)))
+
+    def report_events(self, events):
+        for event in events:
+            self.report_event(**event)
+
+
+def _picklable(obj):
+    """Returns the object if it can be sent to the parent process or a representation
+    of it otherwise. Mostly affects exceptions stored in Result objects."""
+    try:
+        pickle.dumps(obj)
+        return obj
+    except Exception:
+        pass
+
+    if isinstance(obj, dict):
+        return {k: _picklable(v) for k, v in obj.items()}
+    elif isinstance(obj, Result) and obj.is_ok:
+        return Ok(_picklable(obj.value))
+    elif isinstance(obj, Result):
+        return Err(obj.error.kind, obj.error.code, **_picklable(obj.error.details))
+    elif isinstance(obj, BaseException):
+        return RuntimeError(f"{type(obj).__name__}: {obj}")
+    else:
+        return repr(obj)
+
+
+def _execute_task(app, task_name, command, connection):
+    task = app.tasks.get(task_name)
+    if task is None or not task.in_query:
+        return Err(
+            "execution",
+            "process_executor_failed",
+            error_message=f'Task "{task_name}" is not in the task process\' task query',
+        )
+
+    if task.status == TaskStatus.READY_FOR_SETUP:
+        # The events from the setup were already reported by the parent process
+        result = app.setup_task(task)
+        if result.is_err:
+            return result
+
+    task.tracker._logger = _PipeLogger(connection)
+    task.tracker._buffer = None
+
+    try:
+        result = getattr(task.runner, command)()
+        if inspect.iscoroutine(result):
+            result = run_coroutine(result)
+    except Exception as exc:
+        result = Exc(exc)
+
+    return result
+
+
+def _worker(arguments, connection):
+    """Entry point of the task processes. The project is configured once with the
+    arguments of the run and the tasks received are executed until the pipe is closed"""
+    from ..core.cli_app import ProcessApp
+
+    try:
+        app = ProcessApp(arguments)
+    except SystemExit:
+        # Errors during config finish the app
+        app = None
+
+    while True:
+        try:
+            task_name, command = connection.recv()
+        except EOFError:
+            break
+
+        if app is None:
+            result = Err(
+                "execution",
+                "process_executor_failed",
+                error_message="The task process failed to configure the project",
+            )
+        else:
+            result = _execute_task(app, task_name, command, connection)
+
+        connection.send(("result", _picklable(result)))
+
+    if app is not None:
+        app.cleanup()
+
+    connection.close()
+
+
+class ProcessPool:
+    """Processes executing the tasks with `executor: process`.
+
+    Processes are started with the `spawn` method so that they don't inherit the
+    threads and locks of the SAYN process, which makes them safe to use with `--threads`.
+    As a consequence, each process configures the project again from the arguments of
+    the run and sets up the tasks it receives. Processes execute one task at a time and
+    are reused for later tasks.
+
+    Attributes:
+      arguments (Dict[str, Any]): the run arguments as returned by
+        `App.get_worker_arguments`
+    """
+
+    def __init__(self, arguments):
+        self.arguments = arguments
+        self.context = multiprocessing.get_context("spawn")
+        self.lock = Lock()
+        self.processes = list()
+        self.idle = list()
+
+        # Processes wait for tasks until their pipe is closed, which needs to happen
+        # before multiprocessing waits for them at exit
+        atexit.register(self.shutdown)
+
+    def _start_process(self):
+        connection, child_connection = self.context.Pipe()
+        process = self.context.Process(
+            target=_worker, args=(self.arguments, child_connection)
+        )
+        process.start()
+        child_connection.close()
+
+        self.processes.append((process, connection))
+        return process, connection
+
+    def start(self, n):
+        """Starts processes so that at least `n` are available"""
+        with self.lock:
+            for _ in range(n - len(self.processes)):
+                self.idle.append(self._start_process())
+
+    def execute(self, task_name, command, tracker):
+        """Executes a task command (run, compile or test) in one of the processes.
+        Events reported by the task are relayed to the tracker as they happen.
+
+        Args:
+          task_name (str): the name of the task
+          command (str): the name of the method to execute
+          tracker (TaskEventTracker): the tracker of the task in this process
+
+        Returns:
+          The result of the task command
+        """
+        with self.lock:
+            if len(self.idle) > 0:
+                process, connection = self.idle.pop()
+            else:
+                process, connection = self._start_process()
+
+        result = None
+        received_result = False
+        try:
+            connection.send((task_name, command))
+            while not received_result:
+                message_type, payload = connection.recv()
+                if message_type == "event":
+                    tracker._send_event(payload)
+                else:
+                    result = payload
+                    received_result = True
+        except (EOFError, OSError):
+            pass
+
+        if not received_result:
+            connection.close()
+            process.join()
+            with self.lock:
+                self.processes.remove((process, connection))
+
+            return Err(
+                "execution",
+                "process_executor_failed",
+                error_message=f"Task process finished unexpectedly (exit code {process.exitcode})",
+            )
+
+        with self.lock:
+            self.idle.append((process, connection))
+
+        if result is None:
+            return Ok()
+        else:
+            return result
+
+    def shutdown(self):
+        """Stops all processes"""
+        with self.lock:
+            processes = self.processes
+            self.processes = list()
+            self.idle = list()
+
+        for _, connection in processes:
+            connection.close()
+
+        for process, _ in processes:
+            process.join()
@@ -49,6 +49,7 @@ class DecoratorTask(PythonTask):
         tags,
         on_fail,
         func,
+        executor=None,
     ):
         super().__init__(
             name,
@@ -71,6 +72,7 @@ class DecoratorTask(PythonTask):
         self._config_input["parents"].update(parents)
         self._config_input["tags"].update(tags)
         self._config_input["on_fail"] = on_fail
+        self._config_input["executor"] = executor
         self._func = func
 
     def config(self):
@@ -126,6 +128,7 @@ class DecoratorTaskWrapper(Task):
         parents: Optional[Union[List[str], str]] = None,
         tags: Optional[Union[List[str], str]] = None,
         on_fail: Optional[OnFailValue] = None,
+        executor: Optional[str] = None,
     ):
         """The init method collects the information provided by the decorator itself"""
 
@@ -175,6 +178,8 @@ class DecoratorTaskWrapper(Task):
         else:
             raise ValueError(f"{on_fail} not a valid value for on_fail field")
 
+        self.executor = executor
+
     def __call__(
         self,
         name,
@@ -207,6 +212,7 @@ class DecoratorTaskWrapper(Task):
             self.tags,
             self.on_fail,
             self.func,
+            executor=self.executor,
         )
 
         return task
@@ -228,7 +234,15 @@ def task_type(func=None, sources=None, outputs=None, parents=None):
         return wrapper
 
 
-def task(func=None, sources=None, outputs=None, parents=None, tags=None, on_fail=None):
+def task(
+    func=None,
+    sources=None,
+    outputs=None,
+    parents=None,
+    tags=None,
+    on_fail=None,
+    executor=None,
+):
     if func:
         return DecoratorTaskWrapper(func)
     else:
@@ -241,6 +255,7 @@ def task(func=None, sources=None, outputs=None, parents=None, tags=None, on_fail
                 parents=parents,
                 tags=tags,
                 on_fail=on_fail,
+                executor=executor,
             )
 
         return wrapper
@@ -1,8 +1,10 @@
+from hashlib import sha256
 from pathlib import Path
 from typing import Any, List, Mapping, Optional, Union
 from enum import Enum
 import re
 
+import orjson
 from pydantic import BaseModel, FilePath, validator, Extra
 
 from ..core.errors import Exc, Ok, Err
@@ -365,6 +367,28 @@ class SqlTask(Task):
 
         return Ok()
 
+    def fingerprint(self):
+        # Scripts can have side effects and incremental loads depend on the data in
+        # their sources, so they're always executed
+        if self.materialisation in ("script", "incremental"):
+            return None
+
+        content = {
+            "sql_query": self.sql_query,
+            "materialisation": self.materialisation,
+            "delete_key": self.delete_key,
+            "connection": self._target_db,
+            "database": getattr(self, "database", None),
+            "schema": getattr(self, "schema", None),
+            "table": getattr(self, "table", None),
+            "ddl": self.ddl,
+            "full_load": self.run_arguments["full_load"],
+        }
+
+        return sha256(
+            orjson.dumps(content, default=str, option=orjson.OPT_SORT_KEYS)
+        ).hexdigest()
+
     def execute(self, execute, debug):
         if self.materialisation in ("table", "view", "incremental"):
             if self.run_arguments["debug"]:
@@ -435,7 +459,13 @@ class SqlTask(Task):
 
                 if execute and query:
                     try:
-                        self.target_db.execute(query)
+                        if self.materialisation == "script":
+                            # Scripts can have side effects, so they're never retried
+                            self.target_db.execute(query)
+                        else:
+                            self._with_retry(
+                                self.target_db, self.target_db.execute, query
+                            )
                     except Exception as e:
                         return Exc(e)
 
@@ -1,12 +1,14 @@
 from contextlib import contextmanager
 from enum import Enum
 from pathlib import Path
+import time
 from typing import Set, Dict, Any
 
 from colorama import Fore, Style
 
 from ..core.errors import Err, Ok
 from ..logging.task_event_tracker import TaskEventTracker
+from ..utils.compile_output import write_if_changed
 from ..utils.compiler import Compiler
 
 
@@ -59,6 +61,7 @@ class Task:
 
     _has_tests = False
     _needs_recompile = False
+    _compile_output = None
 
     # Handy properties
     @property
@@ -97,6 +100,13 @@ class Task:
     def compile(self):
         raise NotImplementedError("SAYN task", self.__class__.__name__, "compile")
 
+    def fingerprint(self):
+        """Returns a string identifying the output of the task, so that an execution can
+        be skipped if the task didn't change since its last successful execution
+        (`sayn run --changed-only`). Tasks returning None are always executed.
+        """
+        return None
+
     # Status methods
 
     def __init__(
@@ -132,6 +142,7 @@ class Task:
             "parents": set(),
             "tags": set(),
             "on_fail": None,
+            "executor": None,
             "task_name": None,
         }
 
@@ -215,6 +226,29 @@ class Task:
         yield
         self._tracker.finish_current_step()
 
+    def _with_retry(self, db, func, *args, **kwargs):
+        """Calls `func` retrying it with backoff following the retry policy of `db` when
+        it fails with a transient error (`Database._is_retryable`). Used within a step
+        so that only the failing statement is retried.
+        """
+        policy = db.retry_policy
+        attempt = 1
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if attempt >= policy.max_attempts or not db._is_retryable(e):
+                    raise
+
+                delay = policy.delay(attempt)
+                message = str(e).strip().split("\n")[0]
+                self.warning(
+                    f"Attempt {attempt} of {policy.max_attempts} failed with a transient "
+                    f"error, retrying in {delay}s: {message}"
+                )
+                time.sleep(delay)
+                attempt += 1
+
     # Test methods
 
     def get_test_breakdown(self, breakdown: list) -> list:
@@ -330,9 +364,7 @@ class Task:
             Path(f"{self.name}{'_'+suffix if suffix is not None else ''}.{extension}"),
         )
 
-        # Ensure the path exists and it's empty
-        path.parent.mkdir(parents=True, exist_ok=True)
-        if path.exists():
-            path.unlink()
-
-        path.write_text(str(content))
+        if self._compile_output is not None:
+            self._compile_output.write(self.name, path, content)
+        else:
+            write_if_changed(path, str(content))
@@ -1,9 +1,12 @@
 from copy import deepcopy
+from hashlib import sha256
+import inspect
 from typing import Any, Dict, Optional, Set
 
 from ..database.unknown import UnknownDb
 
 from ..core.errors import Err, Exc, Ok, Result
+from ..core.executor import defer_coroutine, then
 from ..utils.misc import map_nested
 
 from .task import Task, TaskStatus
@@ -23,8 +26,16 @@ _excluded_properties = (
     "preset",
     "on_fail",
     "module",
+    "executor",
 )
 
+# Task types that can be executed in a separate process
+_process_task_types = ("python", "python_module")
+
+
+def _object_to_list(obj):
+    return [obj.connection_name, obj.database, obj.schema, obj.table]
+
 
 class TaskWrapper:
     """Task wrapper managing the execution of tasks.
@@ -43,6 +54,10 @@ class TaskWrapper:
       in_query (bool): whether the task is selected for execution based on the task query
       runner (Task): the object that will do the actual work
       status (TaskStatus): the current status of the task
+      executor (str): where the task is executed: `thread` for the SAYN process or
+        `process` for a separate process (python tasks only)
+      process_pool (ProcessPool): the processes executing the task when the executor
+        is `process`
     """
 
     name: str
@@ -57,6 +72,8 @@ class TaskWrapper:
     in_query: bool = False
     runner: Optional[Task]
     status: TaskStatus = TaskStatus.UNKNOWN
+    executor: str = "thread"
+    process_pool = None
 
     def __init__(
         self,
@@ -75,6 +92,7 @@ class TaskWrapper:
         run_arguments,
         compiler,
         db_object_compiler,
+        compile_output=None,
     ):
         self.tags = set(tags or set())
         self.parent_names = set(parent_names or set())
@@ -88,6 +106,10 @@ class TaskWrapper:
         self.tracker = tracker
         self.runner = None
         self.fail_fast = False
+        self._fingerprint = None
+        self._fingerprint_done = False
+        self.external_sources = False
+        self._config_fingerprint = None
 
         self.name = name
         self.group = group
@@ -97,16 +119,19 @@ class TaskWrapper:
         self.default_db = default_db
         self.connections = dict(connections)
         self.db_object_compiler = db_object_compiler
+        self.compile_output = compile_output
 
         self.task_class = task_class
 
+        # The task compiler is only created when the task is configured
+        self.project_compiler = compiler
+        self.compiler = None
+
         if self.task_class is None:
             self.status = TaskStatus.FAILED
         else:
             self.status = TaskStatus.CONFIGURING
 
-            self.compiler = compiler.get_task_compiler(group=self.group, name=self.name)
-
             self.run_arguments = {
                 "debug": run_arguments.debug,
                 "with_tests": run_arguments.with_tests,
@@ -136,12 +161,21 @@ class TaskWrapper:
         if result.is_err or result.value == TaskStatus.SKIPPED:
             return result
 
+        self.compiler = self.project_compiler.get_task_compiler(
+            group=self.group, name=self.name
+        )
+
         try:
             self.set_parameters(project_parameters, task_parameters)
         except Exception as exc:
             self.status = TaskStatus.FAILED
             return Exc(exc, where="set_task_parameters")
 
+        result = self.set_executor(task_config.get("executor"))
+        if result.is_err:
+            self.status = TaskStatus.FAILED
+            return result
+
         # for decorator tasks
         if hasattr(self.task_class, "func_arguments"):
             for arg in self.task_class.func_arguments:
@@ -185,6 +219,7 @@ class TaskWrapper:
             return Exc(exc, where="compile_task_properties")
 
         self.runner = runner
+        self.runner._compile_output = self.compile_output
 
         try:
             result = self.runner.config(**runner_config)
@@ -212,6 +247,12 @@ class TaskWrapper:
             if runner._config_input.get("on_fail") is not None:
                 self.on_fail = runner._config_input["on_fail"]
 
+            if runner._config_input.get("executor") is not None:
+                result = self.set_executor(runner._config_input["executor"])
+                if result.is_err:
+                    self.status = TaskStatus.FAILED
+                    return result
+
             # A bit of cleaning on the user
             del runner._config_input
 
@@ -248,6 +289,42 @@ class TaskWrapper:
 
         return Ok()
 
+    def config_metadata(self):
+        """Returns the properties obtained from the config stage that are required to
+        build the DAG and resolve the task query, so that the config stage can be skipped
+        in future executions (see `config_from_cache`).
+        """
+        return {
+            "parents": sorted(self.parent_names),
+            "sources": sorted(_object_to_list(o) for o in self.sources),
+            "outputs": sorted(_object_to_list(o) for o in self.outputs),
+            "tags": sorted(self.tags),
+            "on_fail": self.on_fail,
+            "used_connections": sorted(self.used_connections),
+            "fingerprint": self.runner.fingerprint() if self.runner else None,
+            "dependencies": self.compiler.get_dependencies()
+            if self.compiler is not None
+            else list(),
+        }
+
+    def config_from_cache(self, metadata):
+        """Sets the properties of a task from the metadata stored in a previous execution
+        instead of running the config stage. Only valid for tasks not in the task query,
+        as the task can't be executed without a runner.
+        """
+        self.parent_names = set(metadata["parents"])
+        self.sources = {
+            self.db_object_compiler.db_object(*o) for o in metadata["sources"]
+        }
+        self.outputs = {
+            self.db_object_compiler.db_object(*o) for o in metadata["outputs"]
+        }
+        self.tags = set(metadata["tags"])
+        self.on_fail = metadata["on_fail"]
+        self.used_connections = set(metadata["used_connections"])
+        self._config_fingerprint = metadata["fingerprint"]
+        self.status = TaskStatus.READY_FOR_SETUP
+
     def set_parameters(
         self, project_parameters: Dict[str, Any], task_parameters: Dict[str, Any]
     ):
@@ -266,6 +343,30 @@ class TaskWrapper:
         # Add the task paramters to the jinja environment
         self.compiler.update_globals(**task_parameters)
 
+    def set_executor(self, executor):
+        if executor is None:
+            return Ok()
+
+        if executor not in ("thread", "process"):
+            return Err(
+                "task",
+                "wrong_executor",
+                error_message=f'Invalid executor "{executor}" for task "{self.name}". '
+                "Valid values: thread, process",
+            )
+
+        if executor == "process" and self.task_type not in _process_task_types:
+            return Err(
+                "task",
+                "wrong_executor",
+                error_message=f'Task "{self.name}" of type "{self.task_type}" '
+                'doesn\'t support "executor: process". Only python tasks can be '
+                "executed in a separate process",
+            )
+
+        self.executor = executor
+        return Ok()
+
     def check_skip(self):
         if self.fail_fast:
             self.status = TaskStatus.SKIPPED
@@ -379,33 +480,82 @@ class TaskWrapper:
         elif self.status not in (TaskStatus.SETTING_UP, TaskStatus.READY):
             return Err("execution", "setup_error", status=self.status)
         else:
-            try:
-                if command == "run":
-                    result = self.runner.run()
+            result = self.execute_runner(command)
 
-                    if not (isinstance(result, Result) and result.is_err) and (
-                        self.run_arguments["with_tests"] and self.has_tests()
-                    ):
-                        result = self.runner.test()
+            if command == "run" and (
+                self.run_arguments["with_tests"] and self.has_tests()
+            ):
+                result = then(result, self.execute_tests)
 
-                elif command == "compile":
-                    result = self.runner.compile()
-                else:
-                    result = self.runner.test()
+            return then(result, self.set_result_status)
 
-                if result is None:
-                    result = Ok()
-                    self.status = TaskStatus.SUCCEEDED
-                elif result.is_ok:
-                    self.status = TaskStatus.SUCCEEDED
-                else:
-                    self.status = TaskStatus.FAILED
-            except Exception as e:
-                self.status = TaskStatus.FAILED
-                result = Exc(e)
+    def execute_tests(self, run_result):
+        if isinstance(run_result, Result) and run_result.is_err:
+            return run_result
+        else:
+            return self.execute_runner("test")
+
+    def set_result_status(self, result):
+        if result is None:
+            result = Ok()
+            self.status = TaskStatus.SUCCEEDED
+        elif not isinstance(result, Result):
+            self.status = TaskStatus.FAILED
+            result = Err("task_result", "missing_result_error", result=result)
+        elif result.is_ok:
+            self.status = TaskStatus.SUCCEEDED
+        else:
+            self.status = TaskStatus.FAILED
 
+        return result
+
+    def execute_runner(self, command):
+        """Executes the command on the runner. Coroutines are scheduled in the event
+        loop and returned as a Deferred result, so no thread waits for them."""
+        try:
+            if self.executor == "process":
+                return self.process_pool.execute(self.name, command, self.tracker)
+
+            result = getattr(self.runner, command)()
+        except Exception as exc:
+            return Exc(exc)
+
+        if inspect.iscoroutine(result):
+            return defer_coroutine(result)
+        else:
             return result
 
+    @property
+    def fingerprint(self):
+        return self.calculate_fingerprint()
+
+    def calculate_fingerprint(self):
+        """A hash of the task combined with the fingerprints of its parents, so that it
+        changes when the task or anything upstream changes. None if the task or any of
+        its ancestors can't be fingerprinted (eg: python tasks) or reads from tables not
+        created by a task, as changes to those tables are unknown. Tasks without sources
+        or parents are assumed to read from such tables (eg: without `src`).
+        """
+        if not self._fingerprint_done:
+            if self.external_sources or (
+                len(self.sources) == 0 and len(self.parents) == 0
+            ):
+                fingerprints = [None]
+            elif self.runner is not None:
+                fingerprints = [self.runner.fingerprint()]
+            else:
+                fingerprints = [self._config_fingerprint]
+
+            for parent in sorted(self.parents, key=lambda x: x.name):
+                fingerprints.append(parent.fingerprint)
+
+            if None not in fingerprints:
+                self._fingerprint = sha256("\n".join(fingerprints).encode()).hexdigest()
+
+            self._fingerprint_done = True
+
+        return self._fingerprint
+
     def set_parents(self, all_tasks, output_to_task):
         for parent_name in self.parent_names:
             if parent_name not in all_tasks:
@@ -416,6 +566,7 @@ class TaskWrapper:
         missing = set()
         for source in self.sources:
             if source not in output_to_task:
+                self.external_sources = True
                 if source.connection_name == self.default_db:
                     # We only consider a missing parent if the
                     # source is in the default_db
@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+
+
+def write_if_changed(path, content):
+    """Writes the text content to the file unless the file already has that content.
+    Returns True if the file was written."""
+    path = Path(path)
+    data = content.encode("utf-8")
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return True
+
+
+class CompileOutput:
+    """The files written to the compile folder by the tasks in the current execution.
+
+    Files are written in a background thread and only when their content changes, so
+    the compile folder is not emptied at the start of every execution. The files
+    written by each task are recorded so that at the end of the execution (`prune`)
+    only the files no longer produced by any task are removed. Tasks that didn't write
+    any files (ie: not in the query) keep the ones from previous executions.
+
+    Attributes:
+        folder (Path): The compile folder.
+        command (str): The command executed, as each command writes different files.
+        previous (Dict[str, Dict[str, List[str]]]): The files written by each task in
+          previous executions per command, relative to the folder.
+        files (Dict[str, Set[str]]): The files written by each task in this execution.
+    """
+
+    def __init__(self, folder, command, previous=None):
+        self.folder = Path(folder)
+        self.command = command
+        self.previous = previous or dict()
+        self.files = dict()
+        self.pending = list()
+        self.lock = Lock()
+        self.pool = ThreadPoolExecutor(max_workers=1)
+
+    def write(self, task_name, path, content):
+        """Schedules the content to be written to the path, which is in the folder"""
+        content = str(content)
+        with self.lock:
+            self.files.setdefault(task_name, set()).add(
+                Path(path).relative_to(self.folder).as_posix()
+            )
+            self.pending.append(self.pool.submit(write_if_changed, path, content))
+
+    def flush(self):
+        """Waits for the scheduled writes, returning the exceptions raised by them"""
+        with self.lock:
+            pending = self.pending
+            self.pending = list()
+
+        return [f.exception() for f in pending if f.exception() is not None]
+
+    def prune(self, task_names):
+        """Removes the files not written in this execution that are no longer produced by
+        a task in the project. Returns the files of each task per command to be stored
+        for the next execution.
+
+        Args:
+            task_names (Iterable[str]): The tasks in the project.
+        """
+        self.flush()
+        task_names = set(task_names)
+
+        files = {
+            command: {k: v for k, v in tasks.items() if k in task_names}
+            for command, tasks in self.previous.items()
+        }
+        files[self.command] = dict(
+            files.get(self.command, dict()),
+            **{k: sorted(v) for k, v in self.files.items() if k in task_names},
+        )
+
+        keep = {f for tasks in files.values() for v in tasks.values() for f in v}
+        stale = {
+            f for tasks in self.previous.values() for v in tasks.values() for f in v
+        } - keep
+        for file_name in stale:
+            path = Path(self.folder, file_name)
+            try:
+                path.unlink()
+                # Group folders are removed once empty
+                if path.parent != self.folder and not any(path.parent.iterdir()):
+                    path.parent.rmdir()
+            except OSError:
+                pass
+
+        return {command: tasks for command, tasks in files.items() if len(tasks) > 0}
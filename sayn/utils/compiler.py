@@ -1,9 +1,18 @@
 from abc import ABC, abstractmethod
-from copy import deepcopy
+from collections import ChainMap
+import os
 from pathlib import Path
+from threading import Lock
+from types import MappingProxyType
 from typing import Union
 
-from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template
+from jinja2 import (
+    BytecodeCache,
+    Environment,
+    FileSystemLoader,
+    StrictUndefined,
+    Template,
+)
 
 from ..core.errors import SaynCompileError, SaynMissingFileError
 
@@ -18,6 +27,81 @@ class TaskJinjaEnv:
             self.name = name
 
 
+class TrackingLoader(FileSystemLoader):
+    """A file system loader recording the templates loaded through it, ie: the files
+    used in includes, imports and extends of the templates compiled"""
+
+    def __init__(self, searchpath):
+        super().__init__(searchpath)
+        self.loaded = set()
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        self.loaded.add(filename)
+        return source, filename, uptodate
+
+
+class TemplateCache(BytecodeCache):
+    """A jinja bytecode cache keeping the compiled templates in memory and, when a
+    folder is given, on disk so that they're not parsed again in later executions.
+
+    Entries are validated with the checksum of the template source, so templates are
+    only parsed again when their content changes. Only one file is kept per template.
+    """
+
+    def __init__(self, folder=None):
+        self.folder = Path(folder) if folder is not None else None
+        self.codes = dict()
+        self.lock = Lock()
+
+    def _get_cache_file(self, bucket):
+        return Path(self.folder, f"{bucket.key}.cache")
+
+    def load_bytecode(self, bucket):
+        with self.lock:
+            code = self.codes.get((bucket.key, bucket.checksum))
+
+        if code is not None:
+            bucket.code = code
+        elif self.folder is not None:
+            try:
+                with open(self._get_cache_file(bucket), "rb") as f:
+                    bucket.load_bytecode(f)
+            except OSError:
+                return
+
+            if bucket.code is not None:
+                with self.lock:
+                    self.codes[(bucket.key, bucket.checksum)] = bucket.code
+
+    def dump_bytecode(self, bucket, persist=True):
+        with self.lock:
+            self.codes[(bucket.key, bucket.checksum)] = bucket.code
+
+        if self.folder is None or not persist:
+            return
+
+        # Written to a temporary file first so that concurrent executions never read
+        # a partial file
+        cache_file = self._get_cache_file(bucket)
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        try:
+            self.folder.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, "wb") as f:
+                bucket.write_bytecode(f)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            tmp_file.unlink(missing_ok=True)
+
+    def clear(self):
+        with self.lock:
+            self.codes.clear()
+
+        if self.folder is not None:
+            for cache_file in self.folder.glob("*.cache"):
+                cache_file.unlink(missing_ok=True)
+
+
 class BaseCompiler(ABC):
     @abstractmethod
     def compile(self, obj: Union[Template, Path, str], **kwargs) -> str:
@@ -36,6 +120,10 @@ class Compiler(BaseCompiler):
             "end_dt": f"'{run_arguments.end_dt.strftime('%Y-%m-%d')}'",
         }
 
+        self.template_cache = TemplateCache(
+            Path(run_arguments.folders.state, "templates")
+        )
+
         self.env = self._create_environment()
         self.env.globals.update(**env_arguments)
         self.env.globals.update(**parameters)
@@ -44,12 +132,26 @@ class Compiler(BaseCompiler):
         self.prod_env.globals.update(**env_arguments)
         self.prod_env.globals.update(**prod_parameters)
 
-    def _create_environment(self):
+    def _create_environment(self, loader=None):
         return Environment(
-            loader=FileSystemLoader(Path(".")),
+            loader=loader or FileSystemLoader(Path(".")),
             undefined=StrictUndefined,
             keep_trailing_newline=True,
             cache_size=0,
+            bytecode_cache=self.template_cache,
+        )
+
+    def _from_source(self, env, source, path=None):
+        """Returns the template for the source, only parsing it if it's not in the
+        template cache. Templates from strings are only cached in memory."""
+        name = str(path) if path is not None else "<string>"
+        bucket = self.template_cache.get_bucket(env, name, None, source)
+        if bucket.code is None:
+            bucket.code = env.compile(source)
+            self.template_cache.dump_bytecode(bucket, persist=path is not None)
+
+        return env.template_class.from_code(
+            env, bucket.code, env.make_globals(None), None
         )
 
     def _get_template(
@@ -66,10 +168,10 @@ class Compiler(BaseCompiler):
             if not obj.is_file():
                 raise SaynMissingFileError(str(obj))
             else:
-                return env.from_string(obj.read_text(encoding="utf-8"))
+                return self._from_source(env, obj.read_text(encoding="utf-8"), obj)
 
         elif isinstance(obj, str):
-            return env.from_string(obj)
+            return self._from_source(env, obj)
 
         else:
             raise SaynCompileError(f'Cannot compile object of type "{type(obj)}"')
@@ -126,10 +228,21 @@ class Prepared:
 
 class TaskCompiler(Compiler):
     def __init__(self, base_env, base_prod_env, task) -> None:
-        self.env = self._create_environment()
-        self.env.globals.update(**deepcopy(base_env.globals))
-        self.env.globals["task"] = task
-
-        self.prod_env = self._create_environment()
-        self.prod_env.globals.update(**deepcopy(base_prod_env.globals))
-        self.prod_env.globals["task"] = task
+        self.loader = TrackingLoader(Path("."))
+        self.template_cache = base_env.bytecode_cache
+
+        self.env = self._create_task_environment(base_env, task)
+        self.prod_env = self._create_task_environment(base_prod_env, task)
+
+    def _create_task_environment(self, base_env, task):
+        """Returns an overlay of the base environment where the task globals are
+        layered over the project globals, which are shared by all tasks instead of
+        copied. Globals added to the task environment never reach the project layer."""
+        env = base_env.overlay(loader=self.loader)
+        env.globals = ChainMap({"task": task}, MappingProxyType(base_env.globals))
+        return env
+
+    def get_dependencies(self):
+        """Returns the paths of the files included, imported or extended by the templates
+        compiled by this task so far"""
+        return sorted(self.loader.loaded)
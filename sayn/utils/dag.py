@@ -1,3 +1,5 @@
+from collections import deque
+
 from .misc import reverse_dict_inclusive
 
 from ..core.errors import Err, Ok
@@ -14,35 +16,70 @@ def _has_missing_parents(dag):
     return Ok(False)
 
 
-def _is_cyclic_helper(dag, node, visited, stack, breadcrumbs):
-    visited[node] = True
-    stack[node] = True
-
-    for parent in dag[node]:
-        if parent == node:
-            return Err("dag", "cycle_error", path=[node, parent])
-        elif not visited[parent]:
-            result = _is_cyclic_helper(
-                dag, parent, visited, stack, breadcrumbs + [parent]
-            )
-            if result.is_err:
-                return result
-        elif stack[parent]:
-            return Err("dag", "cycle_error", path=breadcrumbs + [parent])
+def _get_cycle(dag):
+    """Depth first search returning the first cycle found as an error. Nodes are
+    visited in the order of the dag and their parents, so that the path reported is
+    stable between executions"""
+    visited = set()
+    for root in dag.keys():
+        if root in visited:
+            continue
 
-    stack[node] = False
+        # The stack contains the path from the root to the current node, with an
+        # iterator over the parents pending for each of them
+        visited.add(root)
+        path = [root]
+        on_path = {root}
+        stack = [iter(dag[root])]
+        while len(stack) > 0:
+            node = path[-1]
+            parent = next(stack[-1], None)
+            if parent is None:
+                stack.pop()
+                on_path.discard(path.pop())
+            elif parent == node:
+                return Err("dag", "cycle_error", path=[node, parent])
+            elif parent in on_path:
+                return Err("dag", "cycle_error", path=path + [parent])
+            elif parent not in visited:
+                visited.add(parent)
+                path.append(parent)
+                on_path.add(parent)
+                stack.append(iter(dag[parent]))
 
     return Ok()
 
 
+def _kahn_sort(dag):
+    """Returns a topological order of the dag (parents before children) or None if
+    the dag contains a cycle"""
+    children = {n: list() for n in dag.keys()}
+    n_parents = dict()
+    for node, parents in dag.items():
+        unique_parents = set(parents)
+        n_parents[node] = len(unique_parents)
+        for parent in unique_parents:
+            children[parent].append(node)
+
+    ready = deque(n for n, count in n_parents.items() if count == 0)
+    ordered = list()
+    while len(ready) > 0:
+        node = ready.popleft()
+        ordered.append(node)
+        for child in children[node]:
+            n_parents[child] -= 1
+            if n_parents[child] == 0:
+                ready.append(child)
+
+    if len(ordered) < len(dag):
+        return None
+
+    return ordered
+
+
 def _is_cyclic(dag):
-    visited = {n: False for n in dag.keys()}
-    stack = {n: False for n in dag.keys()}
-    for node in dag.keys():
-        if not visited[node]:
-            result = _is_cyclic_helper(dag, node, visited, stack, [node])
-            if result.is_err:
-                return result
+    if _kahn_sort(dag) is None:
+        return _get_cycle(dag)
 
     return Ok(True)
 
@@ -60,83 +97,183 @@ def dag_is_valid(dag):
 
 # DAG -> Sorted list
 def topological_sort(dag):
+    """Sorts the dag so that parents always come before their children.
+
+    The order is that of repeatedly scanning the tasks in the order they're defined
+    and taking the ones whose parents have already been taken, computed in linear time
+    as the scan (pass) on which each task would be taken.
+    """
     if len(dag) == 0:
         return Ok(list())
-    result = dag_is_valid(dag)
+    result = _has_missing_parents(dag)
     if result.is_err:
         return result
-    topo_sorted = []
-    pending = list(dag.keys())
-    current = 0
-    while True:
-        if len(set(dag[pending[current]]) - set(topo_sorted)) == 0:
-            topo_sorted.append(pending.pop(current))
-
-            if len(pending) == 0:
-                return Ok(topo_sorted)
-        else:
-            current += 1
 
-        if current == len(pending):
-            current = 0
+    ordered = _kahn_sort(dag)
+    if ordered is None:
+        return _get_cycle(dag)
 
-    return Ok(topo_sorted)
+    # A task is taken in the same scan as its last parent if the parent is defined
+    # before it and in the following scan otherwise
+    position = {n: i for i, n in enumerate(dag.keys())}
+    scan = dict()
+    for node in ordered:
+        scan[node] = max(
+            [scan[p] + (1 if position[p] > position[node] else 0) for p in dag[node]],
+            default=0,
+        )
+
+    scans = [list() for _ in range(max(scan.values()) + 1)]
+    for node in dag.keys():
+        scans[scan[node]].append(node)
+
+    return Ok([n for nodes in scans for n in nodes])
 
 
 # DAG querying
+class DagIndex:
+    """Ancestors and descendants of every node in a dag, stored as bitsets (python
+    integers) over the positions of the nodes in topological order.
+
+    Built once per dag, upstream and downstream selections in queries are resolved with
+    bitwise operations instead of traversing the dag for each query component. Each
+    bitset takes memory proportional to the size of the dag, so they're calculated the
+    first time a node is used in a query and cached.
+
+    Attributes:
+        order (List[str]): The nodes in topological order.
+        position (Dict[str, int]): The position of each node in `order`.
+    """
+
+    def __init__(self, dag, topo_sort):
+        self.order = topo_sort
+        self.position = {n: i for i, n in enumerate(topo_sort)}
+
+        self._parents = dag
+        self._children = {n: list() for n in topo_sort}
+        for node in topo_sort:
+            for parent in dag[node]:
+                self._children[parent].append(node)
+
+        self._ancestors = dict()
+        self._descendants = dict()
+
+    def _reachable(self, node, edges, cache):
+        """Returns the bitset of the nodes reachable from the node following the edges.
+        Nodes with a bitset already in the cache are not traversed again."""
+        visited = set()
+        cached_bits = 0
+        stack = list(edges[node])
+        while len(stack) > 0:
+            current = stack.pop()
+            if current not in visited:
+                visited.add(current)
+                if current in cache:
+                    cached_bits |= cache[current]
+                else:
+                    stack.extend(edges[current])
+
+        bits = bytearray((len(self.order) + 7) // 8)
+        for current in visited:
+            position = self.position[current]
+            bits[position // 8] |= 1 << (position % 8)
+
+        return int.from_bytes(bits, "little") | cached_bits
+
+    def node(self, node):
+        return 1 << self.position[node] if node in self.position else 0
+
+    def ancestors(self, node):
+        if node not in self.position:
+            return 0
+
+        if node not in self._ancestors:
+            self._ancestors[node] = self._reachable(
+                node, self._parents, self._ancestors
+            )
+
+        return self._ancestors[node]
+
+    def descendants(self, node):
+        if node not in self.position:
+            return 0
+
+        if node not in self._descendants:
+            self._descendants[node] = self._reachable(
+                node, self._children, self._descendants
+            )
+
+        return self._descendants[node]
+
+    def all(self):
+        return (1 << len(self.order)) - 1
+
+    def nodes(self, bits):
+        """Returns the list of nodes in the bitset in topological order"""
+        return [
+            self.order[i] for i, bit in enumerate(reversed(bin(bits)[2:])) if bit == "1"
+        ]
+
+
+def get_index(dag):
+    result = topological_sort(dag)
+    if result.is_err:
+        return result
+
+    return Ok(DagIndex(dag, result.value))
+
+
 def downstream(dag, node):
     return upstream(reverse_dict_inclusive(dag), node)
 
 
 def upstream(dag, node):
     to_include = list()
-    queue = dag[node]
+    included = set()
+    queue = deque(dag[node])
     while len(queue) > 0:
-        current = queue.pop(0)
-        if current not in to_include:
+        current = queue.popleft()
+        if current not in included:
             to_include.append(current)
+            included.add(current)
             queue.extend(dag[current])
 
     return Ok(to_include)
 
 
-def query(dag, query=list()):
-    result = topological_sort(dag)
-    if result.is_err:
-        return result
-    elif len(query) == 0:
-        return Ok(result.value)
-    else:
-        topo_sort = result.value
+def query(dag, query=list(), index=None):
+    """Returns the list of nodes selected by the query in topological order.
+
+    Args:
+      dag (Dict[str, List[str]]): the dag as a dictionary of node to list of parents
+      query (List[Dict]): the query components as returned by `task_query.get_query`
+      index (DagIndex): an index for the dag. If not specified it's built from the dag
+    """
+    if index is None:
+        result = get_index(dag)
+        if result.is_err:
+            return result
+        index = result.value
+
+    if len(query) == 0:
+        return Ok(list(index.order))
 
     query = sorted(query, key=lambda x: 0 if x["operation"] == "include" else 1)
     if query[0]["operation"] == "include":
-        to_include = set()
+        selected = 0
     else:
-        to_include = set(topo_sort)
-    query_cache = dict()
+        selected = index.all()
 
     for operand in query:
-        key = (operand["task"], operand["upstream"], operand["downstream"])
-        if key in query_cache:
-            tasks = query_cache[key]
-        else:
-            tasks = [key[0]]
-            if key[1]:
-                result = upstream(dag, key[0])
-                if result.is_err:
-                    return result
-                tasks.extend(result.value)
-            if key[2]:
-                result = downstream(dag, key[0])
-                if result.is_err:
-                    return result
-                tasks.extend(result.value)
-            query_cache[key] = tasks
+        bits = index.node(operand["task"])
+        if operand["upstream"]:
+            bits |= index.ancestors(operand["task"])
+        if operand["downstream"]:
+            bits |= index.descendants(operand["task"])
 
         if operand["operation"] == "include":
-            to_include = to_include.union(tasks)
+            selected |= bits
         else:
-            to_include -= set(tasks)
+            selected &= ~bits
 
-    return Ok([n for n in topo_sort if n in to_include])
+    return Ok(index.nodes(selected))
@@ -0,0 +1,101 @@
+from fnmatch import translate
+import os
+from pathlib import Path
+import re
+
+_magic_check = re.compile("[*?[]")
+
+
+def _is_literal(segment):
+    return _magic_check.search(segment) is None
+
+
+def _match_parts(parts, segments, links, start=0):
+    """Returns True if the path parts from `start` match the glob segments, where `**`
+    matches any number of directories that are not symlinks (as `Path.glob` doesn't
+    follow them in recursive patterns)"""
+    if len(segments) == 0:
+        return start == len(parts)
+    elif segments[0] == "**":
+        # The last part is always a file, so `**` only matches directories before it
+        for i in range(start, len(parts)):
+            if _match_parts(parts, segments[1:], links, i):
+                return True
+            if "/".join(parts[: i + 1]) in links:
+                return False
+        return False
+    else:
+        return (
+            start < len(parts)
+            and segments[0].match(parts[start]) is not None
+            and _match_parts(parts, segments[1:], links, start + 1)
+        )
+
+
+class FileIndex:
+    """Index of the files in a folder, scanned once so that multiple globs and file
+    checks don't walk the folder again.
+
+    Attributes:
+        folder (Path): The folder indexed.
+        files (List[str]): The path of each file relative to the folder, in the same
+          order returned by `Path.glob` (depth first with the files in a folder before
+          its subfolders).
+        links (Set[str]): The subfolders that are symlinks, relative to the folder.
+          Symlinks pointing to the folder containing them or to one of its parents are
+          not followed to avoid infinite loops.
+    """
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        self.files = list()
+        self.links = set()
+
+        for dirpath, dirnames, filenames in os.walk(self.folder, followlinks=True):
+            relative = Path(dirpath).relative_to(self.folder)
+            for filename in filenames:
+                self.files.append((relative / filename).as_posix())
+
+            realpath = os.path.realpath(dirpath)
+            for dirname in list(dirnames):
+                path = os.path.join(dirpath, dirname)
+                if not os.path.islink(path):
+                    continue
+
+                target = os.path.realpath(path)
+                if os.path.commonpath((target, realpath)) == target:
+                    dirnames.remove(dirname)
+                else:
+                    self.links.add((relative / dirname).as_posix())
+
+        self.file_set = set(self.files)
+
+    def is_file(self, file_name):
+        """Returns True if the path relative to the folder is a file in the index"""
+        return Path(file_name).as_posix() in self.file_set
+
+    def glob(self, pattern):
+        """Returns the files in the folder matching the glob pattern, as `Path.glob`
+        does, but without accessing the file system. Directories are never returned."""
+        segments = [
+            s for s in Path(pattern).as_posix().split("/") if s not in ("", ".")
+        ]
+        if Path(pattern).is_absolute() or ".." in segments:
+            # Patterns going outside the folder can't be resolved with the index
+            return [p for p in self.folder.glob(pattern) if p.is_file()]
+
+        # Only files under the literal part of the pattern need to be matched
+        prefix = ""
+        for segment in segments[:-1]:
+            if not _is_literal(segment):
+                break
+            prefix += f"{segment}/"
+
+        compiled = [s if s == "**" else re.compile(translate(s)) for s in segments]
+
+        return [
+            Path(self.folder, file)
+            for file in self.files
+            if file.startswith(prefix)
+            and _match_parts(file.split("/"), compiled, self.links)
+        ]
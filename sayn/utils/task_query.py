@@ -6,6 +6,7 @@ from ..core.errors import Err, Ok
 # Task query interpretation functions
 #####################################
 
+# Single component of a task query: [+]task_name[+], group:group_name or tag:tag_name
 RE_TASK_QUERY = re.compile(
     (
         r"^("
@@ -16,74 +17,117 @@ RE_TASK_QUERY = re.compile(
     )
 )
 
+# Group or tag selectors that can be combined with commas to select their intersection
+RE_SELECTOR = re.compile(
+    r"^(group:(?P<group>[a-zA-Z0-9][-_a-zA-Z0-9]+)|tag:(?P<tag>[a-zA-Z0-9][-_a-zA-Z0-9]+))$"
+)
 
-def _get_query_component(tasks, query):
-    tasks = {
-        k: {"group": v["group"], "tags": v.get("tags", list())}
-        for k, v in tasks.items()
-    }
-    match = RE_TASK_QUERY.match(query)
-    if match is None:
-        return Err(
-            "task_query",
-            "incorrect_syntax",
-            query=query,
-        )
-    else:
-        match_components = match.groupdict()
 
-        if match_components.get("tag") is not None:
-            tag = match_components["tag"]
-            relevant_tasks = {
-                k: v for k, v in tasks.items() if tag in v.get("tags", list())
-            }
-            if len(relevant_tasks) == 0:
-                return Err(
-                    "task_query",
-                    "undefined_tag",
-                    tag=tag,
-                )
-            return Ok(
-                [
-                    {"task": task, "upstream": False, "downstream": False}
-                    for task in relevant_tasks.keys()
-                ]
+class TaskIndex:
+    """Index of the tasks in the project by group and tag, used to resolve the
+    components of a task query without scanning all tasks for each of them.
+
+    Attributes:
+        tasks (Set[str]): The names of all tasks.
+        groups (Dict[str, List[str]]): The tasks in each group, in definition order.
+        tags (Dict[str, List[str]]): The tasks with each tag, in definition order.
+    """
+
+    def __init__(self, tasks):
+        self.tasks = set(tasks.keys())
+        self.groups = dict()
+        self.tags = dict()
+        for name, task in tasks.items():
+            self.groups.setdefault(task["group"], list()).append(name)
+            for tag in task.get("tags") or list():
+                self.tags.setdefault(tag, list()).append(name)
+
+    def _select(self, selector):
+        """Returns the list of tasks matching a single group or tag selector"""
+        match = RE_SELECTOR.match(selector)
+        if match is None:
+            return Err("task_query", "incorrect_syntax", query=selector)
+
+        tag = match.groupdict()["tag"]
+        if tag is not None:
+            if tag not in self.tags:
+                return Err("task_query", "undefined_tag", tag=tag)
+            return Ok(self.tags[tag])
+
+        group = match.groupdict()["group"]
+        if group not in self.groups:
+            return Err("task_query", "undefined_group", group=group)
+        return Ok(self.groups[group])
+
+    def _intersection(self, query):
+        """Resolves a comma separated list of group and tag selectors to the tasks
+        matching all of them (eg: `tag:marketing,group:models`)"""
+        selected = None
+        for selector in query.split(","):
+            result = self._select(selector)
+            if result.is_err:
+                return result
+            elif selected is None:
+                selected = result.value
+            else:
+                matching = set(result.value)
+                selected = [t for t in selected if t in matching]
+
+        if len(selected) == 0:
+            return Err(
+                "task_query",
+                "empty_intersection",
+                query=query,
+                error_message=f'No tasks match all selectors in "{query}"',
             )
 
-        if match_components.get("group") is not None:
-            group = match_components["group"]
-            relevant_tasks = {k: v for k, v in tasks.items() if group == v.get("group")}
-            if len(relevant_tasks) == 0:
-                return Err("task_query", "undefined_group", group=group)
-            return Ok(
-                [
-                    {"task": task, "upstream": False, "downstream": False}
-                    for task in relevant_tasks.keys()
-                ]
-            )
+        return Ok(selected)
 
-        if match_components.get("task") is not None:
-            task = match_components["task"]
-            if task not in tasks:
-                return Err(
-                    "task_query",
-                    "undefined_task",
-                    task=task,
+    def get_query_component(self, query):
+        """Returns the list of task operands (without operation) for a query component"""
+        if "," in query:
+            result = self._intersection(query)
+        else:
+            match = RE_TASK_QUERY.match(query)
+            if match is None:
+                return Err("task_query", "incorrect_syntax", query=query)
+
+            match_components = match.groupdict()
+            task = match_components.get("task")
+            if task is None:
+                result = self._select(query)
+            elif task not in self.tasks:
+                return Err("task_query", "undefined_task", task=task)
+            else:
+                return Ok(
+                    [
+                        {
+                            "task": task,
+                            "upstream": match_components.get("upstream", "") == "+",
+                            "downstream": match_components.get("downstream", "") == "+",
+                        }
+                    ]
                 )
-            return Ok(
-                [
-                    {
-                        "task": task,
-                        "upstream": match_components.get("upstream", "") == "+",
-                        "downstream": match_components.get("downstream", "") == "+",
-                    }
-                ]
-            )
 
-        return Err("task_query", "wrong_query")
+        if result.is_err:
+            return result
+
+        return Ok(
+            [
+                {"task": task, "upstream": False, "downstream": False}
+                for task in result.value
+            ]
+        )
 
 
 def get_query(tasks, include=None, exclude=None):
+    """Interprets the task query returning a list of operands for `dag.query`
+
+    Args:
+      tasks (Dict[str, Dict]): the tasks in the project with their group and tags
+      include (Set[str]): query components to include
+      exclude (Set[str]): query components to exclude
+    """
     if include is None:
         include = set()
 
@@ -99,10 +143,12 @@ def get_query(tasks, include=None, exclude=None):
             overlap=overlap,
         )
 
+    index = TaskIndex(tasks)
+
     output = list()
     for operation, components in (("include", include), ("exclude", exclude)):
         for q in components:
-            result = _get_query_component(tasks, q)
+            result = index.get_query_component(q)
             if result.is_err:
                 return result
             else:
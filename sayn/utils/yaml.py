@@ -1,16 +1,34 @@
 from pydantic import ValidationError
 from ruamel.yaml import YAML
-from ruamel.yaml.error import MarkedYAMLError
+from ruamel.yaml.error import MarkedYAMLError, YAMLError
 
 from ..core.errors import SaynMissingFileError, SaynParsingError
 
 
 def read_yaml_file(file, Model):
+    """Returns the content of the yaml file validated with the pydantic model.
+
+    Files are parsed with the safe loader first, which is faster (specially with the C
+    extension) but doesn't keep the line and column of each value. If the file can't be
+    parsed or it's not valid, it's parsed again with the round-trip loader to report
+    the position of the errors found.
+    """
     if not file.exists():
         raise SaynMissingFileError(str(file))
 
+    content = file.read_text()
+
+    try:
+        return Model(**YAML(typ="safe").load(content))
+    except (YAMLError, ValidationError, TypeError):
+        pass
+
+    return read_yaml_round_trip(file, content, Model)
+
+
+def read_yaml_round_trip(file, content, Model):
     try:
-        parsed = YAML().load(file.read_text())
+        parsed = YAML().load(content)
     except MarkedYAMLError as exc:
         raise SaynParsingError(
             "yaml_parsing",
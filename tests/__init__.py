@@ -5,7 +5,9 @@ import subprocess
 
 
 from sayn.core.app import RunArguments
+from sayn.core.errors import Ok
 from sayn.database.creator import create as create_db
+from sayn.tasks.task import TaskStatus
 from sayn.utils.compiler import Compiler
 
 
@@ -54,6 +56,35 @@ def create_project(dirpath, settings=None, project=None, groups=dict(), env=dict
             del os.environ[k]
 
 
+def python_project(module, content):
+    """Files for inside_dir with a project on sqlite running the decorator tasks in the
+    module content"""
+    return {
+        "settings.yaml": (
+            "profiles:\n"
+            "  dev:\n"
+            "    credentials:\n"
+            "      warehouse: dev_db\n"
+            "default_profile: dev\n"
+            "credentials:\n"
+            "  dev_db:\n"
+            "    type: sqlite\n"
+            "    database: dev.db\n"
+        ),
+        "project.yaml": (
+            "required_credentials:\n"
+            "  - warehouse\n"
+            "default_db: warehouse\n"
+            "groups:\n"
+            f"  {module}:\n"
+            "    type: python\n"
+            f"    module: {module}\n"
+        ),
+        "python/__init__.py": "",
+        f"python/{module}.py": content,
+    }
+
+
 def run_sayn(*args):
     return subprocess.check_output(
         f"sayn {' '.join(args)}", shell=True, stderr=subprocess.STDOUT
@@ -76,10 +107,66 @@ class VoidTracker:
     def info(self, msg):
         pass
 
+    def warning(self, msg):
+        pass
+
 
 vd = VoidTracker()
 
 
+# Fakes of the objects used by the app, its executor and the workers
+
+
+class FakeLogger:
+    def __init__(self):
+        self.events = list()
+
+    def report_event(self, **event):
+        self.events.append(event)
+
+
+class FakeTracker:
+    def __init__(self):
+        self.buffered = False
+        self.flushed = False
+
+    def start_buffer(self):
+        self.buffered = True
+
+    def flush_buffer(self):
+        self.flushed = True
+
+
+class FakeTask:
+    def __init__(
+        self,
+        name=None,
+        parents=None,
+        in_query=True,
+        used_connections=None,
+        status=TaskStatus.READY_FOR_SETUP,
+        outputs=None,
+        fingerprint=None,
+    ):
+        self.name = name
+        self.parents = parents or list()
+        self.in_query = in_query
+        self.used_connections = used_connections or set()
+        self.status = status
+        self.outputs = outputs or set()
+        self.fingerprint = fingerprint
+        self.tracker = FakeTracker()
+        self.setup_args = None
+
+    def setup(self, in_query, sources_from_prod):
+        self.setup_args = (in_query, sources_from_prod)
+        self.status = TaskStatus.READY
+        return Ok()
+
+    def check_skip(self):
+        return Ok(TaskStatus.READY)
+
+
 def simulate_task(
     task_class,
     used_objects,
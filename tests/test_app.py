@@ -0,0 +1,126 @@
+from datetime import date
+from concurrent.futures import Future
+from uuid import UUID, uuid4
+
+from sayn.core.app import App
+from sayn.core.errors import Err, Ok
+from sayn.database.creator import create as create_db
+from sayn.database.objects import DbObjectCompiler
+from sayn.tasks.task import TaskStatus
+
+from . import FakeTask
+
+
+def get_future(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def get_app(connection_results):
+    app = App()
+    app.sources_from_prod = set()
+    app.connection_futures = {k: get_future(v) for k, v in connection_results.items()}
+    return app
+
+
+def test_pipelined_setup():
+    app = get_app({"db1": Ok(), "db2": Err("database", "introspection")})
+
+    task = FakeTask(used_connections={"db1"})
+    assert app.setup_task(task).is_ok
+    assert task.status == TaskStatus.READY
+    assert task.setup_args == (True, set())
+
+
+def test_pipelined_setup_connection_error():
+    app = get_app({"db1": Ok(), "db2": Err("database", "introspection")})
+
+    task = FakeTask(used_connections={"db1", "db2"})
+    result = app.setup_task(task)
+    assert result.is_err
+    assert result.error.code == "introspection"
+    assert task.status == TaskStatus.SETUP_FAILED
+    assert task.setup_args is None
+
+
+def test_startup_profile():
+    app = App()
+    with app.profile("config"):
+        pass
+    with app.profile("config"):
+        pass
+
+    assert list(app.startup_profile.keys()) == ["config"]
+    assert app.startup_profile["config"] >= 0
+
+
+def test_startup_profile_task_setup():
+    app = get_app({"db1": Ok()})
+
+    assert app.setup_task(FakeTask(used_connections={"db1"})).is_ok
+    assert "task setup" in app.startup_profile
+
+
+def test_worker_run_id():
+    app = App()
+    app.run_arguments.start_dt = app.run_arguments.end_dt = date(2024, 1, 1)
+
+    # Workers report the events of their tasks with the run ID of the coordinator
+    run_id = UUID(app.get_worker_arguments()["run_id"])
+    assert run_id == app.run_id
+    assert App(run_id).run_id == run_id
+    assert App(uuid4()).run_id != run_id
+
+
+def test_config_cache_key():
+    app = App()
+    app.input_stringify = app.input_prod_stringify = dict()
+    app.from_prod = set()
+    app.run_arguments.start_dt = date(2024, 1, 1)
+    app.run_arguments.end_dt = date(2024, 1, 1)
+    key = app.get_config_cache_key()
+    assert app.get_config_cache_key() == key
+
+    # Arguments available to templates invalidate the cached config
+    app.run_arguments.start_dt = date(2023, 12, 1)
+    assert app.get_config_cache_key() != key
+
+    app.run_arguments.start_dt = date(2024, 1, 1)
+    app.run_arguments.end_dt = date(2024, 1, 2)
+    assert app.get_config_cache_key() != key
+
+    app.run_arguments.end_dt = date(2024, 1, 1)
+    app.run_arguments.full_load = True
+    assert app.get_config_cache_key() != key
+
+
+def test_unchanged_outputs_exist():
+    db = create_db("db1", "db1", {"type": "sqlite", "database": ":memory:"})
+    db._activate_connection()
+    db.execute("CREATE TABLE t1 (x INT)")
+    db._introspect({"": {"": {"t1", "t2"}}})
+
+    stringify = {
+        f"{t}_{s}": None
+        for t in ("database", "schema", "table")
+        for s in ("prefix", "suffix", "override")
+    }
+
+    app = App()
+    app.connections = {"db1": db}
+    app.db_object_compiler = DbObjectCompiler(
+        app.connections, "db1", stringify, stringify, set()
+    )
+    app.run_arguments.changed_only = True
+    app.task_fingerprints = {"task1": "abc", "task2": "abc"}
+
+    task1 = FakeTask(
+        "task1", outputs={app.db_object_compiler.from_string("t1")}, fingerprint="abc"
+    )
+    task2 = FakeTask(
+        "task2", outputs={app.db_object_compiler.from_string("t2")}, fingerprint="abc"
+    )
+    assert app.is_unchanged(task1)
+    # The table was dropped since the last run, so the task needs to run again
+    assert not app.is_unchanged(task2)
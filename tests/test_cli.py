@@ -1,4 +1,6 @@
 from datetime import date, timedelta, datetime
+import subprocess
+import sys
 
 import click
 from click.testing import CliRunner
@@ -455,3 +457,42 @@ def test_compile_include_exclude():
         "start_dt": None,
         "end_dt": None,
     }
+
+
+@cli.command()
+@tcli.click_threads
+def threads_cmd(threads):
+    return {"threads": threads}
+
+
+def test_threads_default():
+    assert get_output("threads-cmd") == {"threads": None}
+
+
+def test_threads():
+    assert get_output("threads-cmd --threads 4") == {"threads": 4}
+    assert get_output("threads-cmd -n 2") == {"threads": 2}
+
+
+@cli.command()
+@tcli.click_resume
+def resume_cmd(resume):
+    return {"resume": resume if resume is None else str(resume)}
+
+
+def test_resume():
+    assert get_output("resume-cmd") == {"resume": None}
+
+    run_id = "0c4cba5c-4c5e-4b3c-9d0b-5a1f1b9f8d0e"
+    assert get_output(f"resume-cmd --resume {run_id}") == {"resume": run_id}
+
+
+def test_cli_lazy_imports():
+    # The app, tasks and database drivers are only imported when a command needs them
+    code = (
+        "import sys; import sayn.cli; "
+        "print(','.join(m for m in ('sayn.core.app', 'sayn.tasks.task', 'sqlalchemy')"
+        " if m in sys.modules))"
+    )
+    output = subprocess.check_output([sys.executable, "-c", code])
+    assert output.decode().strip() == ""
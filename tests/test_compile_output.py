@@ -0,0 +1,57 @@
+import os
+from pathlib import Path
+
+from sayn.utils.compile_output import CompileOutput, write_if_changed
+
+
+def test_write_if_changed(tmp_path):
+    path = tmp_path / "group" / "task.sql"
+    assert write_if_changed(path, "SELECT 1")
+    os.utime(path, (0, 0))
+
+    assert not write_if_changed(path, "SELECT 1")
+    assert path.stat().st_mtime == 0
+
+    assert write_if_changed(path, "SELECT 2")
+    assert path.read_text() == "SELECT 2"
+
+
+def test_compile_output(tmp_path):
+    output = CompileOutput(tmp_path, "run")
+    output.write("t1", tmp_path / "g1" / "t1.sql", "SELECT 1")
+    output.write("t1", tmp_path / "g1" / "t1_test.sql", "SELECT 2")
+    output.write("t2", tmp_path / "g2" / "t2.sql", "SELECT 3")
+    assert output.flush() == []
+    assert Path(tmp_path, "g1", "t1.sql").read_text() == "SELECT 1"
+
+    files = output.prune(["t1", "t2"])
+    assert files == {
+        "run": {"t1": ["g1/t1.sql", "g1/t1_test.sql"], "t2": ["g2/t2.sql"]}
+    }
+
+    # t1 writes fewer files, t2 is not in the query and t3 is no longer in the project
+    previous = dict(files, compile={"t3": ["g3/t3.sql"]})
+    Path(tmp_path, "g3").mkdir()
+    Path(tmp_path, "g3", "t3.sql").write_text("SELECT 4")
+
+    output = CompileOutput(tmp_path, "run", previous)
+    output.write("t1", tmp_path / "g1" / "t1.sql", "SELECT 1")
+    files = output.prune(["t1", "t2"])
+    assert files == {"run": {"t1": ["g1/t1.sql"], "t2": ["g2/t2.sql"]}}
+
+    assert Path(tmp_path, "g1", "t1.sql").exists()
+    assert not Path(tmp_path, "g1", "t1_test.sql").exists()
+    assert Path(tmp_path, "g2", "t2.sql").exists()
+    assert not Path(tmp_path, "g3").exists()
+
+
+def test_compile_output_commands(tmp_path):
+    # Files written by other commands are kept
+    Path(tmp_path, "g1").mkdir()
+    Path(tmp_path, "g1", "t1.sql").write_text("SELECT 1")
+    output = CompileOutput(tmp_path, "test", {"run": {"t1": ["g1/t1.sql"]}})
+    output.write("t1", tmp_path / "g1" / "t1_test.sql", "SELECT 2")
+    files = output.prune(["t1"])
+
+    assert files == {"run": {"t1": ["g1/t1.sql"]}, "test": {"t1": ["g1/t1_test.sql"]}}
+    assert Path(tmp_path, "g1", "t1.sql").exists()
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+from jinja2 import Environment
+
+from sayn.core.app import RunArguments
+from sayn.utils.compiler import Compiler
+
+from . import inside_dir
+
+
+def get_compiler():
+    return Compiler(
+        RunArguments(), {"schema": "analytics", "countries": ["es", "uk"]}, dict()
+    )
+
+
+def test_template_cache(tmp_path, monkeypatch):
+    with inside_dir(tmp_path, {"sql/test.sql": "SELECT * FROM {{ schema }}.t"}):
+        compiler = get_compiler()
+        assert compiler.compile(Path("sql/test.sql")) == "SELECT * FROM analytics.t"
+        assert len(list(Path(".sayn", "templates").glob("*.cache"))) == 1
+
+        # Templates are not parsed again, not even in a new execution
+        def fail_compile(*args, **kwargs):
+            raise AssertionError("Template parsed again")
+
+        monkeypatch.setattr(Environment, "compile", fail_compile)
+        assert compiler.compile(Path("sql/test.sql")) == "SELECT * FROM analytics.t"
+        compiler = get_compiler()
+        assert compiler.compile(Path("sql/test.sql")) == "SELECT * FROM analytics.t"
+
+        # Changes to the file invalidate the cache
+        monkeypatch.undo()
+        Path("sql/test.sql").write_text("SELECT 1 FROM {{ schema }}.t")
+        compiler = get_compiler()
+        assert compiler.compile(Path("sql/test.sql")) == "SELECT 1 FROM analytics.t"
+        assert len(list(Path(".sayn", "templates").glob("*.cache"))) == 1
+
+
+def test_template_cache_strings(tmp_path):
+    with inside_dir(tmp_path):
+        compiler = get_compiler()
+        task_compiler = compiler.get_task_compiler("group", "task")
+        assert task_compiler.compile("{{ task.name }}") == "task"
+        assert (
+            compiler.get_task_compiler("group", "other").compile("{{ task.name }}")
+            == "other"
+        )
+
+        # Strings are only cached in memory
+        assert not Path(".sayn", "templates").exists()
+
+
+def test_task_compiler_layers(tmp_path):
+    with inside_dir(tmp_path):
+        compiler = get_compiler()
+        task1 = compiler.get_task_compiler("group", "task1")
+        task2 = compiler.get_task_compiler("group", "task2")
+
+        task1.update_globals(schema="staging", table="t1")
+        assert task1.compile("{{ schema }}.{{ table }}") == "staging.t1"
+        assert task2.compile("{{ schema }}.{{ task.name }}") == "analytics.task2"
+        assert compiler.compile("{{ schema }}") == "analytics"
+        assert "table" not in compiler.env.globals
+        assert "task" not in compiler.env.globals
+
+        # Project parameters are shared by all tasks, not copied
+        assert task1.env.globals["countries"] is compiler.env.globals["countries"]
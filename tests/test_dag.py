@@ -163,3 +163,81 @@ def test_query06():
             }
         ],
     ).value == ["task2", "task1"]
+
+
+def test_topological_sort_definition_order():
+    # Tasks are taken in the order they're defined as soon as their parents are
+    test_dag = {"task1": ["task3"], "task2": [], "task3": ["task2"], "task4": []}
+    assert dag.topological_sort(test_dag).value == ["task2", "task3", "task4", "task1"]
+
+
+def test_topological_sort_long_chain():
+    test_dag = {f"task{i}": [f"task{i-1}"] if i > 0 else [] for i in range(20000)}
+    assert dag.topological_sort(test_dag).value == list(test_dag.keys())
+
+
+def test_cycle_path():
+    test_dag = {"task1": ["task2", "task3"], "task2": ["task3"], "task3": ["task1"]}
+    result = dag.topological_sort(test_dag)
+    assert result.is_err
+    assert result.error.code == "cycle_error"
+    assert result.error.details["path"] == ["task1", "task2", "task3", "task1"]
+
+
+def test_cycle_path_long_chain():
+    test_dag = {f"task{i}": [f"task{i+1}"] for i in range(19999)}
+    test_dag["task19999"] = ["task0"]
+    result = dag.dag_is_valid(test_dag)
+    assert result.is_err
+    assert result.error.details["path"] == list(test_dag.keys()) + ["task0"]
+
+
+def test_upstream_keeps_dag():
+    test_dag = {"task1": ["task2"], "task2": ["task3"], "task3": []}
+    assert dag.upstream(test_dag, "task1").value == ["task2", "task3"]
+    assert test_dag == {"task1": ["task2"], "task2": ["task3"], "task3": []}
+
+
+def test_index():
+    test_dag = {
+        "task1": [],
+        "task2": ["task1"],
+        "task3": ["task1"],
+        "task4": ["task2", "task3"],
+        "task5": [],
+    }
+    index = dag.get_index(test_dag).value
+    assert index.nodes(index.ancestors("task4")) == ["task1", "task2", "task3"]
+    assert index.nodes(index.descendants("task2")) == ["task4"]
+    assert index.nodes(index.descendants("task1")) == ["task2", "task3", "task4"]
+    assert index.nodes(index.all()) == index.order
+
+    query = [
+        {
+            "task": "task1",
+            "upstream": False,
+            "downstream": True,
+            "operation": "include",
+        },
+        {
+            "task": "task3",
+            "upstream": False,
+            "downstream": True,
+            "operation": "exclude",
+        },
+    ]
+    assert dag.query(test_dag, query, index).value == ["task1", "task2"]
+
+
+def test_index_cache():
+    test_dag = {f"task{i}": [f"task{i - 1}"] if i > 0 else [] for i in range(10)}
+    index = dag.get_index(test_dag).value
+
+    # Bitsets are only calculated for the nodes queried, reusing the ones cached
+    assert index.nodes(index.ancestors("task3")) == ["task0", "task1", "task2"]
+    assert index.nodes(index.ancestors("task6")) == [f"task{i}" for i in range(6)]
+    assert list(index._ancestors.keys()) == ["task3", "task6"]
+    assert index.nodes(index.descendants("task7")) == ["task8", "task9"]
+    assert index.nodes(index.descendants("task2")) == [f"task{i}" for i in range(3, 10)]
+    assert list(index._descendants.keys()) == ["task7", "task2"]
+    assert index.ancestors("unknown") == 0
@@ -0,0 +1,157 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.dialects import mysql, postgresql
+
+from sayn.database import _driver_query, _rows_to_batches
+from sayn.database.creator import create as create_db
+
+from . import tables_with_data
+
+pa = pytest.importorskip("pyarrow")
+
+
+def get_db(target_db):
+    db = create_db("test", "test", target_db.copy())
+    db._activate_connection()
+    return db
+
+
+def test_read_arrow(target_db):
+    db = get_db(target_db)
+    data = [{"x": i, "y": f"v{i}"} for i in range(10)]
+    with tables_with_data(db, {"test_arrow": data}):
+        table = db.read_arrow("SELECT x, y FROM test_arrow ORDER BY x")
+
+        assert table.column_names == ["x", "y"]
+        assert table.to_pylist() == db.read_data(
+            "SELECT x, y FROM test_arrow ORDER BY x"
+        )
+
+
+def test_read_batches(target_db):
+    db = get_db(target_db)
+    data = [{"x": i} for i in range(10)]
+    with tables_with_data(db, {"test_arrow": data}):
+        batches = list(db.read_batches("SELECT x FROM test_arrow ORDER BY x", 4))
+
+        assert [b.num_rows for b in batches] == [4, 4, 2]
+        assert pa.Table.from_batches(batches).column("x").to_pylist() == list(range(10))
+
+
+def test_read_arrow_nulls(target_db):
+    db = get_db(target_db)
+    data = [{"id": 0, "x": 1}] + [{"id": i, "x": None} for i in range(1, 4)]
+    query = "SELECT x FROM test_arrow ORDER BY id DESC"
+    with tables_with_data(db, {"test_arrow": data}):
+        batches = list(db.read_batches(query, 2))
+        assert pa.types.is_null(batches[0].schema.field("x").type)
+
+        # Batches with only nulls take the type of the rest of the batches
+        table = db.read_arrow(query)
+        assert pa.types.is_integer(table.schema.field("x").type)
+        assert table.column("x").to_pylist() == [None, None, None, 1]
+
+
+def test_read_arrow_empty(target_db):
+    db = get_db(target_db)
+    with tables_with_data(db, {"test_arrow": [{"x": 1}]}):
+        table = db.read_arrow("SELECT x FROM test_arrow WHERE x > 1")
+
+        assert table.column_names == ["x"]
+        assert table.num_rows == 0
+
+
+def test_driver_query():
+    query = "SELECT x::int FROM t WHERE y = :y AND z LIKE 'a%' AND w = :w"
+
+    # Non positional drivers like the Snowflake connector (pyformat)
+    assert _driver_query(postgresql.dialect(), query, {"y": 1, "w": "b"}) == (
+        "SELECT x::int FROM t WHERE y = %(y)s AND z LIKE 'a%%' AND w = %(w)s",
+        {"y": 1, "w": "b"},
+    )
+
+    # Positional drivers get the values in the order they appear
+    assert _driver_query(
+        mysql.dialect(paramstyle="format"), query, {"w": "b", "y": 1}
+    ) == (
+        "SELECT x::int FROM t WHERE y = %s AND z LIKE 'a%%' AND w = %s",
+        (1, "b"),
+    )
+
+    # Without parameters the query is sent as it is
+    assert _driver_query(postgresql.dialect(), query, {}) == (query, None)
+
+
+class FakeCursor:
+    """Returns the rows in the python types of drivers other than sqlite"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+
+def test_rows_to_batches_driver_types():
+    rows = [(Decimal("1.50"), datetime(2024, 1, i + 1), None) for i in range(3)] + [
+        (None, None, "x")
+    ]
+    batches = list(_rows_to_batches(["d", "ts", "s"], FakeCursor(rows).fetchmany, 2))
+
+    assert [b.num_rows for b in batches] == [2, 2]
+    assert pa.types.is_decimal(batches[0].schema.field("d").type)
+    assert pa.types.is_timestamp(batches[0].schema.field("ts").type)
+    # Batches keep the types of previous batches, filling the columns with nulls
+    assert batches[1].schema.field("d").type == batches[0].schema.field("d").type
+    assert pa.types.is_null(batches[0].schema.field("s").type)
+    assert pa.types.is_string(batches[1].schema.field("s").type)
+
+    # Empty results still produce the columns
+    batches = list(_rows_to_batches(["d"], FakeCursor([]).fetchmany, 2))
+    assert [b.num_rows for b in batches] == [0]
+    assert batches[0].schema.names == ["d"]
+
+
+class FakeSnowflakeCursor(FakeCursor):
+    description = [("NAME",), ("VALUE",)]
+
+    def execute(self, query, params):
+        self.executed = (query, params)
+
+    def fetch_arrow_batches(self):
+        from snowflake.connector.errors import NotSupportedError
+
+        raise NotSupportedError("Not arrow")
+
+
+def test_snowflake_read_batches_fallback(monkeypatch):
+    pytest.importorskip("snowflake.sqlalchemy")
+    from snowflake.sqlalchemy.snowdialect import SnowflakeDialect
+
+    cursor = FakeSnowflakeCursor([("a", Decimal("1")), ("b", Decimal("2"))])
+
+    class FakeConnection:
+        def cursor(self):
+            return cursor
+
+        def close(self):
+            pass
+
+    class FakeEngine:
+        dialect = SnowflakeDialect()
+
+        def raw_connection(self):
+            return FakeConnection()
+
+    db = create_db("test", "test", {"type": "snowflake"})
+    monkeypatch.setattr(db, "engine", FakeEngine(), raising=False)
+
+    batches = list(db.read_batches("SHOW PARAMETERS LIKE :name", 10, name="x%"))
+    assert cursor.executed == ("SHOW PARAMETERS LIKE %(name)s", {"name": "x%"})
+    assert pa.Table.from_batches(batches).to_pylist() == [
+        {"NAME": "a", "VALUE": Decimal("1")},
+        {"NAME": "b", "VALUE": Decimal("2")},
+    ]
@@ -0,0 +1,93 @@
+import sqlite3
+
+from sqlalchemy.exc import DBAPIError, OperationalError
+
+from sayn.database.creator import create as create_db
+
+
+def get_db(db_type, retry=None):
+    settings = {"type": db_type}
+    if retry is not None:
+        settings["retry"] = retry
+    return create_db("test", "test", settings)
+
+
+def wrap(orig, connection_invalidated=False):
+    return DBAPIError(
+        "SELECT 1", None, orig, connection_invalidated=connection_invalidated
+    )
+
+
+class PgError(Exception):
+    def __init__(self, pgcode):
+        super().__init__("Mensaje traducido")
+        self.pgcode = pgcode
+
+
+class MysqlError(Exception):
+    __module__ = "pymysql.err"
+
+
+class SnowflakeError(Exception):
+    __module__ = "snowflake.connector.errors"
+
+    def __init__(self, errno):
+        super().__init__("Some message")
+        self.errno = errno
+
+
+class GoogleError(Exception):
+    def __init__(self, reason):
+        super().__init__("Some message")
+        self.errors = [{"reason": reason}]
+
+
+def test_retryable_codes():
+    # Errors are classified by the code regardless of the message
+    postgresql = get_db("postgresql")
+    assert postgresql._is_retryable(wrap(PgError("40P01")))
+    assert not postgresql._is_retryable(wrap(PgError("42P01")))
+    assert not postgresql._is_retryable(wrap(Exception("deadlock detected")))
+
+    redshift = get_db("redshift")
+    assert redshift._is_retryable(wrap(Exception({"C": "40001", "M": "1023"})))
+    assert not redshift._is_retryable(wrap(Exception({"C": "42P01"})))
+
+    mysql = get_db("mysql")
+    assert mysql._is_retryable(wrap(MysqlError(1213, "Deadlock found")))
+    assert not mysql._is_retryable(wrap(MysqlError(1146, "Table doesn't exist")))
+    assert not mysql._is_retryable(wrap(Exception(1213, "Not from the driver")))
+
+    snowflake = get_db("snowflake")
+    assert snowflake._is_retryable(wrap(SnowflakeError(625)))
+    assert not snowflake._is_retryable(wrap(SnowflakeError(2003)))
+
+    bigquery = get_db("bigquery")
+    try:
+        raise ValueError("Wrapper") from GoogleError("rateLimitExceeded")
+    except ValueError as e:
+        assert bigquery._is_retryable(e)
+    assert not bigquery._is_retryable(wrap(GoogleError("invalidQuery")))
+
+
+def test_retryable_messages():
+    sqlite = get_db("sqlite")
+    error = sqlite3.OperationalError("database is locked")
+    assert sqlite._is_retryable(wrap(error))
+    assert not sqlite._is_retryable(wrap(sqlite3.OperationalError("no such table")))
+
+    bigquery = get_db("bigquery")
+    assert bigquery._is_retryable(
+        Exception("Could not serialize access to table due to concurrent update")
+    )
+
+
+def test_retry_disconnects():
+    error = OperationalError(
+        "SELECT 1",
+        None,
+        Exception("server closed the connection"),
+        connection_invalidated=True,
+    )
+    assert not get_db("postgresql")._is_retryable(error)
+    assert get_db("postgresql", {"retry_disconnects": True})._is_retryable(error)
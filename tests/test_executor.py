@@ -0,0 +1,240 @@
+from threading import Lock, Thread
+import asyncio
+import time
+
+from sayn.core.executor import (
+    DagExecutor,
+    defer_coroutine,
+    get_event_loop,
+    resolve,
+    run_coroutine,
+    then,
+)
+
+from . import FakeTask
+
+
+def get_tasks(dag, not_in_query=None, connections=None):
+    not_in_query = not_in_query or set()
+    connections = connections or dict()
+    tasks = dict()
+    for name, parents in dag.items():
+        tasks[name] = FakeTask(
+            name,
+            [tasks[p] for p in parents],
+            name not in not_in_query,
+            connections.get(name),
+        )
+    return tasks
+
+
+def test_sequential_order():
+    tasks = get_tasks({"t1": [], "t2": [], "t3": ["t1"], "t4": ["t2", "t3"]})
+    executed = list()
+
+    DagExecutor(tasks).execute(lambda t: executed.append(t.name))
+
+    assert executed == ["t1", "t2", "t3", "t4"]
+
+
+def test_not_in_query_not_executed():
+    tasks = get_tasks({"t1": [], "t2": ["t1"], "t3": ["t2"]}, not_in_query={"t2"})
+    executed = list()
+
+    DagExecutor(tasks, 4).execute(lambda t: executed.append(t.name))
+
+    assert executed == ["t1", "t3"]
+
+
+def test_parallel_respects_parents():
+    tasks = get_tasks(
+        {
+            "t1": [],
+            "t2": [],
+            "t3": [],
+            "t4": ["t1", "t2"],
+            "t5": ["t4"],
+            "t6": ["t3"],
+        },
+        not_in_query={"t4"},
+    )
+    finished = set()
+    lock = Lock()
+
+    def func(task):
+        with lock:
+            # Ancestors through tasks outside the query also need to be finished
+            assert all(p.name in finished or not p.in_query for p in task.parents)
+            if task.name == "t5":
+                assert {"t1", "t2"} <= finished
+        time.sleep(0.01)
+        with lock:
+            finished.add(task.name)
+        return task.name
+
+    results = DagExecutor(tasks, 3).execute(func)
+
+    assert results == {n: n for n in ("t1", "t2", "t3", "t5", "t6")}
+    assert all(t.tracker.buffered for t in tasks.values() if t.in_query)
+
+
+def test_parallel_runs_concurrently():
+    tasks = get_tasks({f"t{i}": [] for i in range(4)})
+    running = list()
+    max_running = list()
+    lock = Lock()
+
+    def func(task):
+        with lock:
+            running.append(task.name)
+            max_running.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(task.name)
+
+    DagExecutor(tasks, 2).execute(func)
+
+    assert max(max_running) == 2
+
+
+def test_max_concurrency():
+    tasks = get_tasks(
+        {f"t{i}": [] for i in range(6)},
+        connections={
+            "t0": {"slow_db"},
+            "t1": {"slow_db"},
+            "t2": {"slow_db", "fast_db"},
+            "t3": {"fast_db"},
+            "t4": {"fast_db"},
+            "t5": set(),
+        },
+    )
+    running = list()
+    max_running = {"slow_db": 0, "all": 0}
+    lock = Lock()
+
+    def func(task):
+        with lock:
+            running.append(task)
+            max_running["all"] = max(max_running["all"], len(running))
+            max_running["slow_db"] = max(
+                max_running["slow_db"],
+                len([t for t in running if "slow_db" in t.used_connections]),
+            )
+        time.sleep(0.02)
+        with lock:
+            running.remove(task)
+
+    results = DagExecutor(tasks, 4, {"slow_db": 1}).execute(func)
+
+    assert len(results) == 6
+    assert max_running["slow_db"] == 1
+    assert max_running["all"] > 1
+
+
+def test_critical_path_first():
+    # t0 -> t1 -> t2 is the slow branch, but it's last in topological order
+    tasks = get_tasks(
+        {"t3": [], "t4": [], "t5": [], "t0": [], "t1": ["t0"], "t2": ["t1"]}
+    )
+    durations = {"t0": 10, "t1": 10, "t2": 10, "t3": 1, "t4": 1, "t5": 1}
+
+    executor = DagExecutor(tasks, 2, durations=durations)
+    assert executor.priority["t0"] == 30
+    assert executor.priority["t3"] == 1
+
+    started = list()
+    lock = Lock()
+
+    def func(task):
+        with lock:
+            started.append(task.name)
+
+    executor.execute(func)
+
+    assert started[0] == "t0"
+
+
+def test_critical_path_unknown_durations():
+    tasks = get_tasks({"t1": [], "t2": [], "t3": ["t2"]})
+
+    executor = DagExecutor(tasks, 2, durations={"t1": 4})
+    # Unknown durations default to the average of the known ones
+    assert executor.priority == {"t1": 4, "t2": 8, "t3": 4}
+
+    # Without history the longest chain goes first
+    executor = DagExecutor(tasks, 2)
+    assert executor.priority == {"t1": 1, "t2": 2, "t3": 1}
+
+
+def test_sequential_ignores_durations():
+    tasks = get_tasks({"t1": [], "t2": [], "t3": ["t2"]})
+    executed = list()
+
+    DagExecutor(tasks, durations={"t2": 100}).execute(lambda t: executed.append(t.name))
+
+    assert executed == ["t1", "t2", "t3"]
+
+
+def test_run_coroutine():
+    async def coroutine(value):
+        await asyncio.sleep(0)
+        return value
+
+    assert run_coroutine(coroutine(1)) == 1
+    assert run_coroutine(coroutine(2)) == 2
+
+
+def test_run_coroutine_shared_loop():
+    loops = list()
+
+    async def coroutine():
+        loops.append(asyncio.get_running_loop())
+        await asyncio.sleep(0.2)
+
+    threads = [Thread(target=run_coroutine, args=(coroutine(),)) for _ in range(5)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # All coroutines wait at the same time in the same loop
+    assert time.time() - start < 0.6
+    assert all(loop is get_event_loop() for loop in loops)
+
+
+def test_async_tasks_overlap():
+    tasks = get_tasks({"t1": [], "t2": [], "t3": ["t1", "t2"]})
+    started = set()
+
+    async def coroutine(name):
+        started.add(name)
+        # Each task waits for the other to start, so they need to overlap
+        for _ in range(500):
+            if len(started) == 2:
+                return name
+            await asyncio.sleep(0.01)
+
+    def func(task):
+        if task.name == "t3":
+            assert started == {"t1", "t2"}
+            return task.name
+        else:
+            return then(defer_coroutine(coroutine(task.name)), lambda x: x.upper())
+
+    results = DagExecutor(tasks, 1).execute(func)
+
+    assert results == {"t1": "T1", "t2": "T2", "t3": "t3"}
+    # The output of the first task is held once the second task starts
+    assert tasks["t1"].tracker.buffered and tasks["t2"].tracker.buffered
+    assert not tasks["t3"].tracker.buffered
+
+
+def test_deferred_exceptions():
+    async def coroutine():
+        raise ValueError("wrong value")
+
+    result = resolve(defer_coroutine(coroutine()))
+    assert result.is_err
+    assert "wrong value" in str(result.error.details["exception"])
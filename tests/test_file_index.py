@@ -0,0 +1,80 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from sayn.utils.file_index import FileIndex
+
+from . import inside_dir
+
+files = {
+    "sql/a.sql": "",
+    "sql/.hidden.sql": "",
+    "sql/b.txt": "",
+    "sql/marketing/c.sql": "",
+    "sql/marketing/nested/d.sql": "",
+    "sql/finance/e.sql": "",
+}
+
+
+def test_file_index_glob(tmp_path):
+    with inside_dir(tmp_path, files):
+        index = FileIndex("sql")
+
+        for pattern in (
+            "*.sql",
+            "**/*.sql",
+            "marketing/*.sql",
+            "marketing/**/*.sql",
+            "*/*.sql",
+            "**/nested/*.sql",
+            "[a-c].sql",
+            "**",
+            "*",
+        ):
+            expected = [p for p in Path("sql").glob(pattern) if p.is_file()]
+            assert index.glob(pattern) == expected, pattern
+
+
+def test_file_index_is_file(tmp_path):
+    with inside_dir(tmp_path, files):
+        index = FileIndex("sql")
+
+        assert index.is_file("a.sql")
+        assert index.is_file("marketing/nested/d.sql")
+        assert not index.is_file("marketing")
+        assert not index.is_file("missing.sql")
+
+
+def test_file_index_missing_folder(tmp_path):
+    with inside_dir(tmp_path):
+        index = FileIndex("sql")
+
+        assert index.files == list()
+        assert index.glob("*.sql") == list()
+
+
+def test_file_index_symlinks(tmp_path):
+    with inside_dir(tmp_path, {"shared/f.sql": "", "shared/nested/g.sql": "", **files}):
+        try:
+            os.symlink(Path("..", "shared"), Path("sql", "shared"))
+            # Links to a parent folder are not followed
+            os.symlink("..", Path("sql", "marketing", "loop"))
+        except OSError:
+            pytest.skip("Symlinks not supported")
+
+        index = FileIndex("sql")
+        assert index.links == {"shared"}
+        assert not any("loop" in f for f in index.files)
+
+        for pattern in (
+            "shared/*.sql",
+            "shared/**/*.sql",
+            "*/*.sql",
+            "**/*.sql",
+            "**",
+        ):
+            expected = [p for p in Path("sql").glob(pattern) if p.is_file()]
+            assert index.glob(pattern) == expected, pattern
+
+        assert index.glob("shared/*.sql") == [Path("sql", "shared", "f.sql")]
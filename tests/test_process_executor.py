@@ -0,0 +1,117 @@
+import os
+from pathlib import Path
+import subprocess
+
+import pytest
+
+from sayn.tasks.task_wrapper import TaskWrapper
+
+from . import inside_dir, python_project, run_sayn
+
+process_tasks = """
+import os
+from pathlib import Path
+import time
+
+from sayn import task
+
+
+def wait_for(name):
+    # Each task waits for the other to start, so both need to run at the same time
+    Path(f"{name}.pid").write_text(str(os.getpid()))
+    other = "task2" if name == "task1" else "task1"
+    for _ in range(600):
+        if Path(f"{other}.pid").exists():
+            return
+        time.sleep(0.1)
+    raise ValueError(f"{other} didn't start")
+
+
+@task(executor="process")
+def task1(context):
+    context.info("Message from task1")
+    wait_for("task1")
+
+
+@task(executor="process")
+def task2(context):
+    context.info("Message from task2")
+    wait_for("task2")
+
+
+@task(executor="process")
+def crash(context):
+    os._exit(3)
+
+
+@task(executor="process")
+def local_error(context):
+    class LocalError(Exception):
+        pass
+
+    raise LocalError("local error")
+"""
+
+
+@pytest.fixture
+def project_dir(tmp_path):
+    with inside_dir(tmp_path, python_project("process_tasks", process_tasks)):
+        yield tmp_path
+
+
+def test_process_threads(project_dir):
+    output = run_sayn("run", "-t", "task1", "-t", "task2", "-n", "2", "-d").decode()
+    assert "Message from task1" in output
+    assert "Message from task2" in output
+
+    pids = {Path(f"task{i}.pid").read_text() for i in (1, 2)}
+    assert len(pids) == 2
+    assert str(os.getpid()) not in pids
+
+
+def test_process_errors(project_dir):
+    with pytest.raises(subprocess.CalledProcessError) as exc_info:
+        run_sayn("run", "-t", "crash", "-t", "local_error", "-d")
+
+    output = exc_info.value.output.decode()
+    assert "Task process finished unexpectedly (exit code 3)" in output
+    assert "LocalError: local error" in output
+
+
+def get_wrapper(task_type):
+    return TaskWrapper(
+        "group",
+        "task",
+        task_type,
+        None,
+        [],
+        [],
+        [],
+        [],
+        None,
+        None,
+        {},
+        None,
+        None,
+        None,
+        None,
+    )
+
+
+@pytest.mark.parametrize("task_type", ("python", "python_module"))
+def test_executor_python(task_type):
+    wrapper = get_wrapper(task_type)
+    assert wrapper.executor == "thread"
+    assert wrapper.set_executor("process").is_ok
+    assert wrapper.executor == "process"
+
+
+def test_executor_not_python():
+    wrapper = get_wrapper("sql")
+    assert wrapper.set_executor("thread").is_ok
+    assert wrapper.set_executor("process").is_err
+    assert wrapper.executor == "thread"
+
+
+def test_executor_wrong_value():
+    assert get_wrapper("python").set_executor("cluster").is_err
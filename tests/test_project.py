@@ -1,6 +1,10 @@
 from pathlib import Path
 
-from sayn.core.project import read_project
+import pytest
+
+from sayn.core import project
+from sayn.core.errors import SaynParsingError
+from sayn.core.project import read_groups, read_project
 from . import inside_dir
 
 # utils
@@ -57,3 +61,44 @@ def test_project_err_no_tasks(tmp_path):
     with inside_dir(tmp_path):
         setup_project_and_tasks(project_yaml=project_yaml)
         read_project()
+
+
+def test_read_groups_parallel(tmp_path, monkeypatch):
+    monkeypatch.setattr(project, "_min_files_parallel", 1)
+    monkeypatch.setattr(project.os, "cpu_count", lambda: 2)
+    groups = {
+        f"tasks/group{i}.yaml": f"""
+tasks:
+  task{i}:
+    type: sql
+    file_name: task{i}.sql
+"""
+        for i in range(4)
+    }
+
+    with inside_dir(tmp_path, groups):
+        parsed = read_groups()
+
+    assert sorted(parsed.keys()) == [f"group{i}" for i in range(4)]
+    for i in range(4):
+        assert parsed[f"group{i}"].tasks == {
+            f"task{i}": {"type": "sql", "file_name": f"task{i}.sql"}
+        }
+
+
+def test_read_groups_parallel_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(project, "_min_files_parallel", 1)
+    monkeypatch.setattr(project.os, "cpu_count", lambda: 2)
+    groups = {
+        "tasks/group1.yaml": "tasks:\n  task1:\n    type: sql\n",
+        "tasks/group2.yaml": "tasks:\n  task2:\n    type: sql\nunknown: 1\n",
+    }
+
+    with inside_dir(tmp_path, groups):
+        with pytest.raises(SaynParsingError) as exc:
+            read_groups()
+
+    assert exc.value.code == "data_validation"
+    assert exc.value.errors[0]["file_name"] == str(Path("tasks", "group2.yaml"))
+    assert exc.value.errors[0]["line"] == 4
+    assert exc.value.errors[0]["column"] == 1
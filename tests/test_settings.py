@@ -1,6 +1,6 @@
 import json
 
-from sayn.core.settings import read_settings, get_settings
+from sayn.core.settings import read_settings, get_connections, get_settings
 
 from . import create_project
 
@@ -313,3 +313,65 @@ def test_env_05(tmpdir):
                 },
             },
         )
+
+
+def test_connections_max_concurrency():
+    result = get_connections(
+        {
+            "warehouse": {
+                "type": "sqlite",
+                "database": ":memory:",
+                "max_concurrency": 2,
+            },
+            "api": {"type": "api", "api_key": "abc", "max_concurrency": 1},
+            "other": {"type": "sqlite", "database": ":memory:"},
+        }
+    )
+    assert result.is_ok
+
+    connections, max_concurrency = result.value
+    assert max_concurrency == {"warehouse": 2, "api": 1}
+    assert connections["api"] == {"api_key": "abc"}
+    assert set(connections.keys()) == {"warehouse", "api", "other"}
+
+
+def test_connections_max_concurrency_invalid():
+    for value in (0, -1, "many", True):
+        result = get_connections(
+            {
+                "warehouse": {
+                    "type": "sqlite",
+                    "database": ":memory:",
+                    "max_concurrency": value,
+                }
+            }
+        )
+        assert result.is_err
+
+
+def test_connections_retry_policy():
+    result = get_connections(
+        {
+            "warehouse": {
+                "type": "sqlite",
+                "database": ":memory:",
+                "retry": {"max_attempts": 5, "backoff": 2},
+            },
+            "other": {"type": "sqlite", "database": ":memory:"},
+        }
+    )
+    assert result.is_ok
+
+    connections, _ = result.value
+    policy = connections["warehouse"].retry_policy
+    assert policy.max_attempts == 5
+    assert [policy.delay(a) for a in (1, 2, 3, 4, 5)] == [2, 4, 8, 16, 30]
+    assert connections["other"].retry_policy.max_attempts == 3
+
+
+def test_connections_retry_policy_invalid():
+    for value in ({"max_attempts": 0}, {"backoff": -1}, {"attempts": 2}):
+        result = get_connections(
+            {"warehouse": {"type": "sqlite", "database": ":memory:", "retry": value}}
+        )
+        assert result.is_err
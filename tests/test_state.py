@@ -0,0 +1,162 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import os
+
+from sayn.core.state import (
+    append_run_status,
+    get_compile_output,
+    get_config_cache,
+    get_group_cache,
+    get_manifest,
+    get_run_statuses,
+    get_task_durations,
+    get_task_fingerprints,
+    prune_run_statuses,
+    read_state,
+    update_compile_output,
+    update_config_cache,
+    update_group_cache,
+    update_manifest,
+    update_run_statuses,
+    update_task_durations,
+    update_task_fingerprints,
+    write_state,
+)
+
+
+def test_read_missing_state(tmp_path):
+    assert read_state(tmp_path, "missing") == dict()
+
+
+def test_read_corrupted_state(tmp_path):
+    Path(tmp_path, "corrupted.json").write_text("{not json")
+    assert read_state(tmp_path, "corrupted") == dict()
+
+
+def test_write_read_state(tmp_path):
+    folder = tmp_path / "state"
+    assert write_state(folder, "test", {"a": 1}).is_ok
+    assert read_state(folder, "test") == {"a": 1}
+
+
+def test_concurrent_write_state(tmp_path):
+    # Each writer uses its own temporary file, so none of them fails or is mixed
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(
+            pool.map(lambda i: write_state(tmp_path, "test", {"i": i}), range(200))
+        )
+
+    assert all(r.is_ok for r in results)
+    assert read_state(tmp_path, "test")["i"] in range(200)
+    assert [p.name for p in tmp_path.iterdir()] == ["test.json"]
+
+
+def test_task_durations(tmp_path):
+    assert get_task_durations(tmp_path, "run") == dict()
+
+    assert update_task_durations(tmp_path, "run", {"t1": 1.5, "t2": 2.0}).is_ok
+    assert update_task_durations(tmp_path, "run", {"t2": 3.0}).is_ok
+    assert update_task_durations(tmp_path, "compile", {"t1": 0.1}).is_ok
+
+    assert get_task_durations(tmp_path, "run") == {"t1": 1.5, "t2": 3.0}
+    assert get_task_durations(tmp_path, "compile") == {"t1": 0.1}
+
+
+def test_task_fingerprints(tmp_path):
+    assert get_task_fingerprints(tmp_path) == dict()
+
+    assert update_task_fingerprints(tmp_path, {"t1": "a", "t2": "b"}, []).is_ok
+    assert update_task_fingerprints(tmp_path, {"t1": "c"}, ["t2"]).is_ok
+
+    assert get_task_fingerprints(tmp_path) == {"t1": "c"}
+
+
+def test_run_statuses(tmp_path):
+    assert get_run_statuses(tmp_path, "run1") is None
+
+    assert update_run_statuses(tmp_path, "run1", "run", {"t1": "succeeded"}).is_ok
+    assert update_run_statuses(
+        tmp_path, "run1", "run", {"t1": "succeeded", "t2": "failed"}
+    ).is_ok
+
+    assert get_run_statuses(tmp_path, "run1") == {
+        "command": "run",
+        "tasks": {"t1": "succeeded", "t2": "failed"},
+    }
+
+
+def test_run_status_log(tmp_path):
+    assert append_run_status(tmp_path, "run1", "run", "t1", "succeeded").is_ok
+    assert append_run_status(tmp_path, "run1", "run", "t2", "failed").is_ok
+    # An incomplete line from an interrupted write is ignored
+    with Path(tmp_path, "runs", "run1.jsonl").open("ab") as f:
+        f.write(b'{"command": "run", "ta')
+
+    assert get_run_statuses(tmp_path, "run1") == {
+        "command": "run",
+        "tasks": {"t1": "succeeded", "t2": "failed"},
+    }
+
+    # The log is compacted at the end of the run
+    assert update_run_statuses(
+        tmp_path, "run1", "run", {"t1": "succeeded", "t2": "failed", "t3": "skipped"}
+    ).is_ok
+    assert not Path(tmp_path, "runs", "run1.jsonl").exists()
+    assert get_run_statuses(tmp_path, "run1")["tasks"]["t3"] == "skipped"
+
+
+def test_prune_run_statuses(tmp_path):
+    for i in range(5):
+        assert update_run_statuses(tmp_path, f"run{i}", "run", {}).is_ok
+        path = Path(tmp_path, "runs", f"run{i}.json")
+        os.utime(path, (i, i))
+
+    prune_run_statuses(tmp_path, keep=2)
+
+    assert get_run_statuses(tmp_path, "run0") is None
+    assert get_run_statuses(tmp_path, "run2") is None
+    assert get_run_statuses(tmp_path, "run3") is not None
+    assert get_run_statuses(tmp_path, "run4") is not None
+
+
+def test_config_cache(tmp_path):
+    assert get_config_cache(tmp_path, "key1") == dict()
+
+    assert update_config_cache(tmp_path, "key1", {"t1": {"tags": ["a"]}}).is_ok
+    assert get_config_cache(tmp_path, "key1") == {"t1": {"tags": ["a"]}}
+
+    # Cache invalidated when the key changes
+    assert get_config_cache(tmp_path, "key2") == dict()
+
+
+def test_manifest(tmp_path):
+    assert get_manifest(tmp_path, "key1") is None
+
+    tasks = {"t1": {"type": "sql", "group": "g1", "file_name": "t1.sql"}}
+    assert update_manifest(tmp_path, "key1", tasks).is_ok
+    assert get_manifest(tmp_path, "key1") == tasks
+
+    # Any change to the project files invalidates the manifest
+    assert get_manifest(tmp_path, "key2") is None
+
+
+def test_group_cache(tmp_path):
+    assert get_group_cache(tmp_path, "0.1") == dict()
+
+    groups = {"g1": {"hash": "a", "group": {"tasks": {"t1": {"type": "sql"}}}}}
+    assert update_group_cache(tmp_path, "0.1", groups).is_ok
+    assert get_group_cache(tmp_path, "0.1") == groups
+
+    # Groups parsed by other versions are ignored
+    assert get_group_cache(tmp_path, "0.2") == dict()
+
+
+def test_compile_output(tmp_path):
+    assert get_compile_output(tmp_path, "compile") is None
+
+    files = {"run": {"t1": ["g1/t1.sql"]}}
+    assert update_compile_output(tmp_path, "compile", files).is_ok
+    assert get_compile_output(tmp_path, "compile") == files
+
+    # The files are unknown when the compile folder changes
+    assert get_compile_output(tmp_path, "other") is None
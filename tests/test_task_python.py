@@ -1,7 +1,11 @@
 from pathlib import Path
+import asyncio
 
+from sayn.core.errors import Ok
+from sayn.logging.task_event_tracker import TaskEventTracker
+from sayn.tasks.python import task
 from sayn.utils.python_loader import PythonLoader
-from . import inside_dir
+from . import FakeLogger, inside_dir, python_project, run_sayn
 
 # utils
 
@@ -16,6 +20,27 @@ def initiate_python_setup(module=None, module_content=None):
         fpath.write_text(module_content)
 
 
+class FakeCompiler:
+    def update_globals(self, **kwargs):
+        pass
+
+
+def get_decorator_task(func, task_parameters=None):
+    return func(
+        func.func.__name__,
+        "group",
+        TaskEventTracker(FakeLogger(), func.func.__name__, 1),
+        dict(),
+        task_parameters or dict(),
+        dict(),
+        None,
+        dict(),
+        FakeCompiler(),
+        None,
+        None,
+    )
+
+
 # tests
 
 
@@ -50,3 +75,71 @@ def test_python_task_err2(tmp_path):
         assert python_loader.get_class(
             "python_tasks", "test_python.TestPythonErr"
         ).is_err
+
+
+def test_decorator_task():
+    @task
+    def sync_task(context, param1):
+        context.info("Running")
+        return Ok(param1)
+
+    runner = get_decorator_task(sync_task, {"param1": 1})
+    result = runner.run()
+    assert result.is_ok and result.value == 1
+
+
+def test_decorator_async_task():
+    @task(executor="thread")
+    async def async_task(context, param1):
+        values = await asyncio.gather(*[asyncio.sleep(0, i) for i in range(3)])
+        context.info("Running")
+        return Ok(sum(values) + param1)
+
+    runner = get_decorator_task(async_task, {"param1": 1})
+    assert runner._config_input["executor"] == "thread"
+
+    coroutine = runner.run()
+    assert asyncio.iscoroutine(coroutine)
+
+    result = asyncio.run(coroutine)
+    assert result.is_ok and result.value == 4
+    assert runner._tracker._logger.events[0]["message"] == "Running"
+
+
+async_tasks = """
+import asyncio
+
+from sayn import task
+
+started = set()
+
+
+async def wait_for_other(name):
+    started.add(name)
+    for _ in range(500):
+        if len(started) == 2:
+            return
+        await asyncio.sleep(0.01)
+    raise ValueError(f"{name} didn't overlap")
+
+
+@task
+async def async1(context):
+    await wait_for_other("async1")
+    context.info("Finished async1")
+
+
+@task
+async def async2(context):
+    await wait_for_other("async2")
+    context.info("Finished async2")
+"""
+
+
+def test_async_tasks_overlap(tmp_path):
+    # Async tasks don't take a thread, so they overlap with a single one
+    with inside_dir(tmp_path, python_project("async_tasks", async_tasks)):
+        output = run_sayn("run", "-n", "1", "-d").decode()
+
+    assert "Finished async1" in output
+    assert "Finished async2" in output
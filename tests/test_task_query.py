@@ -188,3 +188,57 @@ def test_full_query03():
             "downstream": False,
         },
     ]
+
+
+def test_intersection01():
+    assert get_query(tasks, include=["tag:tag1,group:group2"]).value == [
+        {
+            "operation": "include",
+            "task": "task3",
+            "upstream": False,
+            "downstream": False,
+        }
+    ]
+
+
+def test_intersection02():
+    assert get_query(
+        tasks, include=["group:group3"], exclude=["tag:tag1,tag:tag2"]
+    ).value == [
+        {
+            "operation": "include",
+            "task": "task5",
+            "upstream": False,
+            "downstream": False,
+        },
+        {
+            "operation": "include",
+            "task": "task6",
+            "upstream": False,
+            "downstream": False,
+        },
+        {
+            "operation": "include",
+            "task": "task7",
+            "upstream": False,
+            "downstream": False,
+        },
+        {
+            "operation": "exclude",
+            "task": "task5",
+            "upstream": False,
+            "downstream": False,
+        },
+    ]
+
+
+def test_intersection_errors():
+    result = get_query(tasks, include=["tag:tag2,group:group1"])
+    assert result.is_err and result.error.code == "empty_intersection"
+
+    result = get_query(tasks, include=["tag:tag1,group:undefined"])
+    assert result.is_err and result.error.code == "undefined_group"
+
+    # Only groups and tags can be intersected
+    result = get_query(tasks, include=["tag:tag1,task1"])
+    assert result.is_err and result.error.code == "incorrect_syntax"
@@ -764,3 +764,90 @@ def test_sql_test_values(tmp_path, target_db):
         assert task.setup().is_ok
         assert task.run().is_ok
         assert task.test().is_ok
+
+
+def test_sql_task_fingerprint(tmp_path, target_db):
+    used_objects = dict()
+    with sql_task(tmp_path, used_objects, target_db, "SELECT 1 AS x") as task:
+        assert task.config(
+            file_name="test.sql",
+            materialisation="table",
+            destination="test_sql_task",
+        ).is_ok
+
+        fingerprint = task.fingerprint()
+        assert fingerprint is not None
+        assert task.fingerprint() == fingerprint
+
+        task.sql_query = "SELECT 2 AS x"
+        assert task.fingerprint() != fingerprint
+
+
+def test_sql_task_script_no_fingerprint(tmp_path, target_db):
+    used_objects = dict()
+    with sql_task(tmp_path, used_objects, target_db, "SELECT 1 AS x") as task:
+        assert task.config(file_name="test.sql", materialisation="script").is_ok
+        assert task.fingerprint() is None
+
+
+def test_sql_task_incremental_no_fingerprint(tmp_path, target_db):
+    used_objects = dict()
+    with sql_task(tmp_path, used_objects, target_db, "SELECT 1 AS x") as task:
+        assert task.config(
+            file_name="test.sql",
+            materialisation="incremental",
+            destination="test_sql_task",
+            delete_key="x",
+        ).is_ok
+        assert task.fingerprint() is None
+
+
+def test_sql_task_dependencies(tmp_path, target_db):
+    used_objects = dict()
+    macros = tmp_path / "sql" / "macros" / "cols.sql"
+    macros.parent.mkdir(parents=True)
+    macros.write_text("{% macro cols() %}1 AS x{% endmacro %}")
+    sql = "{% import 'sql/macros/cols.sql' as m %}SELECT {{ m.cols() }}"
+    with sql_task(tmp_path, used_objects, target_db, sql) as task:
+        assert task.config(
+            file_name="test.sql",
+            materialisation="table",
+            destination="test_sql_task",
+        ).is_ok
+
+        assert task.compiler.get_dependencies() == ["sql/macros/cols.sql"]
+
+
+def test_sql_task_retry(tmp_path, target_db):
+    used_objects = dict()
+    with sql_task(tmp_path, used_objects, target_db, "SELECT 1 AS x") as task:
+        assert task.config(
+            file_name="test.sql",
+            materialisation="table",
+            destination="test_sql_task",
+        ).is_ok
+
+        db = task.connections["target_db"]
+        db._introspect(used_objects["target_db"])
+        assert task.setup().is_ok
+
+        db.retry_policy.backoff = 0
+        db.retryable_errors = ("transient error",)
+        execute = db.execute
+        calls = list()
+
+        def failing_execute(query):
+            calls.append(query)
+            if len(calls) == 1:
+                raise ValueError("Transient error")
+            return execute(query)
+
+        db.execute = failing_execute
+        assert task.run().is_ok
+        assert calls[0] == calls[1]
+        assert validate_table(task.default_db, "test_sql_task", [{"x": 1}])
+
+        calls.clear()
+        db.retry_policy.max_attempts = 1
+        assert task.run().is_err
+        assert len(calls) == 1
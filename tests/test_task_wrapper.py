@@ -0,0 +1,123 @@
+from sayn.database.objects import DbObjectCompiler
+from sayn.tasks.task import TaskStatus
+from sayn.tasks.task_wrapper import TaskWrapper
+
+
+class FakeRunner:
+    def __init__(self, fingerprint):
+        self._fingerprint = fingerprint
+
+    def fingerprint(self):
+        return self._fingerprint
+
+
+def get_wrapper(name, fingerprint, parents=None, db_object_compiler=None):
+    wrapper = TaskWrapper(
+        "group",
+        name,
+        "sql",
+        None,
+        [],
+        [],
+        [],
+        [],
+        None,
+        None,
+        {},
+        None,
+        None,
+        None,
+        db_object_compiler,
+    )
+    wrapper.runner = FakeRunner(fingerprint)
+    wrapper.parents = parents or list()
+    if len(wrapper.parents) == 0:
+        # Tasks without sources or parents are never fingerprinted
+        wrapper.sources = {f"{name}_source"}
+    return wrapper
+
+
+def test_fingerprint_includes_parents():
+    t1 = get_wrapper("t1", "a")
+    t2 = get_wrapper("t2", "b", [t1])
+    fingerprint = t2.fingerprint
+    assert fingerprint is not None
+
+    t1_changed = get_wrapper("t1", "c")
+    assert get_wrapper("t2", "b", [t1_changed]).fingerprint != fingerprint
+    assert get_wrapper("t2", "b", [get_wrapper("t1", "a")]).fingerprint == fingerprint
+
+
+def test_fingerprint_missing_on_ancestor():
+    t1 = get_wrapper("t1", None)
+    t2 = get_wrapper("t2", "b", [t1])
+    t3 = get_wrapper("t3", "c", [t2])
+    assert t1.fingerprint is None
+    assert t2.fingerprint is None
+    assert t3.fingerprint is None
+
+
+def test_config_cache_roundtrip():
+    stringify = {
+        f"{t}_{k}": None
+        for t in ("database", "schema", "table")
+        for k in ("prefix", "suffix", "override")
+    }
+    db_object_compiler = DbObjectCompiler(
+        dict(), "warehouse", stringify, stringify, list()
+    )
+
+    t1 = get_wrapper("t1", "a", db_object_compiler=db_object_compiler)
+    t1.parent_names = {"t0"}
+    t1.sources = {db_object_compiler.from_string("schema.source")}
+    t1.outputs = {db_object_compiler.from_string("output")}
+    t1.tags = {"tag1"}
+    t1.used_connections = {"warehouse"}
+    metadata = t1.config_metadata()
+
+    cached = get_wrapper("t1", None, db_object_compiler=db_object_compiler)
+    cached.runner = None
+    cached.config_from_cache(metadata)
+
+    assert cached.status == TaskStatus.READY_FOR_SETUP
+    assert cached.parent_names == t1.parent_names
+    assert cached.sources == t1.sources
+    assert cached.outputs == t1.outputs
+    assert cached.tags == t1.tags
+    assert cached.used_connections == t1.used_connections
+    assert cached.fingerprint == t1.fingerprint
+
+
+def test_fingerprint_external_sources():
+    stringify = {
+        f"{t}_{k}": None
+        for t in ("database", "schema", "table")
+        for k in ("prefix", "suffix", "override")
+    }
+    db_object_compiler = DbObjectCompiler(
+        dict(), "warehouse", stringify, stringify, list()
+    )
+    t0 = get_wrapper("t0", "a", db_object_compiler=db_object_compiler)
+    created = db_object_compiler.from_string("created")
+    external = db_object_compiler.from_string("logs.external")
+    output_to_task = {created: ["t0"]}
+
+    t1 = get_wrapper("t1", "b", db_object_compiler=db_object_compiler)
+    t1.sources = {created}
+    assert t1.set_parents({"t0": t0, "t1": t1}, output_to_task).is_ok
+    assert t1.fingerprint is not None
+
+    # Changes to tables not created by a task are unknown, so the task and its
+    # descendants are always executed
+    t1 = get_wrapper("t1", "b", db_object_compiler=db_object_compiler)
+    t1.sources = {created, external}
+    t2 = get_wrapper("t2", "c", [t1])
+    assert t1.set_parents({"t0": t0, "t1": t1}, output_to_task).is_ok
+    assert t1.fingerprint is None
+    assert t2.fingerprint is None
+
+
+def test_fingerprint_no_sources():
+    t1 = get_wrapper("t1", "a")
+    t1.sources = set()
+    assert t1.fingerprint is None
@@ -0,0 +1,290 @@
+from threading import Thread
+import time
+
+import pytest
+
+from sayn.core.errors import Err, Ok
+from sayn.core.queue import QueueWaiter, TaskQueue, create_queue
+from sayn.core.worker import Worker
+from sayn.tasks.task import TaskStatus
+
+from . import FakeTask
+
+
+def test_queue_claim(tmp_path):
+    queue = TaskQueue(tmp_path / "queue.db")
+    queue.start_run("run1", {"command": "run"})
+    assert queue.get_run_arguments("run1") == {"command": "run"}
+    assert queue.get_run_arguments("run2") is None
+
+    assert queue.claim("worker1") is None
+
+    queue.publish("run1", "task1")
+    queue.publish("run1", "task2")
+    assert queue.get_status("run1", "task1") == ("pending", None)
+
+    # Tasks are claimed in order and only once
+    assert queue.claim("worker1") == ("run1", "task1")
+    assert queue.claim("worker2") == ("run1", "task2")
+    assert queue.claim("worker1") is None
+    assert queue.get_status("run1", "task1") == ("claimed", None)
+
+    queue.report("run1", "task1", "failed", "Some error")
+    assert queue.wait("run1", "task1") == ("failed", "Some error")
+
+
+def test_queue_finished_run(tmp_path):
+    queue = TaskQueue(tmp_path / "queue.db")
+    queue.start_run("run1", dict())
+    queue.publish("run1", "task1")
+    queue.finish_run("run1")
+
+    assert queue.claim("worker1") is None
+
+
+def test_queue_between_connections(tmp_path):
+    coordinator = TaskQueue(tmp_path / "queue.db")
+    worker = TaskQueue(tmp_path / "queue.db")
+
+    coordinator.start_run("run1", dict())
+    coordinator.publish("run1", "task1")
+
+    def execute():
+        run_id, task_name = worker.claim("worker1")
+        worker.report(run_id, task_name, "succeeded")
+
+    thread = Thread(target=execute)
+    thread.start()
+    assert coordinator.wait("run1", "task1", poll_interval=0.01) == ("succeeded", None)
+    thread.join()
+
+
+def test_queue_expired_lease(tmp_path):
+    queue = TaskQueue(tmp_path / "queue.db", lease_timeout=0.05)
+    queue.start_run("run1", dict())
+    queue.publish("run1", "task1")
+    assert queue.claim("worker1") == ("run1", "task1")
+
+    # A renewed lease is kept
+    time.sleep(0.03)
+    queue.renew("worker1", [("run1", "task1")])
+    time.sleep(0.03)
+    assert not queue.release_expired("run1", "task1")
+
+    # The task is claimed by another worker once the lease expires
+    time.sleep(0.05)
+    assert queue.release_expired("run1", "task1")
+    assert queue.get_status("run1", "task1") == ("pending", None)
+    assert queue.claim("worker2") == ("run1", "task1")
+
+    # Reports from the previous worker are ignored
+    queue.report("run1", "task1", "failed", "Old worker", worker="worker1")
+    assert queue.get_status("run1", "task1") == ("claimed", None)
+    queue.report("run1", "task1", "succeeded", worker="worker2")
+    assert queue.get_status("run1", "task1") == ("succeeded", None)
+
+
+def test_queue_wait_expired_lease(tmp_path):
+    queue = TaskQueue(tmp_path / "queue.db", lease_timeout=0.05)
+    queue.start_run("run1", dict())
+    queue.publish("run1", "task1")
+    queue.claim("worker1")
+
+    # The task claimed by a stopped worker is released and fails if not claimed again
+    assert queue.wait("run1", "task1", timeout=0.05, poll_interval=0.01) == (
+        "failed",
+        "No worker claimed the task in 0.05 seconds",
+    )
+
+
+def test_queue_wait_timeout(tmp_path):
+    queue = TaskQueue(tmp_path / "queue.db")
+    queue.start_run("run1", dict())
+    queue.publish("run1", "task1")
+
+    status, error_message = queue.wait(
+        "run1", "task1", timeout=0.05, poll_interval=0.01
+    )
+    assert status == "failed"
+    assert queue.claim("worker1") is None
+
+
+def test_queue_waiter(tmp_path):
+    queue = TaskQueue(tmp_path / "queue.db")
+    queue.start_run("run1", dict())
+    waiter = QueueWaiter(queue, "run1", poll_interval=0.01)
+
+    futures = dict()
+    for task_name in ("task1", "task2", "task3"):
+        queue.publish("run1", task_name)
+        futures[task_name] = waiter.wait(task_name)
+
+    queue.report("run1", "task2", "failed", "Some error")
+    assert futures["task2"].result(timeout=5) == ("failed", "Some error")
+    assert not futures["task1"].done()
+
+    queue.report("run1", "task1", "succeeded")
+    queue.report("run1", "task3", "succeeded")
+    assert futures["task1"].result(timeout=5) == ("succeeded", None)
+    assert futures["task3"].result(timeout=5) == ("succeeded", None)
+
+    # All tasks are waited on from the same thread
+    thread = waiter.thread
+    assert waiter.wait("task1").result(timeout=5) == ("succeeded", None)
+    assert waiter.thread is thread
+
+    waiter.close()
+    assert not thread.is_alive()
+
+
+def test_queue_waiter_timeout(tmp_path):
+    queue = TaskQueue(tmp_path / "queue.db")
+    queue.start_run("run1", dict())
+    queue.publish("run1", "task1")
+    queue.publish("run1", "task2")
+    queue.claim("worker1")
+    waiter = QueueWaiter(queue, "run1", timeout=0.05, poll_interval=0.01)
+
+    # Pending tasks don't fail while other tasks of the run are executing
+    waiter.wait("task1")
+    future = waiter.wait("task2")
+    time.sleep(0.2)
+    assert not future.done()
+
+    queue.report("run1", "task1", "succeeded")
+    assert future.result(timeout=5) == (
+        "failed",
+        "No worker claimed the task in 0.05 seconds",
+    )
+    waiter.close()
+
+
+def test_create_queue(tmp_path):
+    assert create_queue(tmp_path / "queue.db").path == str(tmp_path / "queue.db")
+    assert create_queue(f"sqlite://{tmp_path}/queue.db").path == str(
+        tmp_path / "queue.db"
+    )
+
+    with pytest.raises(ValueError):
+        create_queue("redis://localhost")
+
+
+class FakeApp:
+    def __init__(self, arguments):
+        self.arguments = arguments
+        self.tasks = {
+            "ok": FakeTask(status=TaskStatus.SUCCEEDED),
+            "failed": FakeTask(status=TaskStatus.FAILED),
+        }
+        self.executed = list()
+        self.finished = False
+
+    def finish(self):
+        self.finished = True
+
+    def execute_worker_task(self, task_name):
+        self.executed.append(task_name)
+        if task_name == "ok":
+            return Ok()
+        elif task_name == "failed":
+            return Err("tasks", "task_fail", message="Task failed")
+        else:
+            raise ValueError("Unexpected error")
+
+
+def test_worker(tmp_path):
+    queue = TaskQueue(tmp_path / "queue.db")
+    queue.start_run("run1", {"command": "run"})
+    for task_name in ("ok", "failed", "error"):
+        queue.publish("run1", task_name)
+
+    apps = list()
+
+    def app_factory(arguments):
+        apps.append(FakeApp(arguments))
+        return apps[-1]
+
+    Worker(
+        queue, app_factory, threads=2, poll_interval=0.01, idle_timeout=0.1
+    ).execute()
+
+    # The project is configured once per run
+    assert len(apps) == 1
+    assert apps[0].arguments == {"command": "run"}
+    assert sorted(apps[0].executed) == ["error", "failed", "ok"]
+
+    assert queue.get_status("run1", "ok") == ("succeeded", None)
+    assert queue.get_status("run1", "failed") == ("failed", "Task failed")
+    assert queue.get_status("run1", "error") == ("failed", "Unexpected error")
+    # Apps are finished when the worker stops
+    assert apps[0].finished
+
+
+def test_worker_finishes_apps(tmp_path):
+    queue = TaskQueue(tmp_path / "queue.db")
+    queue.start_run("run1", {"command": "run"})
+    queue.publish("run1", "ok")
+
+    apps = dict()
+
+    def app_factory(arguments):
+        app = FakeApp(arguments)
+        apps[len(apps)] = app
+        return app
+
+    worker = Worker(queue, app_factory)
+    worker.execute_claimed(*queue.claim(worker.worker_id))
+
+    # The run continues, so the app is kept for its next tasks
+    worker.finish_apps()
+    assert not apps[0].finished
+
+    # Apps replaced by a newer run are finished once their tasks are done
+    queue.start_run("run2", {"command": "run"})
+    queue.publish("run2", "ok")
+    worker.execute_claimed(*queue.claim(worker.worker_id))
+    worker.claimed.add(("run1", "failed"))
+    worker.finish_apps()
+    assert not apps[0].finished
+    worker.claimed = set()
+    worker.finish_apps()
+    assert apps[0].finished
+    assert not apps[1].finished
+
+    queue.finish_run("run2")
+    worker.finish_apps()
+    assert apps[1].finished
+    assert worker.app is None
+
+
+def test_worker_config_error(tmp_path):
+    queue = TaskQueue(tmp_path / "queue.db")
+    queue.start_run("run1", dict())
+    queue.publish("run1", "ok")
+
+    def app_factory(arguments):
+        raise SystemExit(-1)
+
+    Worker(queue, app_factory, poll_interval=0.01, idle_timeout=0.1).execute()
+
+    assert queue.get_status("run1", "ok") == (
+        "failed",
+        "The worker failed to configure the project",
+    )
+
+
+def test_worker_renews_lease(tmp_path):
+    queue = TaskQueue(tmp_path / "queue.db", lease_timeout=0.06)
+    queue.start_run("run1", {"command": "run"})
+    queue.publish("run1", "slow")
+
+    class SlowApp(FakeApp):
+        def execute_worker_task(self, task_name):
+            time.sleep(0.2)
+            # The lease didn't expire while executing
+            assert not queue.release_expired("run1", task_name)
+            return Ok()
+
+    Worker(queue, SlowApp, poll_interval=0.01, idle_timeout=0.1).execute()
+
+    assert queue.get_status("run1", "slow") == ("succeeded", None)